@@ -1,11 +1,26 @@
 # adopt_window.py
-from PyQt6.QtCore import Qt, QUrl, QDate
+from PyQt6.QtCore import Qt, QDate, QTimer
 from PyQt6.QtWidgets import (
     QDialog, QLabel, QLineEdit, QTextEdit, QComboBox, QFormLayout,
-    QHBoxLayout, QVBoxLayout, QPushButton, QTextBrowser, QDateEdit, QScrollArea, QWidget, QCheckBox
+    QHBoxLayout, QVBoxLayout, QPushButton, QTableView, QHeaderView, QDateEdit, QScrollArea, QWidget, QCheckBox
 )
 from mysql.connector import Error
 from comments_dialog import PetCommentsDialog
+from metrics import METRICS
+from delegates import ButtonDelegate
+from facets import describe
+from pagination import Page
+from pet_model import PetListModel
+from queries import PAGE_SIZE, available_pets_query, parse_range
+from search_cache import normalise_query, extends_adopt, adopt_matches
+
+DEBOUNCE_MS = 250
+PROMPT = "Enter species, breed, age or fee and click Search."
+
+RESULT_COLUMNS = [
+    ("ID", 0, str), ("Name", 1, str), ("Species", 2, str), ("Breed", 3, str), ("Age", 4, str),
+    ("Gender", 5, str), ("Size", 6, str), ("Shelter", 7, str), ("Fee", 8, lambda fee: f"${fee}"),
+]
 
 class AdoptWindow(QDialog):
     def __init__(self, parent=None):
@@ -17,15 +32,34 @@ class AdoptWindow(QDialog):
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setStyleSheet("font-size: 15px; font-weight: bold; color: white; padding: 5px;")
 
-        self.speciesLE = QLineEdit(); self.breedLE = QLineEdit(); self.ageLE = QLineEdit()
+        self.speciesLE = QLineEdit(); self.breedLE = QLineEdit(); self.ageLE = QLineEdit(); self.feeLE = QLineEdit()
         self.speciesLE.setPlaceholderText("cat / dog / other")
         self.breedLE.setPlaceholderText("e.g., Husky, Calico")
-        self.ageLE.setPlaceholderText("number (years)")
+        self.ageLE.setPlaceholderText("years, e.g. 3 or 2-5")
+        self.feeLE.setPlaceholderText("e.g. 100-250 or -150")
+
+        # Search as you type: wait for a pause in typing before querying.
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.adopt_search)
+        for field in (self.speciesLE, self.breedLE, self.ageLE, self.feeLE):
+            field.textChanged.connect(self.debounce.start)
+            field.returnPressed.connect(self.adopt_search)
+
+        # Available pets per species / breed matching what is typed, from the
+        # live facet counts; refreshed with each search.
+        self.species_facets = QLabel(""); self.breed_facets = QLabel("")
+        for label in (self.species_facets, self.breed_facets):
+            label.setStyleSheet("color: gray;")
 
         form = QFormLayout()
         form.addRow("Species:", self.speciesLE)
+        form.addRow("", self.species_facets)
         form.addRow("Breed:", self.breedLE)
+        form.addRow("", self.breed_facets)
         form.addRow("Age:", self.ageLE)
+        form.addRow("Fee ($):", self.feeLE)
 
         btn_search = QPushButton("Search Available")
         btn_reset = QPushButton("Reset")
@@ -39,126 +73,245 @@ class AdoptWindow(QDialog):
         btn_layout.addWidget(btn_reset)
         btn_layout.addWidget(btn_close)
 
-        self.results = QTextBrowser()
-        self.results.setReadOnly(True)
-        self.results.setOpenLinks(False)
-        self.results.setOpenExternalLinks(False)
-        self.results.setTextInteractionFlags(
-            Qt.TextInteractionFlag.LinksAccessibleByMouse |
-            Qt.TextInteractionFlag.TextSelectableByMouse
-        )
-        self.results.setHtml("<h1>Available Pets</h1><p>Enter species, breed, or age and click Search.</p>")
-        self.results.anchorClicked.connect(self.handle_link_click)
+        results_title = QLabel("Available Pets")
+        results_title.setStyleSheet("font-size: 20px; font-weight: bold;")
+        self.message = QLabel(PROMPT)
+
+        # Only the rows scrolled into view are painted, and rows are appended as
+        # they stream in from the database.
+        self.model = PetListModel(RESULT_COLUMNS, actions=["View", "Submit Application"], parent=self)
+        self.results = QTableView()
+        self.results.setModel(self.model)
+        self.results.setAlternatingRowColors(True)
+        self.results.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.results.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.results.horizontalHeader().setStretchLastSection(True)
+        self.results.verticalHeader().setVisible(False)
+        self.results.setMinimumHeight(380)
+        self.action_delegate = ButtonDelegate(self.results)
+        self.action_delegate.clicked.connect(self.handle_result_click)
+        for column in range(len(RESULT_COLUMNS), self.model.columnCount()):
+            self.results.setItemDelegateForColumn(column, self.action_delegate)
+
+        self.more_btn = QPushButton("Load More")
+        self.more_btn.setEnabled(False)
+        self.more_btn.clicked.connect(self.load_more)
+        # "Did you mean ...?" when a misspelt species or breed finds nothing (see fuzzy.py)
+        self.suggestion = None
+        self.suggest_btn = QPushButton("")
+        self.suggest_btn.setFlat(True)
+        self.suggest_btn.setStyleSheet("color: #2986cc; text-align: left;")
+        self.suggest_btn.clicked.connect(self.use_suggestion)
+        self.suggest_btn.hide()
+        more_row = QHBoxLayout()
+        more_row.addWidget(self.message); more_row.addWidget(self.suggest_btn)
+        more_row.addStretch(); more_row.addWidget(self.more_btn)
+
+        self.query = None
+        self.next_token = None
+        self.total = 0
+        self.matches = None      # (PetColumns, rows, rows shown) when the snapshot answered the search
 
         layout = QVBoxLayout()
         layout.addWidget(title)
         layout.addLayout(form)
         layout.addLayout(btn_layout)
+        layout.addWidget(results_title)
         layout.addWidget(self.results)
+        layout.addLayout(more_row)
         layout.setContentsMargins(20, 20, 20, 20)
         self.setLayout(layout)
         self.setFixedWidth(720)
         self.adjustSize()
+        self.parent_window.pet_views.append(self)
+        self.show_facets()
+
+    def done(self, result):
+        self.parent_window.executor.cancel_owner(self)
+        if self in self.parent_window.pet_views:
+            self.parent_window.pet_views.remove(self)
+        super().done(result)
+
+    def refresh(self):
+        if self.query is not None:
+            self.adopt_search()
+
+    def apply_pet_changes(self, records):
+        """Patch listed pets in place; pets that are no longer Available drop out"""
+        removed = self.model.patch_rows(records, keep=lambda record: record[9] == "Available")
+        if removed:
+            self.total = max(0, self.total - removed)
+            self.show_count()
 
     def reset_fields(self):
-        self.speciesLE.clear(); self.breedLE.clear(); self.ageLE.clear()
-        self.results.setHtml("<h1>Available Pets</h1><p>Enter species, breed, or age and click Search.</p>")
+        for field in (self.speciesLE, self.breedLE, self.ageLE, self.feeLE):
+            field.blockSignals(True); field.clear(); field.blockSignals(False)
+        self.debounce.stop()
+        self.parent_window.executor.cancel_owner(self)
+        self.model.clear()
+        self.matches = None
+        self.more_btn.setEnabled(False)
+        self.show_message(PROMPT)
+        self.suggest_btn.hide()
+        self.show_facets()
+
+    def show_facets(self):
+        facets = self.parent_window.facets
+        for field, label, facet in ((self.speciesLE, self.species_facets, "species"),
+                                    (self.breedLE, self.breed_facets, "breed")):
+            if not facets.ready:
+                label.setText("")
+                continue
+            top = facets.top(facet, normalise_query(field.text()), "Available", limit=4)
+            label.setText(f"Available: {describe(top)}" if top else f"No available pets with that {facet}.")
+
+    def show_message(self, text, color=None):
+        self.message.setText(text)
+        self.message.setStyleSheet(f"color: {color};" if color else "")
 
     def adopt_search(self):
-        species = self.speciesLE.text().strip().lower()
-        breed = self.breedLE.text().strip().lower()
-        age_text = self.ageLE.text().strip()
-        header = "<h1>Available Pets</h1>"
-
-        where_clauses, params = [], []
-        base_where = "status = 'Available'"
-
-        if species:
-            where_clauses.append("LOWER(species) LIKE %s")
-            params.append(f"%{species}%")
-        if breed:
-            where_clauses.append("LOWER(breed) LIKE %s")
-            params.append(f"%{breed}%")
-        if age_text:
-            try:
-                age_val = int(age_text)
-                where_clauses.append("age = %s")
-                params.append(age_val)
-            except ValueError:
-                self.results.setHtml(header + "<p style='color:red;'>Age must be a number.</p>")
-                return
-
-        where_sql = f"{base_where}" + ((" AND (" + " OR ".join(where_clauses) + ")") if where_clauses else "")
-        sql = f"""
-            SELECT petId, petName, species, breed, age, gender, size, shelter, adoptionFee, status, comments
-            FROM pets WHERE {where_sql} ORDER BY petId
-        """
-
-        try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute(sql, tuple(params))
-                records = cursor.fetchall()
-                cursor.close()
-
-                table = (
-                    "<table border='1' cellspacing='0' cellpadding='6' style='width:100%; border-collapse:collapse;'>"
-                    "<tr style='background-color:#4CAF50; color:white;'>"
-                    "<th>ID</th><th>Name</th><th>Species</th><th>Breed</th><th>Age</th>"
-                    "<th>Gender</th><th>Size</th><th>Shelter</th><th>Fee</th><th>View</th><th>Action</th></tr>"
-                )
-                for r in records:
-                    petId, petName, sp, br, ag, g, sz, sh, fee, st, comments = r
-                    table += (
-                        f"<tr>"
-                        f"<td>{petId}</td><td>{petName}</td><td>{sp}</td><td>{br}</td>"
-                        f"<td>{ag}</td><td>{g}</td><td>{sz}</td><td>{sh}</td>"
-                        f"<td>${fee}</td>"
-                        f"<td><a href='view:{petId}'>View</a></td>"
-                        f"<td><a href='adopt:{petId}'>Submit Application</a></td>"
-                        f"</tr>"
-                    )
-                table += "</table>"
-
-                if records:
-                    self.results.setHtml(header + f"<p><strong>Found {len(records)} available pet(s)</strong></p>{table}")
-                else:
-                    self.results.setHtml(header + "<p style='color:orange;'>No available pets matched your search.</p>")
-            else:
-                self.results.setHtml(header + "<p style='color:red;'>No database connection.</p>")
-        except Error as e:
-            self.results.setHtml(header + f"<p style='color:red;'>Database error: {e}</p>")
-        except Exception as e:
-            self.results.setHtml(header + f"<p style='color:red;'>Error: {e}</p>")
-
-    def handle_link_click(self, url: QUrl):
-        scheme = url.scheme()
-        pet_id_str = url.path() or url.toString().split(':', 1)[1]
+        self.debounce.stop()
+        self.suggest_btn.hide()
+        self.show_facets()
+        self.parent_window.executor.cancel_owner(self)
+        species = normalise_query(self.speciesLE.text())
+        breed = normalise_query(self.breedLE.text())
         try:
-            pet_id = int(pet_id_str)
+            age = parse_range(self.ageLE.text())
+            fee = parse_range(self.feeLE.text(), float)
         except ValueError:
-            print(f"Bad pet id in URL: {url.toString()}")
+            self.model.clear()
+            self.more_btn.setEnabled(False)
+            self.show_message("Age and fee must be a number or a range like 2-5.", "red")
+            return
+
+        self.query = available_pets_query(species, breed, age, fee)
+        self.model.clear()
+        self.matches = None
+
+        columns = self.parent_window.pet_columns
+        if columns.ready:
+            # Filter the in-memory column snapshot (see pet_columns.py) instead of querying.
+            with METRICS.timed("adopt_search", "columns"):
+                rows = columns.match(species, breed, age, fee)
+                self.matches = (columns, rows, 0)
+                self.total = len(rows)
+                self.show_matches()
+            return
+
+        key = (species, breed, age, fee)
+        cache = self.parent_window.search_cache
+        cached = cache.get("adopt", key)
+        if cached is None:
+            # The user refined an earlier search: filter its rows instead of re-querying.
+            base = cache.find_superset("adopt", lambda old: extends_adopt(old, key))
+            if base is not None:
+                cached = cache.put("adopt", key, [r for r in base.rows if adopt_matches(r, key)])
+        if cached is not None:
+            self.model.set_rows(cached.rows)
+            self.page_loaded(Page(cached.rows, cached.next_token, cached.total))
+            return
+        self.fetch_page(None, cache_key=key)
+
+    def load_more(self):
+        if self.matches is not None:
+            self.show_matches()
+        elif self.query and self.next_token:
+            self.fetch_page(self.next_token)
+
+    def show_matches(self):
+        """List the next PAGE_SIZE snapshot matches; records are only built for the rows shown"""
+        columns, rows, shown = self.matches
+        records = columns.records(rows[shown:shown + PAGE_SIZE])
+        self.matches = (columns, rows, shown + len(records))
+        available = [record for record in records if record[9] == "Available"]
+        self.total -= len(records) - len(available)   # changed since the search
+        self.model.append_rows(available)
+        self.more_btn.setEnabled(shown + len(records) < len(rows))
+        self.show_count()
+
+    def fetch_page(self, token, cache_key=None):
+        query, pool = self.query, self.parent_window.pool
+        self.more_btn.setEnabled(False)
+        if token is None:
+            self.show_message("Searching...")
+        self.parent_window.executor.submit(
+            (self, "search"),
+            lambda task: query.fetch(pool, PAGE_SIZE, token, with_total=token is None,
+                                     on_chunk=task.emit_chunk, cancelled=task.is_cancelled),
+            on_result=lambda page: self.page_loaded(page, cache_key),
+            on_error=self.page_failed, on_chunk=self.rows_arrived, label="adopt_search",
+        )
+
+    def rows_arrived(self, rows):
+        self.model.append_rows(rows)
+        # View / Submit Application on a listed pet can then skip the lookup.
+        self.parent_window.store.remember_pets(rows)
+
+    def page_failed(self, e):
+        if isinstance(e, Error):
+            self.show_message(f"Database error: {e}", "red")
+        else:
+            self.show_message(f"Error: {e}", "red")
+
+    def page_loaded(self, page, cache_key=None):
+        if cache_key is not None:
+            self.parent_window.search_cache.put("adopt", cache_key, page.rows, page.total, page.next_token)
+        if page.total is not None:
+            self.total = page.total
+        self.next_token = page.next_token
+        self.more_btn.setEnabled(page.next_token is not None)
+        self.show_count()
+
+    def show_count(self):
+        shown = self.model.rowCount()
+        if shown:
+            self.show_message(f"Found {self.total} available pet(s)" +
+                              (f" — showing {shown}" if shown < self.total else ""))
+        else:
+            self.show_message("No available pets matched your search.", "orange")
+            self.show_suggestion()
+
+    def show_suggestion(self):
+        """Offer the closest spelling of the species and breed typed, ranked by the fuzzy matcher"""
+        fuzzy = self.parent_window.fuzzy
+        typed = (normalise_query(self.speciesLE.text()), normalise_query(self.breedLE.text()))
+        fixes = [fuzzy.correct(text, (field,)) if text and fuzzy.ready else None
+                 for text, field in zip(typed, ("species", "breed"))]
+        if not any(fixes):
+            self.suggestion = None
+            self.suggest_btn.hide()
             return
+        self.suggestion = tuple(fix or text for fix, text in zip(fixes, typed))
+        words = [f'{field} "{fix}"' for fix, field in zip(fixes, ("species", "breed")) if fix]
+        self.suggest_btn.setText(f"Did you mean {' and '.join(words)}?")
+        self.suggest_btn.show()
 
-        if scheme == 'view':
-            self.view_pet_comments(pet_id)
-        elif scheme == 'adopt':
-            self.open_submit_window(pet_id)
+    def use_suggestion(self):
+        if self.suggestion is None:
+            return
+        for field, text in zip((self.speciesLE, self.breedLE), self.suggestion):
+            field.blockSignals(True); field.setText(text); field.blockSignals(False)
+        self.adopt_search()
+
+    def handle_result_click(self, index):
+        action = self.model.action_at(index)
+        record = self.model.record(index.row())
+        if action is None or record is None:
+            return
+        if action == "View":
+            self.view_pet_comments(record[0])
+        else:
+            self.open_submit_window(record[0])
 
     def view_pet_comments(self, pet_id):
         try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("SELECT petName, comments FROM pets WHERE petId = %s", (pet_id,))
-                row = cursor.fetchone()
-                cursor.close()
-                if row:
-                    pet_name, comments = row
-                    PetCommentsDialog(self.parent_window, pet_id, pet_name, comments).exec()
-                else:
-                    print(f"Error: Pet ID {pet_id} not found in database")
+            record = self.parent_window.store.get_pet(pet_id)
+            if record:
+                pet_name, comments = record[1], record[10]
+                PetCommentsDialog(self.parent_window, pet_id, pet_name, comments).exec()
             else:
-                print("Error: No database connection")
+                print(f"Error: Pet ID {pet_id} not found in database")
         except Error as e:
             print(f"Database error: {e}")
         except Exception as e:
@@ -166,21 +319,11 @@ class AdoptWindow(QDialog):
 
     def open_submit_window(self, pet_id):
         try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("""
-                    SELECT petId, petName, species, breed, age, gender, size, shelter, adoptionFee, status
-                    FROM pets WHERE petId = %s
-                """, (pet_id,))
-                pet_data = cursor.fetchone()
-                cursor.close()
-                if pet_data:
-                    SubmitApplicationWindow(self.parent_window, pet_data).exec()
-                    self.adopt_search()
-                else:
-                    print(f"Error: Pet ID {pet_id} not found in database")
+            record = self.parent_window.store.get_pet(pet_id)
+            if record:
+                SubmitApplicationWindow(self.parent_window, record[:10]).exec()
             else:
-                print("Error: No database connection")
+                print(f"Error: Pet ID {pet_id} not found in database")
         except Error as e:
             print(f"Database error in open_submit_window: {e}")
         except Exception as e:
@@ -340,40 +483,21 @@ class SubmitApplicationWindow(QDialog):
             pet_id = int(self.petIdLE.text())
             pet_name = self.petNameLE.text()
 
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-
-                cursor.execute("SELECT status FROM pets WHERE petId = %s", (pet_id,))
-                result = cursor.fetchone()
-
-                if not result:
-                    print(f"Error: Pet ID {pet_id} not found.")
-                elif (result[0] or "").lower() != "available":
-                    print(f"Error: Pet ID {pet_id} is no longer available for adoption.")
-                else:
-                    cursor.execute("""
-                        INSERT INTO applications (
-                            petId, petName, adopterName, adopterEmail, adopterPhone,
-                            ownedBefore, awareNeeds, readyCosts, adoptionDate,
-                            ownOtherPets, otherPetsType, livingSituation, fencedYard,
-                            primaryCaregiver, notes, appStatus
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Submitted')
-                    """, (pet_id, pet_name, adopter_name, adopter_email, adopter_phone, owned_before, aware_needs,
-                          ready_costs, adoption_date, own_other_pets, other_pets_type, living_situation, fenced_yard,
-                          primary_caregiver, questions_notes))
-                    cursor.execute("UPDATE pets SET status = 'Pending' WHERE petId = %s", (pet_id,))
-                    self.parent_window.connection.commit()
-                    print(f"✓ Application submitted successfully! Updated Pet #{pet_id} to Pending.")
-                    self.close()
-                cursor.close()
+            previous_status = self.parent_window.store.submit_application((
+                pet_id, pet_name, adopter_name, adopter_email, adopter_phone, owned_before, aware_needs,
+                ready_costs, adoption_date, own_other_pets, other_pets_type, living_situation, fenced_yard,
+                primary_caregiver, questions_notes))
+            if previous_status is None:
+                print(f"Error: Pet ID {pet_id} not found.")
+            elif previous_status.lower() != "available":
+                print(f"Error: Pet ID {pet_id} is no longer available for adoption.")
             else:
-                print("Error: No database connection.")
+                print(f"✓ Application submitted successfully! Updated Pet #{pet_id} to Pending.")
+                self.parent_window.pet_status_changed(pet_id, "Pending")
+                self.close()
         except ValueError:
             print("Error: Invalid Pet ID")
         except Error as e:
             print(f"Database error: {e}")
-            if self.parent_window.connection:
-                self.parent_window.connection.rollback()
         except Exception as e:
             print(f"Unexpected error: {e}")
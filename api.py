@@ -0,0 +1,391 @@
+"""Local HTTP/JSON service over the adopt, submit and decide operations.
+
+Kiosks and the website get the same operations as the dialogs: the Available
+pet search of AdoptWindow, application submission of SubmitApplicationWindow
+and the approve/deny of ApplicantsWindow. Everything goes through one PetStore,
+so all requests share its connection pool, prepared statements and pet cache.
+Database work runs on a thread pool no larger than the connection pool; at
+most --concurrency requests hold a worker at once and the rest wait up to
+--queue-seconds before getting 503. HTTP/1.1 connections are kept alive
+between requests until they sit idle for --keepalive seconds.
+
+    python api.py                                   # 127.0.0.1:8080, MySQL (or $PETADOPTION_DB)
+    python api.py --db sqlite:pets.db --port 8081 --concurrency 8
+
+    GET  /pets?species=&breed=&age=2-5&fee=-150&limit=&token=   Available pets, keyset paged
+    GET  /pets/<petId>
+    POST /applications                              {"petId": 7, "adopterName": ..., "certified": true}
+    GET  /applications/<appId>
+    POST /applications/<appId>/decision             {"decision": "Approved" | "Denied"}
+    POST /applications/decisions                    {"decisions": [{"appId": 3, "decision": "Denied"}, ...]}
+    GET  /health, GET /metrics
+"""
+import argparse
+import asyncio
+import datetime
+import decimal
+import json
+import re
+import sys
+import time
+import urllib.parse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from mysql.connector import Error
+
+from db import CircuitOpenError, PoolTimeout
+from metrics import METRICS
+from queries import PAGE_SIZE, PET_COLUMNS, available_pets_query, parse_range
+from search_cache import normalise_query
+from store import APPLICATION_DETAIL_COLUMNS, APPLICATION_FIELDS, DECISION_PET_STATUS, open_store
+
+HOST, PORT = "127.0.0.1", 8080
+CONCURRENCY = 8
+QUEUE_SECONDS = 5.0
+KEEPALIVE_SECONDS = 15.0
+MAX_PAGE = 500
+MAX_BODY = 64 * 1024
+MAX_HEADERS = 100
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 411: "Length Required", 413: "Payload Too Large",
+           431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Answers SubmitApplicationWindow offers in its combo boxes
+YES_NO = ("Yes", "No")
+CHOICES = {"ownedBefore": YES_NO, "awareNeeds": YES_NO, "readyCosts": YES_NO, "ownOtherPets": YES_NO,
+           "livingSituation": ("House", "Apartment", "Condo", "Other"), "fencedYard": ("Yes", "No", "N/A")}
+REQUIRED_TEXT = ("adopterName", "adopterEmail", "adopterPhone", "primaryCaregiver")
+
+Request = namedtuple('Request', 'method path query headers body version')
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _plain(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a number") from None
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b"null")
+    except ValueError:
+        raise HTTPError(400, "Body must be JSON") from None
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Body must be a JSON object")
+    return data
+
+
+def application_values(data, pet_name):
+    """APPLICATION_FIELDS tuple from a submitted JSON object, checked like SubmitApplicationWindow"""
+    fields = {name: str(data.get(name) or "").strip() for name in APPLICATION_FIELDS}
+    missing = [name for name in REQUIRED_TEXT if not fields[name]]
+    if missing:
+        raise HTTPError(400, f"Missing: {', '.join(missing)}")
+    for name, choices in CHOICES.items():
+        if fields[name] not in choices:
+            raise HTTPError(400, f"{name} must be one of {', '.join(choices)}")
+    if data.get("certified") is not True:
+        raise HTTPError(400, "The applicant must certify the information (certified: true)")
+    try:
+        adoption_date = datetime.date.fromisoformat(fields["adoptionDate"] or datetime.date.today().isoformat())
+    except ValueError:
+        raise HTTPError(400, "adoptionDate must be YYYY-MM-DD") from None
+    fields.update(petName=pet_name, adoptionDate=adoption_date)
+    return tuple(fields[name] for name in APPLICATION_FIELDS[1:])
+
+
+class PetAPI:
+    """Routes requests to the store; handlers are blocking and run on the worker threads"""
+    def __init__(self, store, concurrency=CONCURRENCY, queue_seconds=QUEUE_SECONDS, keepalive=KEEPALIVE_SECONDS):
+        self.store = store
+        self.queue_seconds = queue_seconds
+        self.keepalive = keepalive
+        self.workers = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="api")
+        self.slots = asyncio.Semaphore(concurrency)
+        self.connections = 0
+        self.routes = [
+            ("GET", re.compile(r"/pets"), self.search_pets),
+            ("GET", re.compile(r"/pets/(\d+)"), self.get_pet),
+            ("POST", re.compile(r"/applications"), self.submit_application),
+            ("GET", re.compile(r"/applications/(\d+)"), self.get_application),
+            ("POST", re.compile(r"/applications/(\d+)/decision"), self.decide_application),
+            ("POST", re.compile(r"/applications/decisions"), self.decide_applications),
+            ("GET", re.compile(r"/metrics"), self.metrics),
+        ]
+
+    # --- Handlers ---
+    def search_pets(self, request):
+        query = request.query
+        try:
+            age = parse_range(query.get("age", ""))
+            fee = parse_range(query.get("fee", ""), float)
+        except ValueError:
+            raise HTTPError(400, "age and fee must be a number or a range like 2-5") from None
+        limit = _int(query.get("limit", PAGE_SIZE), "limit")
+        if not 1 <= limit <= MAX_PAGE:
+            raise HTTPError(400, f"limit must be between 1 and {MAX_PAGE}")
+        token = query.get("token") or None
+        pets = available_pets_query(normalise_query(query.get("species", "")), normalise_query(query.get("breed", "")),
+                                    age, fee)
+        try:
+            page = pets.fetch(self.store.pool, limit, token, with_total=token is None)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+        self.store.remember_pets(page.rows)
+        return 200, {"pets": [dict(zip(PET_COLUMNS, row)) for row in page.rows],
+                     "next_token": page.next_token, "total": page.total}
+
+    def get_pet(self, request, pet_id):
+        pet = self.store.get_pet(int(pet_id))
+        if pet is None:
+            raise HTTPError(404, f"Pet ID {pet_id} not found.")
+        return 200, dict(zip(PET_COLUMNS, pet))
+
+    def submit_application(self, request):
+        data = _json_body(request)
+        pet_id = _int(data.get("petId"), "petId")
+        pet = self.store.get_pet(pet_id)
+        if pet is None:
+            raise HTTPError(404, f"Pet ID {pet_id} not found.")
+        values = (pet_id,) + application_values(data, pet[1])
+        previous = self.store.submit_application(values)
+        if previous is None:
+            raise HTTPError(404, f"Pet ID {pet_id} not found.")
+        if previous.lower() != "available":
+            raise HTTPError(409, f"Pet ID {pet_id} is no longer available for adoption.")
+        return 201, {"petId": pet_id, "status": "Pending"}
+
+    def get_application(self, request, app_id):
+        application = self.store.get_application(int(app_id))
+        if application is None:
+            raise HTTPError(404, f"Application #{app_id} not found.")
+        return 200, dict(zip(APPLICATION_DETAIL_COLUMNS, application))
+
+    def decide_application(self, request, app_id):
+        return self._decide([{"appId": app_id, "decision": _json_body(request).get("decision")}])
+
+    def decide_applications(self, request):
+        decisions = _json_body(request).get("decisions")
+        if not isinstance(decisions, list) or not decisions or not all(isinstance(d, dict) for d in decisions):
+            raise HTTPError(400, 'Expected {"decisions": [{"appId": ..., "decision": ...}, ...]}')
+        return self._decide(decisions)
+
+    def _decide(self, items):
+        app_ids = [_int(item.get("appId"), "appId") for item in items]
+        for item in items:
+            if item.get("decision") not in DECISION_PET_STATUS:
+                raise HTTPError(400, f"decision must be one of {', '.join(DECISION_PET_STATUS)}")
+        pet_ids = self.store.application_pets(app_ids)
+        missing = [str(app_id) for app_id in app_ids if app_id not in pet_ids]
+        if missing:
+            raise HTTPError(404, f"Application(s) not found: {', '.join(missing)}")
+        try:
+            report = self.store.decide_applications(
+                [(app_id, pet_ids[app_id], item["decision"]) for app_id, item in zip(app_ids, items)])
+        except ValueError as e:
+            raise HTTPError(409, str(e)) from None
+        return 200, report._asdict()
+
+    def metrics(self, request):
+        return 200, dict(METRICS.snapshot(), pool=self.store.statistics(), connections=self.connections)
+
+    # --- Dispatch ---
+    def route(self, request):
+        """(handler name, handler, path arguments) for request"""
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request.path.rstrip("/") or "/")
+            if match:
+                if method == request.method:
+                    return handler.__name__, handler, match.groups()
+                allowed.append(method)
+        if allowed:
+            raise HTTPError(405, f"Use {' or '.join(allowed)} for {request.path}")
+        raise HTTPError(404, f"No such endpoint: {request.path}")
+
+    async def dispatch(self, request):
+        """(status, payload) for request; database work waits for a free worker slot"""
+        if request.path == "/health":
+            return 200, {"status": "ok"}
+        try:
+            name, handler, args = self.route(request)
+        except HTTPError as e:
+            return e.status, {"error": e.message}
+        with METRICS.timed(f"api.{name}", "total"):
+            try:
+                await asyncio.wait_for(self.slots.acquire(), self.queue_seconds)
+            except asyncio.TimeoutError:
+                METRICS.increment("api.rejected")
+                return 503, {"error": "Too many requests in progress; try again shortly."}
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.workers, handler, request, *args)
+            except HTTPError as e:
+                return e.status, {"error": e.message}
+            except (PoolTimeout, CircuitOpenError) as e:
+                return 503, {"error": f"Database unavailable: {e}"}
+            except Error as e:
+                print(f"Database error: {e}", file=sys.stderr)
+                return 500, {"error": f"Database error: {e}"}
+            except Exception as e:
+                print(f"Unexpected error: {e}", file=sys.stderr)
+                return 500, {"error": "Unexpected error"}
+            finally:
+                self.slots.release()
+
+    # --- HTTP/1.1 ---
+    @staticmethod
+    async def read_line(reader, status, message):
+        """One line from reader; a line longer than the stream limit is answered with status"""
+        try:
+            return await reader.readline()
+        except ValueError:   # readline's LimitOverrunError, re-raised as ValueError
+            raise HTTPError(status, message) from None
+
+    async def read_request(self, reader):
+        """The next Request on the connection, or None once the client has closed it"""
+        line = await self.read_line(reader, 413, "Request line too long")
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+        headers = {}
+        while True:
+            line = await self.read_line(reader, 431, "Header line too long")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(431, "Too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Send the body with a Content-Length")
+        length = _int(headers.get("content-length") or 0, "Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"Body larger than {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length > 0 else b""
+        url = urllib.parse.urlsplit(target)
+        query = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        return Request(method.upper(), url.path, query, headers, body, version.upper())
+
+    @staticmethod
+    def keep_alive(request):
+        connection = request.headers.get("connection", "").lower()
+        if request.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=_plain).encode()
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}"]
+        if keep_alive:
+            head += ["Connection: keep-alive", f"Keep-Alive: timeout={int(self.keepalive)}"]
+        else:
+            head.append("Connection: close")
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve_client(self, reader, writer):
+        """Answer requests on one connection until the client closes it or it sits idle"""
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    # The idle timeout also bounds how long a request may take to arrive.
+                    request = await asyncio.wait_for(self.read_request(reader), self.keepalive)
+                except HTTPError as e:
+                    await self.respond(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                keep_alive = self.keep_alive(request)
+                status, payload = await self.dispatch(request)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        server = await asyncio.start_server(self.serve_client, host, port, backlog=512)
+        address = server.sockets[0].getsockname()
+        print(f"Pet adoption API listening on http://{address[0]}:{address[1]}", file=sys.stderr)
+        if ready is not None:
+            ready(address)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.workers.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON API over pet search, applications and decisions")
+    parser.add_argument("--host", default=HOST, help=f"address to listen on (default {HOST}, local only)")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", help='e.g. "sqlite:pets.db" (default: $PETADOPTION_DB, else MySQL)')
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="requests running database work at once; also the connection pool size")
+    parser.add_argument("--queue-seconds", type=float, default=QUEUE_SECONDS,
+                        help="how long a request may wait for a free slot before 503")
+    parser.add_argument("--keepalive", type=float, default=KEEPALIVE_SECONDS,
+                        help="seconds an idle keep-alive connection stays open")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    store = open_store(args.db, pool_size=args.concurrency)
+    started = time.perf_counter()
+
+    async def run():
+        api = PetAPI(store, args.concurrency, args.queue_seconds, args.keepalive)
+        try:
+            await api.serve(args.host, args.port)
+        finally:
+            api.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Could not start the API: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+        print(f"API stopped after {time.perf_counter() - started:.0f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Load test for api.py over keep-alive connections.
+
+Each client opens one connection and sends requests back to back: mostly
+Available pet searches and pet lookups, with a share of application submits
+(--submit-ratio). Throughput, status codes and latency percentiles are
+printed per endpoint.
+
+    python api.py --db sqlite:pets.db &            # or against a local MySQL database
+    python api_load.py --clients 32 --seconds 20
+    python api_load.py --port 8081 --submit-ratio 0.2 --pets 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmark import percentile
+
+SEARCHES = ["dog", "cat", "rabbit", "lab", "terrier", "siamese", "", "2"]
+
+
+async def call(reader, writer, method, path, payload=None):
+    """(status, decoded JSON body) for one request on an open keep-alive connection"""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+    if body:
+        head += "Content-Type: application/json\r\n"
+    writer.write(head.encode() + b"\r\n" + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length)) if length else None
+
+
+def next_request(rng, pets, submit_ratio, client):
+    """(endpoint label, method, path, payload) chosen at random"""
+    roll = rng.random()
+    if roll < submit_ratio:
+        name = f"Load Client {client}"
+        return "submit", "POST", "/applications", {
+            "petId": rng.randint(1, pets), "adopterName": name, "adopterEmail": f"client{client}@example.com",
+            "adopterPhone": "555-0100", "ownedBefore": "Yes", "awareNeeds": "Yes", "readyCosts": "Yes",
+            "ownOtherPets": "No", "livingSituation": "House", "fencedYard": "Yes", "primaryCaregiver": name,
+            "certified": True}
+    if roll < submit_ratio + (1 - submit_ratio) / 2:
+        return "search", "GET", f"/pets?species={rng.choice(SEARCHES)}&limit=50", None
+    return "pet", "GET", f"/pets/{rng.randint(1, pets)}", None
+
+
+async def client(host, port, number, args, deadline, results):
+    rng = random.Random(args.seed + number)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            label, method, path, payload = next_request(rng, args.pets, args.submit_ratio, number)
+            started = time.perf_counter()
+            status, _ = await call(reader, writer, method, path, payload)
+            results[label].append((status, (time.perf_counter() - started) * 1000))
+    finally:
+        writer.close()
+
+
+async def run(args):
+    deadline = time.perf_counter() + args.seconds
+    results = defaultdict(list)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, n, args, deadline, results) for n in range(args.clients)))
+    return results, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the pet adoption API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--pets", type=int, default=200, help="pet IDs 1..N to look up and apply for")
+    parser.add_argument("--submit-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        results, seconds = asyncio.run(run(args))
+    except OSError as e:
+        print(f"Could not reach the API at {args.host}:{args.port}: {e}")
+        return 1
+    total = sum(len(samples) for samples in results.values())
+    print(f"{args.clients} clients for {seconds:.1f}s: {total} requests ({total / seconds:.0f} requests/sec)")
+    failed = 0
+    for label, samples in sorted(results.items()):
+        latencies = sorted(ms for _, ms in samples)
+        statuses = Counter(status for status, _ in samples)
+        failed += sum(count for status, count in statuses.items() if status >= 500)
+        print(f"  {label:<7} {len(samples):>7}  p50 {percentile(latencies, 50):7.2f} ms  "
+              f"p95 {percentile(latencies, 95):7.2f} ms  p99 {percentile(latencies, 99):7.2f} ms  "
+              f"status {dict(sorted(statuses.items()))}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
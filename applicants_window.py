@@ -1,10 +1,65 @@
 # applicants_window.py
-from PyQt6.QtCore import Qt
+import datetime
+from PyQt6.QtCore import Qt, QDate, QTimer
 from PyQt6.QtWidgets import (
-    QDialog, QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
+    QDialog, QLabel, QTableView, QHeaderView, QComboBox, QDateEdit, QCheckBox,
     QPushButton, QHBoxLayout, QVBoxLayout, QLineEdit, QTextEdit, QFormLayout, QScrollArea, QWidget
 )
 from mysql.connector import Error
+from change_feed import ChangeFeed
+from delegates import ButtonDelegate
+from pagination import KeysetQuery
+from pet_model import PetListModel
+from queries import APPLICATION_COLUMNS
+
+PAGE_SIZE = 200
+DEBOUNCE_MS = 250
+DEFAULT_DAYS = 90     # the date range offered when "All dates" is unticked
+APPLICATION_STATUSES = ("Submitted", "Approved", "Denied")
+LIST_COLUMNS = [
+    ("App ID", 0, str), ("Pet ID", 1, str), ("Pet Name", 2, str), ("Adopter", 3, str),
+    ("Email", 4, str), ("Phone", 5, str), ("Status", 6, str), ("Submitted", 7, str),
+]
+
+def application_filter(status=None, pet=None, since=None, until=None):
+    """WHERE clause and params for the dashboard filters; empty filters are left out.
+
+    pet is a pet ID or the start of a pet name; since/until are dates (inclusive).
+    """
+    where_clauses, params = [], []
+    if status:
+        where_clauses.append("appStatus = %s")
+        params.append(status)
+    if pet:
+        if pet.isdigit():
+            where_clauses.append("petId = %s")
+            params.append(int(pet))
+        else:
+            where_clauses.append("LOWER(petName) LIKE %s")
+            params.append(f"{pet.lower()}%")
+    if since is not None:
+        where_clauses.append("submittedAt >= %s")
+        params.append(since)
+    if until is not None:
+        where_clauses.append("submittedAt < %s")
+        params.append(until + datetime.timedelta(days=1))
+    return (" AND ".join(where_clauses) or None), params
+
+def application_matches(record, status=None, pet=None, since=None, until=None):
+    """Python twin of application_filter for one APPLICATION_COLUMNS record"""
+    if status and record[6] != status:
+        return False
+    if pet:
+        if pet.isdigit():
+            if record[1] != int(pet):
+                return False
+        elif not (record[2] or "").lower().startswith(pet.lower()):
+            return False
+    submitted = record[7]
+    if submitted is None:
+        return since is None and until is None
+    submitted = submitted.date() if isinstance(submitted, datetime.datetime) else submitted
+    return (since is None or submitted >= since) and (until is None or submitted <= until)
 
 class ApplicantsWindow(QDialog):
     def __init__(self, parent=None):
@@ -16,27 +71,86 @@ class ApplicantsWindow(QDialog):
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setStyleSheet("font-size: 15px; font-weight: bold; color: white; padding: 5px;")
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(11)
-        self.table.setHorizontalHeaderLabels([
-            "App ID", "Pet ID", "Pet Name", "Adopter", "Email", "Phone",
-            "Status", "Submitted", "View", "Approve", "Deny"
-        ])
+        # Filters: only the matching page is read, and counts come from one GROUP BY.
+        self.statusCB = QComboBox()
+        self.statusCB.addItems(("All",) + APPLICATION_STATUSES)
+        self.statusCB.setCurrentText("Submitted")   # opens on every pending application, newest first
+        self.petLE = QLineEdit()
+        self.petLE.setPlaceholderText("Pet ID or name")
+        today = QDate.currentDate()
+        self.fromDE = QDateEdit(today.addDays(-DEFAULT_DAYS)); self.fromDE.setCalendarPopup(True)
+        self.toDE = QDateEdit(today); self.toDE.setCalendarPopup(True)
+        self.all_dates = QCheckBox("All dates")
+        self.all_dates.setChecked(True)
+        self.fromDE.setEnabled(False); self.toDE.setEnabled(False)
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.load_applications)
+        self.statusCB.currentIndexChanged.connect(self.debounce.start)
+        self.petLE.textChanged.connect(self.debounce.start)
+        self.petLE.returnPressed.connect(self.load_applications)
+        self.fromDE.dateChanged.connect(self.debounce.start)
+        self.toDE.dateChanged.connect(self.debounce.start)
+        self.all_dates.toggled.connect(self.dates_toggled)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Status:")); filter_layout.addWidget(self.statusCB)
+        filter_layout.addWidget(QLabel("Pet:")); filter_layout.addWidget(self.petLE)
+        filter_layout.addWidget(QLabel("From:")); filter_layout.addWidget(self.fromDE)
+        filter_layout.addWidget(QLabel("To:")); filter_layout.addWidget(self.toDE)
+        filter_layout.addWidget(self.all_dates)
+        filter_layout.addStretch()
+        self.counts_label = QLabel("")
+
+        # Rows newest first; only the cells scrolled into view are formatted.
+        self.model = PetListModel(LIST_COLUMNS, actions=["View", "Approve", "Deny"], parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+
+        # View/Approve/Deny are painted by one delegate instead of three buttons per row.
+        self.action_delegate = ButtonDelegate(self.table)
+        self.action_delegate.clicked.connect(self.handle_action)
+        for column in range(len(LIST_COLUMNS), self.model.columnCount()):
+            self.table.setItemDelegateForColumn(column, self.action_delegate)
 
         refresh_btn = QPushButton("Refresh")
+        approve_selected_btn = QPushButton("Approve Selected")
+        deny_selected_btn = QPushButton("Deny Selected")
+        approve_selected_btn.clicked.connect(lambda: self.decide_selected("Approved"))
+        deny_selected_btn.clicked.connect(lambda: self.decide_selected("Denied"))
+        self.more_btn = QPushButton("Load More")
         close_btn = QPushButton("Close")
         refresh_btn.clicked.connect(self.load_applications)
+        self.more_btn.clicked.connect(self.load_more)
         close_btn.clicked.connect(self.close)
+        self.count_label = QLabel("")
+        self.next_token = None
+        self.total = 0
+        self.counts = {}      # appStatus -> applications matching the pet/date filters
+        self.filters = {}     # application_filter() arguments of the rows on screen
+        self.changes = ChangeFeed("applications", APPLICATION_COLUMNS, "appId")
+        self.syncing = False
+        self.sync_again = False
 
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(refresh_btn)
+        btn_layout.addWidget(self.more_btn)
+        btn_layout.addWidget(self.count_label)
         btn_layout.addStretch()
+        btn_layout.addWidget(approve_selected_btn)
+        btn_layout.addWidget(deny_selected_btn)
         btn_layout.addWidget(close_btn)
 
         layout = QVBoxLayout()
         layout.addWidget(title)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.counts_label)
         layout.addWidget(self.table)
         layout.addLayout(btn_layout)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -45,101 +159,181 @@ class ApplicantsWindow(QDialog):
 
         self.load_applications()
 
+    def done(self, result):
+        self.parent_window.executor.cancel_owner(self)
+        super().done(result)
+
+    # --- Filters ---
+    def dates_toggled(self, checked):
+        self.fromDE.setEnabled(not checked)
+        self.toDE.setEnabled(not checked)
+        self.debounce.start()
+
+    def read_filters(self):
+        status = self.statusCB.currentText()
+        since = until = None
+        if not self.all_dates.isChecked():
+            since, until = self.fromDE.date().toPyDate(), self.toDE.date().toPyDate()
+        return {"status": None if status == "All" else status, "pet": self.petLE.text().strip(),
+                "since": since, "until": until}
+
+    def show_counts(self):
+        counts = "   ".join(f"{status}: {self.counts.get(status, 0)}" for status in APPLICATION_STATUSES)
+        since, until = self.filters.get("since"), self.filters.get("until")
+        dates = f"submitted {since} to {until}" if since is not None else "all dates"
+        self.counts_label.setText(f"{counts}   ({dates})")
+        status = self.filters.get("status")
+        self.total = self.counts.get(status, 0) if status else sum(self.counts.values())
+        self.count_label.setText(f"Showing {self.model.rowCount()} of {self.total}")
+
+    # --- Loading ---
     def load_applications(self):
-        self.table.setRowCount(0)
-        try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("""
-                    SELECT appId, petId, petName, adopterName, adopterEmail, adopterPhone,
-                           appStatus, submittedAt
-                    FROM applications
-                    ORDER BY appId DESC
-                """)
-                records = cursor.fetchall()
-                cursor.close()
-
-                self.table.setRowCount(len(records))
-                for row_idx, record in enumerate(records):
-                    appId, petId, petName, adopterName, adopterEmail, adopterPhone, appStatus, submittedAt = record
-
-                    self.table.setItem(row_idx, 0, QTableWidgetItem(str(appId)))
-                    self.table.setItem(row_idx, 1, QTableWidgetItem(str(petId)))
-                    self.table.setItem(row_idx, 2, QTableWidgetItem(petName))
-                    self.table.setItem(row_idx, 3, QTableWidgetItem(adopterName))
-                    self.table.setItem(row_idx, 4, QTableWidgetItem(adopterEmail))
-                    self.table.setItem(row_idx, 5, QTableWidgetItem(adopterPhone))
-                    self.table.setItem(row_idx, 6, QTableWidgetItem(appStatus))
-                    self.table.setItem(row_idx, 7, QTableWidgetItem(str(submittedAt)))
-
-                    view_btn = QPushButton("View")
-                    view_btn.clicked.connect(lambda checked, a=appId: self.view_application(a))
-                    self.table.setCellWidget(row_idx, 8, view_btn)
-
-                    approve_btn = QPushButton("Approve")
-                    approve_btn.clicked.connect(lambda checked, a=appId, p=petId: self.approve_application(a, p))
-                    self.table.setCellWidget(row_idx, 9, approve_btn)
-
-                    deny_btn = QPushButton("Deny")
-                    deny_btn.clicked.connect(lambda checked, a=appId, p=petId: self.deny_application(a, p))
-                    self.table.setCellWidget(row_idx, 10, deny_btn)
-        except Error as e:
+        self.debounce.stop()
+        self.filters = self.read_filters()
+        self.model.clear()
+        self.fetch_page(None)
+
+    def load_more(self):
+        if self.next_token:
+            self.fetch_page(self.next_token)
+
+    def fetch_page(self, token):
+        where, params = application_filter(**self.filters)
+        count_where, count_params = application_filter(**dict(self.filters, status=None))
+        query = KeysetQuery(APPLICATION_COLUMNS, "applications", [("appId", "DESC")], where=where, params=params)
+        store, pool, changes = self.parent_window.store, self.parent_window.pool, self.changes
+        self.more_btn.setEnabled(False)
+
+        def work(task):
+            counts = None
+            if token is None:
+                changes.prime(pool)   # later syncs fetch only what changed after this load
+                counts = store.application_counts(count_where, count_params)
+            page = query.fetch(pool, PAGE_SIZE, token, on_chunk=task.emit_chunk, cancelled=task.is_cancelled)
+            return page, counts
+
+        self.parent_window.executor.submit(
+            (self, "applications"), work,
+            on_result=self.page_loaded, on_error=self.page_failed, on_chunk=self.model.append_rows,
+            label="load_applications",
+        )
+
+    def page_loaded(self, result):
+        page, counts = result
+        if counts is not None:
+            self.counts = counts
+        self.next_token = page.next_token
+        self.more_btn.setEnabled(page.next_token is not None)
+        self.show_counts()
+
+    def page_failed(self, e):
+        if isinstance(e, Error):
             print(f"Database error loading applications: {e}")
-        except Exception as e:
+        else:
             print(f"Error loading applications: {e}")
 
+    def handle_action(self, index):
+        record = self.model.record(index.row())
+        if record is None:
+            return
+        appId, petId = record[:2]
+        action = self.model.action_at(index)
+        if action == "View":
+            self.view_application(appId)
+        elif action == "Approve":
+            self.approve_application(appId, petId)
+        elif action == "Deny":
+            self.deny_application(appId, petId)
+
+    # --- Delta sync ---
+    def sync_applications(self):
+        """Patch in applications changed since the last load or sync"""
+        if not self.changes.available:
+            self.load_applications()
+            return
+        if self.syncing:
+            self.sync_again = True   # never cancel a running poll: its rows are past the watermark
+            return
+        self.syncing = True
+        pool, changes = self.parent_window.pool, self.changes
+        self.parent_window.executor.submit(
+            (self, "sync"), lambda task: changes.poll(pool),
+            on_result=self.applications_synced, on_error=self.sync_failed, label="sync_applications",
+        )
+
+    def sync_failed(self, e):
+        self.syncing = False
+        self.sync_again = False
+        print(f"Could not sync applications: {e}")
+
+    def applications_synced(self, records):
+        self.syncing = False
+        newest = self.model.record(0)[0] if self.model.rowCount() else None
+        # Rows on screen are patched, or dropped once they stop matching the
+        # filters (e.g. approved while the filter shows Submitted).
+        self.model.patch_rows(records, keep=lambda record: application_matches(record, **self.filters))
+        # New applications sort first (appId DESC), so they go in at the top.
+        added = [record for record in records
+                 if (newest is None or record[0] > newest) and application_matches(record, **self.filters)]
+        self.model.prepend_rows(sorted(added, key=lambda r: r[0], reverse=True))
+        if records:
+            self.refresh_counts()
+        if self.sync_again:
+            self.sync_again = False
+            self.sync_applications()
+
+    def refresh_counts(self):
+        where, params = application_filter(**dict(self.filters, status=None))
+        store = self.parent_window.store
+        self.parent_window.executor.submit(
+            (self, "counts"), lambda task: store.application_counts(where, params),
+            on_result=self.counts_loaded, on_error=self.page_failed, label="application_counts",
+        )
+
+    def counts_loaded(self, counts):
+        self.counts = counts
+        self.show_counts()
+
     def view_application(self, app_id):
         try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("""
-                    SELECT appId, petId, petName, adopterName, adopterEmail, adopterPhone,
-                           ownedBefore, awareNeeds, readyCosts, adoptionDate,
-                           ownOtherPets, otherPetsType, livingSituation, fencedYard,
-                           primaryCaregiver, notes, appStatus, submittedAt
-                    FROM applications
-                    WHERE appId = %s
-                """, (app_id,))
-                app_data = cursor.fetchone()
-                cursor.close()
-                if app_data:
-                    ApplicationDetailsWindow(self.parent_window, app_data).exec()
-                else:
-                    print(f"Application {app_id} not found")
+            app_data = self.parent_window.store.get_application(app_id)
+            if app_data:
+                ApplicationDetailsWindow(self.parent_window, app_data).exec()
+            else:
+                print(f"Application {app_id} not found")
         except Error as e:
             print(f"Database error viewing application: {e}")
         except Exception as e:
             print(f"Error viewing application: {e}")
 
     def approve_application(self, app_id, pet_id):
-        try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("UPDATE applications SET appStatus = 'Approved' WHERE appId = %s", (app_id,))
-                cursor.execute("UPDATE pets SET status = 'Adopted' WHERE petId = %s", (pet_id,))
-                self.parent_window.connection.commit()
-                cursor.close()
-                print(f"✓ Application #{app_id} approved. Pet #{pet_id} status set to Adopted.")
-                self.load_applications()
-        except Error as e:
-            print(f"Database error: {e}")
-            if self.parent_window.connection:
-                self.parent_window.connection.rollback()
+        self.decide([(app_id, pet_id, "Approved")])
 
     def deny_application(self, app_id, pet_id):
+        self.decide([(app_id, pet_id, "Denied")])
+
+    def decide_selected(self, decision):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        records = [self.model.record(row) for row in rows]
+        decisions = [(record[0], record[1], decision) for record in records if record is not None]
+        if decisions:
+            self.decide(decisions)
+
+    def decide(self, decisions):
+        """Store a batch of decisions in one transaction, then patch pets and rows that changed"""
         try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("UPDATE applications SET appStatus = 'Denied' WHERE appId = %s", (app_id,))
-                cursor.execute("UPDATE pets SET status = 'Available' WHERE petId = %s", (pet_id,))
-                self.parent_window.connection.commit()
-                cursor.close()
-                print(f"✓ Application #{app_id} denied. Pet #{pet_id} status set back to Available.")
-                self.load_applications()
+            report = self.parent_window.store.decide_applications(decisions)
+        except ValueError as e:
+            print(f"Cannot decide applications: {e}")
+            return
         except Error as e:
             print(f"Database error: {e}")
-            if self.parent_window.connection:
-                self.parent_window.connection.rollback()
+            return
+        print(f"✓ {report.approved} application(s) approved, {report.denied} denied, "
+              f"{report.competing_denied} competing application(s) denied; {len(report.pet_statuses)} pet(s) updated.")
+        for pet_id, status in report.pet_statuses.items():
+            self.parent_window.pet_status_changed(pet_id, status)
+        self.sync_applications()
 
 class ApplicationDetailsWindow(QDialog):
     """Read-only view of a single application"""
@@ -0,0 +1,292 @@
+"""Query benchmark: seed a database with synthetic pets and applications, then
+time the query paths the windows use and report latency percentiles.
+
+    python benchmark.py                              # 1k, 100k and 1M rows in in-memory SQLite
+    python benchmark.py --sizes 1k,100k -o run.json  # write results as JSON
+    python benchmark.py --baseline run.json          # ...and compare against an earlier run
+
+Against MySQL (--db mysql) the pets and applications tables must be empty,
+or pass --reset to DELETE their contents first. Only use a scratch database.
+"""
+import argparse
+import datetime
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+from pet_columns import PetColumns
+from pagination import KeysetQuery
+from pet_model import PetTableModel
+from queries import APPLICATION_COLUMNS, PAGE_SIZE, PET_STATUSES, adoption_fee, available_pets_query, pet_search_query
+from search_index import PetSearchIndex
+from store import APPLICATION_FIELDS, open_store
+
+INSERT_CHUNK = 5000
+
+# --- Synthetic data ---
+NAMES = ["Bella", "Max", "Luna", "Charlie", "Lucy", "Cooper", "Daisy", "Milo", "Bailey", "Coco",
+         "Rocky", "Sadie", "Tucker", "Molly", "Bear", "Lola", "Duke", "Zoe", "Oliver", "Nala",
+         "Jack", "Stella", "Toby", "Ruby", "Oscar", "Penny", "Leo", "Rosie", "Finn", "Ginger"]
+BREEDS = {
+    "dog": ["Labrador", "Husky", "Beagle", "Poodle", "Boxer", "German Shepherd", "Bulldog",
+            "Golden Retriever", "Dachshund", "Chihuahua", "Terrier Mix", "Pit Bull"],
+    "cat": ["Tabby", "Calico", "Siamese", "Maine Coon", "Persian", "Domestic Shorthair",
+            "Bengal", "Ragdoll", "Tuxedo"],
+    "rabbit": ["Lionhead", "Rex", "Dutch", "Mini Lop"],
+    "bird": ["Parakeet", "Cockatiel", "Lovebird"],
+}
+SPECIES_WEIGHTS = [("dog", 45), ("cat", 40), ("rabbit", 10), ("bird", 5)]
+SHELTERS = [f"{city} Animal Shelter" for city in
+            ("Springfield", "Riverside", "Franklin", "Greenville", "Fairview", "Madison", "Clinton",
+             "Salem", "Georgetown", "Arlington", "Ashland", "Dover", "Oxford", "Milton", "Hudson")]
+COMMENTS = ["", "", "Good with kids.", "Needs a quiet home.", "House trained.",
+            "Loves other animals.", "Shy at first.", "Special diet required."]
+
+
+def generate_pets(count, rng):
+    """count pet records (PET_COLUMNS order) with realistic value distributions"""
+    species_names = [s for s, _ in SPECIES_WEIGHTS]
+    species_weights = [w for _, w in SPECIES_WEIGHTS]
+    for pet_id in range(1, count + 1):
+        species = rng.choices(species_names, species_weights)[0]
+        status = rng.choices(PET_STATUSES, (60, 15, 25))[0]
+        yield (pet_id, rng.choice(NAMES), species, rng.choice(BREEDS[species]),
+               min(int(rng.expovariate(1 / 4)), 20), rng.choice(("Male", "Female")),
+               rng.choice(("Small", "Medium", "Large")), rng.choice(SHELTERS),
+               adoption_fee(species), status, rng.choice(COMMENTS))
+
+
+def generate_applications(count, pet_count, rng):
+    """count application rows: APPLICATION_FIELDS plus appStatus and submittedAt"""
+    start = datetime.datetime(2023, 1, 1)
+    yes_no = ("Yes", "No")
+    for i in range(count):
+        pet_id = rng.randint(1, pet_count)
+        submitted = start + datetime.timedelta(seconds=rng.randint(0, 2 * 365 * 86400))
+        name = f"{rng.choice(NAMES)} Adopter{i}"
+        yield (pet_id, rng.choice(NAMES), name, f"adopter{i}@example.com", f"555-{i % 10000:04d}",
+               rng.choice(yes_no), "Yes", "Yes", (submitted + datetime.timedelta(days=14)).date(),
+               rng.choice(yes_no), "", rng.choice(("House", "Apartment", "Condo")), rng.choice(yes_no),
+               name, "", rng.choice(("Submitted", "Approved", "Denied")), submitted)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def populate(store, pet_count, seed, reset=False):
+    """Fill the database with pet_count pets and half as many applications"""
+    counts = [store.pool.fetchone(f"SELECT COUNT(*) FROM {table}")[0] for table in ("pets", "applications")]
+    if any(counts):
+        if not reset:
+            raise SystemExit("The pets/applications tables are not empty; pass --reset to clear them.")
+        store.pool.execute("DELETE FROM applications")
+        store.pool.execute("DELETE FROM pets")
+    rng = random.Random(seed)
+    for chunk in _chunks(generate_pets(pet_count, rng), INSERT_CHUNK):
+        store.upsert_pets(chunk)
+    columns = APPLICATION_FIELDS + ["appStatus", "submittedAt"]
+    insert_sql = (f"INSERT INTO applications ({', '.join(columns)}) "
+                  f"VALUES ({', '.join(['%s'] * len(columns))})")
+    for chunk in _chunks(generate_applications(pet_count // 2, pet_count, rng), INSERT_CHUNK):
+        store.pool.run(lambda cursor: cursor.executemany(insert_sql, chunk), write=True)
+
+
+# --- Timing ---
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def measure(name, size, call, inputs, warmup=1, done=None):
+    """Time call(input) for every input; call returns the number of rows it produced.
+
+    With done, the run ends early once done() is true (e.g. nothing left to scroll).
+    """
+    for value in inputs[:warmup]:
+        call(value)
+    timings, rows = [], 0
+    for value in inputs:
+        if done and done():
+            break
+        started = time.perf_counter()
+        rows += call(value)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "size": size, "path": name, "iterations": len(timings), "rows": rows,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(total / len(timings) * 1000, 3) if timings else 0.0,
+        "rows_per_sec": round(rows / total, 1) if total else 0.0,
+    }
+
+
+def run_paths(store, size, rng, iterations, index_max_rows):
+    """Benchmark each window's query path against a populated store"""
+    pool = store.pool
+    search_terms = ([n.lower() for n in NAMES] + [b.lower() for bs in BREEDS.values() for b in bs]
+                    + ["lab", "hus", "spring", "adopted", "3", "shelter", "ca"])
+    results = []
+
+    # MenuWindow: first page of the pet table, then scrolling further pages in.
+    model = PetTableModel(pool, page_size=PAGE_SIZE)
+
+    def first_page(_):
+        model.reload()
+        return model.rowCount()
+    results.append(measure("load_from_database", size, first_page, [None] * iterations))
+
+    model.reload()
+
+    def next_page(_):
+        before = model.rowCount()
+        model.fetchMore()
+        return model.rowCount() - before
+    results.append(measure("scroll_pets", size, next_page, [None] * iterations,
+                           done=lambda: not model.canFetchMore()))
+
+    # SearchWindow: SQL LIKE fallback, then the in-memory index.
+    def sql_search(term):
+        return len(pet_search_query(term).fetch(pool, PAGE_SIZE, with_total=True).rows)
+    results.append(measure("search_pet_sql", size, sql_search,
+                           [rng.choice(search_terms) for _ in range(iterations)]))
+
+    if size <= index_max_rows:
+        built = []
+
+        def build(_):
+            built[:] = [PetSearchIndex().load(pool)]
+            return len(built[0])
+        results.append(measure("search_index_build", size, build, [None], warmup=0))
+        index = built[0]
+        results.append(measure("search_pet_index", size, lambda term: len(index.search(term)),
+                               [rng.choice(search_terms) for _ in range(iterations)]))
+
+    # AdoptWindow
+    def adopt(criteria):
+        return len(available_pets_query(*criteria).fetch(pool, PAGE_SIZE, with_total=True).rows)
+    species = [s for s, _ in SPECIES_WEIGHTS]
+    criteria = [(rng.choice(species + [""]), rng.choice(["", "lab", "tabby", "rex"]),
+                 rng.choice([None, None, rng.randint(0, 10)])) for _ in range(iterations)]
+    results.append(measure("adopt_search", size, adopt, criteria))
+
+    if size <= index_max_rows:
+        columns = PetColumns().load(pool)
+        ranges = [(species, breed, None if age is None else (age, age + 2), rng.choice([None, (None, 200.0)]))
+                  for species, breed, age in criteria]
+        results.append(measure("adopt_columns", size,
+                               lambda c: len(columns.records(columns.match(*c)[:PAGE_SIZE])), ranges))
+
+    # ApplicantsWindow
+    applications = KeysetQuery(APPLICATION_COLUMNS, "applications", [("appId", "DESC")])
+    results.append(measure("load_applications", size,
+                           lambda _: len(applications.fetch(pool, PAGE_SIZE, with_total=True).rows),
+                           [None] * iterations))
+
+    # SubmitApplicationWindow (writes: each submission makes one pet Pending)
+    available = [row[0] for row in pool.fetchall(
+        "SELECT petId FROM pets WHERE status = 'Available' ORDER BY petId LIMIT %s", (iterations + 1,))]
+
+    def submit(pet_id):
+        values = (pet_id, "Bench", "Bench Adopter", "bench@example.com", "555-0000", "Yes", "Yes",
+                  "Yes", datetime.date(2026, 1, 1), "No", "", "House", "Yes", "Bench Adopter", "")
+        store.submit_application(values)
+        return 1
+    # Warm up on a pet of its own: re-submitting a claimed pet would time the "no longer available" path.
+    submit(available[0])
+    results.append(measure("submit_application", size, submit, available[1:], warmup=0))
+    return results
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def compare(results, baseline_path, threshold):
+    """Print p95 changes against an earlier run; returns the number of regressions"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["size"], r["path"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (p95):")
+    for result in results:
+        old = baseline.get((result["size"], result["path"]))
+        if not old or not old["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"  {result['size']:>9} {result['path']:<20} {old['p95_ms']:>10.3f} -> "
+              f"{result['p95_ms']:>10.3f} ms ({change:+.0f}%){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pet adoption query paths")
+    parser.add_argument("--sizes", default="1k,100k,1m", help="comma-separated pet counts (default 1k,100k,1m)")
+    parser.add_argument("--db", default="sqlite:", help='store URL (default in-memory SQLite; "mysql" for MySQL)')
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--index-max-rows", type=int, default=200000,
+                        help="skip the in-memory search index above this many pets")
+    parser.add_argument("--reset", action="store_true", help="delete existing pets and applications first")
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="p95 slowdown in percent that counts as a regression (default 20)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "meta": {"started": datetime.datetime.now().isoformat(timespec="seconds"), "db": args.db,
+                 "seed": args.seed, "iterations": args.iterations, "python": platform.python_version(),
+                 "platform": platform.platform()},
+        "setup": [], "results": [],
+    }
+    print(f"{'size':>9} {'path':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rows/sec':>11}")
+    for size in sizes:
+        store = open_store(args.db)
+        try:
+            started = time.perf_counter()
+            populate(store, size, args.seed, reset=args.reset or bool(report["setup"]))
+            seconds = time.perf_counter() - started
+            report["setup"].append({"size": size, "populate_s": round(seconds, 2),
+                                    "rows_per_sec": round(size * 1.5 / seconds, 1)})
+            results = run_paths(store, size, random.Random(args.seed), args.iterations, args.index_max_rows)
+        finally:
+            store.close()
+        for r in results:
+            print(f"{r['size']:>9} {r['path']:<20} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+                  f"{r['p99_ms']:>9.3f} {r['rows_per_sec']:>11.0f}")
+        report["results"].extend(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.baseline and compare(report["results"], args.baseline, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+from mysql.connector import Error
+
+from db import is_connection_lost
+from queries import PET_STATUSES, adoption_fee
+
+CHUNK_SIZE = 500
+
+# Column -> (required, max length) for the text columns of the pets table
+TEXT_LIMITS = {
+    "petName": (True, 100), "species": (True, 50), "breed": (True, 100),
+    "gender": (False, 20), "size": (False, 20), "shelter": (False, 100),
+}
+
+class ImportReport:
+    """Running totals for one import; errors are (line number, message) pairs"""
+    def __init__(self, path):
+        self.path = path
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    @property
+    def written(self):
+        return self.inserted + self.updated
+
+    @property
+    def rows_per_second(self):
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        text = (f"{self.read} row(s) read: {self.inserted} inserted, {self.updated} updated, "
+                f"{len(self.errors)} rejected in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/sec)")
+        return text + (" — cancelled" if self.cancelled else "")
+
+
+# --- Reading and validation ---
+def read_rows(path):
+    """Yield (line number, dict) for each row of a .csv or .jsonl file.
+
+    A JSONL line that is not a JSON object is yielded as (line number, error
+    message) so it can be reported alongside validation errors.
+    """
+    if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson", ".json"):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_no, f"Invalid JSON: {e}"
+                    continue
+                yield line_no, row if isinstance(row, dict) else "Expected a JSON object"
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def validate_pet(row):
+    """Turn one input row into a pets record (PET_COLUMNS order) or raise ValueError.
+
+    Column names are matched case-insensitively. The same rules as the register
+    form apply: ID and age must be numbers, name/species/breed are required and
+    the adoption fee always comes from the species.
+    """
+    fields = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+
+    def text(column):
+        value = fields.get(column.lower())
+        return "" if value is None else str(value).strip()
+
+    try:
+        petId = int(text("petId"))
+        age = int(text("age"))
+    except ValueError:
+        raise ValueError("petId and age must be numbers")
+
+    values = {}
+    for column, (required, limit) in TEXT_LIMITS.items():
+        value = text(column)
+        if required and not value:
+            raise ValueError(f"{column} is required")
+        if len(value) > limit:
+            raise ValueError(f"{column} is longer than {limit} characters")
+        values[column] = value
+    species = values["species"].lower()
+
+    status = text("status").capitalize() or "Available"
+    if status not in PET_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(PET_STATUSES)}")
+
+    return (petId, values["petName"], species, values["breed"], age, values["gender"],
+            values["size"], values["shelter"], Decimal(f"{adoption_fee(species):.2f}"), status,
+            text("comments"))
+
+
+# --- Writing ---
+def _flush(store, chunk, report):
+    """Write one chunk of (line number, record) pairs in a single transaction; returns the records written.
+
+    If the batch is rejected, the rows are retried one at a time so only the
+    bad rows are reported and the rest still get written.
+    """
+    # A petId repeated within a chunk: the last occurrence wins, as it would row by row.
+    latest = {}
+    for line_no, record in chunk:
+        latest[record[0]] = (line_no, record)
+    chunk = list(latest.values())
+    try:
+        existing = store.upsert_pets([r for _, r in chunk])
+        written = chunk
+    except Error as e:
+        if is_connection_lost(e):
+            raise
+        existing, written = set(), []
+        for line_no, record in chunk:
+            try:
+                existing |= store.upsert_pets([record])
+                written.append((line_no, record))
+            except Error as row_error:
+                if is_connection_lost(row_error):
+                    raise
+                report.errors.append((line_no, f"Database error: {row_error}"))
+    for _, record in written:
+        if record[0] in existing:
+            report.updated += 1
+        else:
+            report.inserted += 1
+    return [record for _, record in written]
+
+
+def import_pets(store, path, chunk_size=CHUNK_SIZE, on_progress=None, cancelled=None, on_written=None):
+    """Validate and upsert every pet in a CSV/JSONL file; returns an ImportReport.
+
+    Rows are written chunk_size at a time with one multi-row upsert per
+    transaction (store.upsert_pets), so an existing petId is updated and a
+    new one inserted. Invalid rows are skipped and listed in report.errors.
+    Only counts and errors are kept: on_written(records) gets the records of
+    each chunk once it is committed, so memory does not grow with the file.
+    on_progress(report) is called after every chunk and cancelled() is polled
+    between chunks; chunks already committed stay written, and the report
+    returned then covers them with report.cancelled set.
+    """
+    report = ImportReport(path)
+
+    def flush(chunk):
+        records = _flush(store, chunk, report)
+        if records and on_written:
+            on_written(records)
+
+    chunk = []
+    for line_no, row in read_rows(path):
+        report.read += 1
+        if isinstance(row, str):
+            report.errors.append((line_no, row))
+            continue
+        try:
+            chunk.append((line_no, validate_pet(row)))
+        except ValueError as e:
+            report.errors.append((line_no, str(e)))
+            continue
+        if len(chunk) >= chunk_size:
+            if cancelled and cancelled():
+                report.cancelled = True
+                chunk = []
+                break
+            flush(chunk)
+            chunk = []
+            report.elapsed = time.perf_counter() - report.started
+            if on_progress:
+                on_progress(report)
+    if chunk:
+        flush(chunk)
+    report.elapsed = time.perf_counter() - report.started
+    if on_progress:
+        on_progress(report)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from store import open_store
+
+    parser = argparse.ArgumentParser(description="Bulk import pets from a CSV or JSONL file")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--db", help='e.g. "sqlite:pets.db" (default: $PETADOPTION_DB, else MySQL)')
+    args = parser.parse_args()
+
+    store = open_store(args.db)
+    try:
+        result = import_pets(store, args.path, args.chunk_size,
+                             on_progress=lambda r: print(f"... {r.written} written", end="\r"))
+    except (OSError, Error) as e:
+        print(f"Import failed: {e}")
+        sys.exit(1)
+    finally:
+        store.close()
+    for line_no, message in result.errors:
+        print(f"Line {line_no}: {message}")
+    print(result.summary())
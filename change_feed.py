@@ -0,0 +1,91 @@
+import datetime
+import threading
+
+from mysql.connector import Error, errorcode
+
+from statements import prepared
+
+
+def _as_datetime(value):
+    if isinstance(value, str):   # SQLite hands back MAX() results as text
+        return datetime.datetime.fromisoformat(value)
+    return value
+
+
+class ChangeFeed:
+    """Rows of one table that changed since the last poll, found by updatedAt.
+
+    The watermark is the newest updatedAt seen so far. Each poll reads rows
+    with updatedAt >= watermark - lag: the lag covers transactions that took
+    their timestamp before a poll but committed after it, and rows already
+    delivered with the same updatedAt are skipped. Against a database without
+    the updatedAt column the feed switches itself off (available = False) and
+    callers fall back to reloading.
+    """
+    def __init__(self, table, columns, key, lag=5.0):
+        self.table = table
+        self.columns = list(columns)
+        self.key = key
+        self.key_position = self.columns.index(key)
+        self.lag = datetime.timedelta(seconds=lag)
+        self.watermark = None
+        self.available = True
+        self._delivered = {}   # key -> updatedAt of the version last handed out
+        self._lock = threading.RLock()
+        self._poll_sql = prepared(f"SELECT {', '.join(self.columns)}, updatedAt FROM {table} "
+                                  f"WHERE updatedAt >= %s ORDER BY updatedAt, {key}")
+
+    def _disable(self, e):
+        if getattr(e, "errno", None) == errorcode.ER_BAD_FIELD_ERROR:
+            self.available = False
+            print(f"{self.table}.updatedAt is missing; views will reload instead of syncing "
+                  f"(see README for the ALTER TABLE statement).")
+            return True
+        return False
+
+    def prime(self, pool):
+        """Start from the newest change already in the table"""
+        with self._lock:
+            self._prime(pool)
+
+    def _prime(self, pool):
+        try:
+            row = pool.fetchone(f"SELECT MAX(updatedAt) FROM {self.table}")
+        except Error as e:
+            if not self._disable(e):
+                raise
+            return
+        self.watermark = _as_datetime(row[0]) if row and row[0] is not None else datetime.datetime(1970, 1, 1)
+        self._delivered.clear()
+
+    def poll(self, pool):
+        """Rows (in columns order) inserted or updated since the last poll"""
+        with self._lock:
+            return self._poll(pool)
+
+    def _poll(self, pool):
+        if not self.available:
+            return []
+        if self.watermark is None:
+            self._prime(pool)
+            return []
+        since = self.watermark - self.lag
+        try:
+            rows = pool.fetchall(self._poll_sql, (since,))
+        except Error as e:
+            if not self._disable(e):
+                raise
+            return []
+        changed = []
+        for row in rows:
+            key, updated_at = row[self.key_position], _as_datetime(row[-1])
+            if self._delivered.get(key) == updated_at:
+                continue
+            self._delivered[key] = updated_at
+            changed.append(tuple(row[:-1]))
+            if updated_at > self.watermark:
+                self.watermark = updated_at
+        # Only versions still inside the lag window can be read again.
+        cutoff = self.watermark - self.lag
+        self._delivered = {k: t for k, t in self._delivered.items() if t >= cutoff}
+        return changed
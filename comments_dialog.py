@@ -41,21 +41,11 @@ class PetCommentsDialog(QDialog):
     def save_comments(self):
         new_comments = self.comments_edit.toPlainText().strip()
         try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute(
-                    "UPDATE pets SET comments = %s WHERE petId = %s",
-                    (new_comments, self.pet_id)
-                )
-                self.parent_window.connection.commit()
-                cursor.close()
-                print(f"✓ Comments updated successfully for pet '{self.pet_name}' (ID: {self.pet_id})")
-                self.accept()
-            else:
-                print("Error: No database connection")
+            self.parent_window.store.set_pet_comments(self.pet_id, new_comments)
+            print(f"✓ Comments updated successfully for pet '{self.pet_name}' (ID: {self.pet_id})")
+            self.parent_window.pet_comments_changed(self.pet_id, new_comments)
+            self.accept()
         except Error as e:
             print(f"Database error updating comments: {e}")
-            if self.parent_window.connection:
-                self.parent_window.connection.rollback()
         except Exception as e:
             print(f"Error updating comments: {e}")
@@ -1,24 +1,693 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+
+from metrics import METRICS, InstrumentedCursor
+from statements import is_prepared
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'PetAdoptionDB',  # <--- Name of your local database
+    'user': 'root',
+    'password': '',  # <-- Place Database Password here
+}
+
+
+def _open_connection():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    # Pooled connections run in autocommit so plain reads never leave a
+    # transaction (and its snapshot) open; writes go through run(write=True).
+    conn.autocommit = True
+    return conn
+
+
+def print_connection_help(e):
+    print(f"Error connecting to MySQL: {e}")
+    print("Please check:")
+    print("1. MySQL server is running")
+    print("2. Database 'PetAdoptionDB' exists")
+    print("3. Username and password are correct")
+
+
+# Errors meaning the connection itself is gone; the statement never ran (or its
+# transaction was rolled back by the server), so it is safe to retry elsewhere.
+LOST_CONNECTION_ERRORS = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+    errorcode.CR_CONN_HOST_ERROR,
+    errorcode.CR_CONNECTION_ERROR,
+    4031,  # ER_CLIENT_INTERACTION_TIMEOUT (MySQL 8.0.24+)
+}
+
+
+def is_connection_lost(error):
+    return getattr(error, 'errno', None) in LOST_CONNECTION_ERRORS
+
+
+class PoolTimeout(Error):
+    """Raised when no pooled connection frees up within the checkout timeout"""
+
+
+class CircuitOpenError(Error):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fails fast after repeated connection failures.
+
+    closed -> open after failure_threshold consecutive failures; open -> half-open
+    once reset_timeout has passed, letting one trial call through; the trial's
+    outcome closes or re-opens the circuit.
+    """
+    def __init__(self, failure_threshold=3, reset_timeout=15.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return
+            now = time.monotonic()
+            # A trial that never reported back (e.g. a checkout timeout) expires.
+            if state == 'half-open' and (self._trial_started is None
+                                         or now - self._trial_started >= self.reset_timeout):
+                self._trial_started = now
+                return
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(msg=f"Database unavailable; retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
 
-def get_connection():
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_started is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_started = None
+
+
+class StatementCache:
+    """Server-side prepared statements of one connection, keyed by SQL.
+
+    Each registered statement gets its own prepared cursor, so executing it
+    again only sends the parameters. At most max_size statements stay
+    prepared; the least recently used one is deallocated to make room.
+    """
+    def __init__(self, conn, max_size=32):
+        self.conn = conn
+        self.max_size = max_size
+        self._cursors = OrderedDict()   # sql -> (sql, prepared cursor)
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, sql):
+        """(sql, cursor) to execute with; the cached sql object is reused so the cursor sees the same statement"""
+        entry = self._cursors.get(sql)
+        if entry is not None:
+            self._cursors.move_to_end(sql)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = self._cursors[sql] = (sql, self.conn.cursor(prepared=True))
+        while len(self._cursors) > self.max_size:
+            _, (_, cursor) = self._cursors.popitem(last=False)
+            self.evictions += 1
+            _close_cursor(cursor)
+        return entry
+
+    def close(self):
+        for _, cursor in self._cursors.values():
+            _close_cursor(cursor)
+        self._cursors.clear()
+
+
+def _close_cursor(cursor):
     try:
-        conn = mysql.connector.connect(
-            host='localhost',
-            database='PetAdoptionDB', # <--- Name of your local database
-            user='root',
-            password=''  # <-- Place Database Password here
-        )
-        if conn.is_connected():
-            print("Connected to PetAdoptionDB database successfully!")
+        cursor.close()
+    except Exception:
+        pass
+
+
+class PreparingCursor:
+    """Cursor that runs registered statements (see statements.py) as prepared
+    statements from the connection's StatementCache and anything else on a
+    plain cursor. A prepared result that was not read to the end is drained
+    before the next statement, as the connection requires.
+    """
+    def __init__(self, conn, cache):
+        self._conn = conn
+        self._cache = cache
+        self._plain = conn.cursor()
+        self._current = self._plain
+
+    def _drain(self):
+        if self._current is not self._plain and getattr(self._conn, "unread_result", False):
+            try:
+                self._current.fetchall()
+            except Error:
+                pass
+
+    def execute(self, sql, params=()):
+        self._drain()
+        if is_prepared(sql):
+            sql, self._current = self._cache.get(sql)
+            return self._current.execute(sql, tuple(params))
+        self._current = self._plain
+        return self._plain.execute(sql, params)
+
+    def executemany(self, sql, seq_params):
+        self._drain()
+        self._current = self._plain
+        return self._plain.executemany(sql, seq_params)
+
+    def fetchone(self):
+        return self._current.fetchone()
+
+    def fetchmany(self, size):
+        return self._current.fetchmany(size)
+
+    def fetchall(self):
+        return self._current.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._current.rowcount
+
+    @property
+    def description(self):
+        return self._current.description
+
+    def close(self):
+        self._drain()
+        self._plain.close()
+
+
+class ReconnectingCursor:
+    """Cursor of ConnectionPool.cursor(); checks a connection out on first use.
+
+    execute() moves to a fresh connection when the current one is lost, up to
+    pool.retries times, as long as no row has been fetched through it yet.
+    """
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+        self._cursor = None
+        self._fetched = False
+
+    def execute(self, sql, params=()):
+        attempt = 0
+        while True:
+            if self._conn is None:
+                self._conn = self._pool.acquire()
+                self._cursor = self._pool._cursor(self._conn)
+            try:
+                return self._cursor.execute(sql, params)
+            except Error as e:
+                if not is_connection_lost(e) or self._fetched or attempt >= self._pool.retries:
+                    raise
+                self.finish(lost=True)
+                attempt += 1
+                self._pool._pause_before_retry(attempt)
+
+    def _rows(self, rows):
+        if rows:
+            self._fetched = True
+        return rows
+
+    def fetchone(self):
+        return self._rows(self._cursor.fetchone())
+
+    def fetchmany(self, size):
+        return self._rows(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def finish(self, lost=False, answered=True):
+        """Close the cursor and check its connection back in (discarded if lost)"""
+        if self._conn is None:
+            return
+        conn, cursor = self._conn, self._cursor
+        self._conn = self._cursor = None
+        if not lost:
+            try:
+                cursor.close()
+            except Error:
+                lost = True
+        if lost:
+            self._pool.breaker.record_failure()
+        elif answered:
+            self._pool.breaker.record_success()
+        self._pool.release(conn, discard=lost)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of MySQL connections.
+
+    Each operation checks a connection out, uses it and checks it back in, so
+    dialogs and background work never share a connection at the same time.
+    Idle connections are only pinged when they have sat unused for longer than
+    liveness_interval; otherwise they are handed out without a round trip.
+    Every connection keeps a StatementCache of up to statement_cache_size
+    prepared statements for the SQL registered in statements.py. Every
+    maintenance_interval seconds a daemon thread closes connections idle past
+    idle_timeout (down to min_size) and pings the others, dropping dead ones.
+    """
+    def __init__(self, connect=None, max_size=5, min_size=1, idle_timeout=300.0, checkout_timeout=10.0,
+                 liveness_interval=30.0, retries=2, backoff=0.1, max_backoff=2.0, breaker=None, metrics=None,
+                 statement_cache_size=32, maintenance_interval=60.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect or _open_connection
+        self.max_size = max_size
+        self.min_size = min_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.liveness_interval = liveness_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or METRICS
+        self.statement_cache_size = statement_cache_size
+
+        self._cond = threading.Condition()
+        self._idle = deque()          # (conn, last_used) pairs, most recently used on the right
+        self._in_use = set()
+        self._opening = 0
+        self._closed = False
+        self._statements = {}         # conn -> StatementCache
+        self._retired = {'hits': 0, 'misses': 0, 'evictions': 0}   # totals of caches already closed
+        self._stats = {
+            'created': 0, 'closed': 0, 'checkouts': 0, 'waits': 0,
+            'wait_time': 0.0, 'timeouts': 0, 'evicted': 0, 'discarded': 0, 'peak_in_use': 0,
+            'liveness_checks': 0, 'reconnects': 0, 'retries': 0,
+        }
+        self._stopped = threading.Event()
+        if maintenance_interval:
+            threading.Thread(target=self._maintain, args=(maintenance_interval,),
+                             name="pool-maintenance", daemon=True).start()
+
+    # --- Sizing ---
+    def _total(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def prefill(self):
+        """Open connections up to min_size; returns the number opened"""
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._total() >= self.min_size:
+                    return opened
+                self._opening += 1
+            try:
+                self.breaker.allow()
+                conn = self._open()
+            finally:
+                with self._cond:
+                    self._opening -= 1
+            with self._cond:
+                self._stats['created'] += 1
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+            opened += 1
+
+    # --- Checkout / checkin ---
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Error:
+            self.breaker.record_failure()
+            raise
         return conn
+
+    def acquire(self, timeout=None):
+        self.breaker.allow()
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            conn, last_used = self._checkout(timeout, deadline)
+            if conn is None:
+                break
+            if time.monotonic() - last_used <= self.liveness_interval:
+                return self._mark_in_use(conn)
+            # Long idle: the server may have dropped it (wait_timeout), so check once.
+            with self._cond:
+                self._stats['liveness_checks'] += 1
+            if self._ping(conn):
+                return self._mark_in_use(conn)
+            with self._cond:
+                self._opening -= 1
+                self._stats['discarded'] += 1
+                self._stats['reconnects'] += 1
+                self._cond.notify()
+            self._close_all([conn])
+
+        try:
+            conn = self._open()
+        except BaseException:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['created'] += 1
+        return self._mark_in_use(conn)
+
+    def _checkout(self, timeout, deadline):
+        """Pop an idle (conn, last_used) or reserve a slot for a new one (None, None)"""
+        waited_from = None
+        stale = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise Error(msg="Connection pool is closed")
+                self._collect_idle(stale)
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._total() < self.max_size:
+                    conn = last_used = None
+                    break
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self._stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(msg=f"No database connection available within {timeout:.1f}s")
+                self._cond.wait(remaining)
+            # Counted as "opening" until it is marked in use or discarded.
+            self._opening += 1
+            if waited_from is not None:
+                self._stats['wait_time'] += time.monotonic() - waited_from
+        self._close_all(stale)
+        return conn, last_used
+
+    def _mark_in_use(self, conn):
+        with self._cond:
+            self._opening -= 1
+            self._in_use.add(conn)
+            self._stats['checkouts'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], len(self._in_use))
+        return conn
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                # A caller that bailed out mid-transaction must not leak it to the next user.
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use.discard(conn)
+            if discard:
+                self._stats['discarded'] += 1
+            if not (discard or self._closed):
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            self._close_all([conn])
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except Error as e:
+            lost = is_connection_lost(e)
+            if lost:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            self.release(conn, discard=lost)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.breaker.record_success()
+            self.release(conn)
+
+    @contextmanager
+    def cursor(self):
+        """Yield a cursor on a checked-out connection (autocommit), for reads streamed with fetchmany.
+
+        Like run(), a statement whose connection turns out to be lost is re-run
+        on a fresh connection with backoff, but only until the first row has
+        been fetched: after that the caller has rows it would otherwise see twice,
+        so the error is raised.
+        """
+        cursor = ReconnectingCursor(self)
+        try:
+            yield cursor
+        except Error as e:
+            cursor.finish(lost=is_connection_lost(e))
+            raise
+        except BaseException:
+            cursor.finish(answered=False)
+            raise
+        else:
+            cursor.finish()
+
+    def run(self, work, write=False):
+        """Call work(cursor) on a pooled connection and return its result.
+
+        If the connection turns out to be lost, the connection is discarded and
+        the call is retried on a fresh one with exponential backoff. With
+        write=True the work runs in a transaction; a failure during COMMIT itself
+        is never retried because the outcome is unknown.
+        """
+        attempt = 0
+        while True:
+            conn = self.acquire()
+            committing = False
+            try:
+                if write:
+                    conn.start_transaction()
+                cursor = self._cursor(conn)
+                try:
+                    result = work(cursor)
+                finally:
+                    cursor.close()
+                if write:
+                    committing = True
+                    conn.commit()
+            except Error as e:
+                lost = is_connection_lost(e)
+                if write and not lost:
+                    self._rollback_quietly(conn)
+                self.release(conn, discard=lost)
+                if not lost:
+                    # The server answered, so it is up even though the statement failed.
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if committing or attempt >= self.retries:
+                    raise
+                attempt += 1
+                self._pause_before_retry(attempt)
+                continue
+            except BaseException:
+                if write:
+                    self._rollback_quietly(conn)
+                self.release(conn)
+                raise
+            self.breaker.record_success()
+            self.release(conn)
+            return result
+
+    def _pause_before_retry(self, attempt):
+        with self._cond:
+            self._stats['retries'] += 1
+        time.sleep(min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def _cursor(self, conn):
+        """Instrumented cursor on conn that prepares registered statements"""
+        with self._cond:
+            cache = self._statements.get(conn)
+            if cache is None:
+                cache = self._statements[conn] = StatementCache(conn, self.statement_cache_size)
+        return InstrumentedCursor(PreparingCursor(conn, cache), self.metrics)
+
+    def fetchall(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        return self.run(work)
+
+    def fetchone(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        return self.run(work)
+
+    def execute(self, sql, params=()):
+        """Run a single write statement in its own transaction; returns rowcount"""
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.rowcount
+        return self.run(work, write=True)
+
+    # --- Maintenance ---
+    def _collect_idle(self, out):
+        """Move connections idle past idle_timeout (beyond min_size) into out; lock held"""
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < cutoff and self._total() > self.min_size:
+            conn, _ = self._idle.popleft()
+            out.append(conn)
+            self._stats['evicted'] += 1
+
+    def evict_idle(self):
+        """Close connections that have sat idle longer than idle_timeout"""
+        stale = []
+        with self._cond:
+            self._collect_idle(stale)
+        self._close_all(stale)
+        return len(stale)
+
+    def health_check(self):
+        """Ping every idle connection, dropping the dead ones; returns (alive, dropped)"""
+        with self._cond:
+            candidates = list(self._idle)
+            self._idle.clear()
+            self._opening += len(candidates)   # keep them counted while outside the lock
+        alive, dead = [], []
+        for conn, last_used in candidates:
+            (alive if self._ping(conn) else dead).append((conn, last_used))
+        with self._cond:
+            self._opening -= len(candidates)
+            self._idle.extend(sorted(alive, key=lambda item: item[1]))
+            self._stats['discarded'] += len(dead)
+            self._cond.notify_all()
+        self._close_all(conn for conn, _ in dead)
+        return len(alive), len(dead)
+
+    def _maintain(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.evict_idle()
+                self.health_check()
+            except Exception as e:
+                print(f"Connection pool maintenance failed: {e}")
+
+    def statistics(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(size=self._total(), idle=len(self._idle), in_use=len(self._in_use),
+                         max_size=self.max_size)
+            prepared = dict(self._retired)
+            for cache in self._statements.values():
+                prepared['hits'] += cache.hits
+                prepared['misses'] += cache.misses
+                prepared['evictions'] += cache.evictions
+        lookups = prepared['hits'] + prepared['misses']
+        stats.update({f"prepared_{key}": value for key, value in prepared.items()})
+        stats['prepared_hit_rate'] = round(prepared['hits'] / lookups, 3) if lookups else 0.0
+        stats['circuit'] = self.breaker.state
+        return stats
+
+    def close(self):
+        self._stopped.set()
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(idle)
+
+    # --- Helpers ---
+    @staticmethod
+    def _ping(conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _rollback_quietly(conn):
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _close_all(self, conns):
+        count = 0
+        for conn in conns:
+            with self._cond:
+                cache = self._statements.pop(conn, None)
+                if cache is not None:
+                    self._retired['hits'] += cache.hits
+                    self._retired['misses'] += cache.misses
+                    self._retired['evictions'] += cache.evictions
+            if cache is not None:
+                cache.close()
+            self._close_quietly(conn)
+            count += 1
+        if count:
+            with self._cond:
+                self._stats['closed'] += count
+
+
+def get_pool(max_size=5, min_size=1, prefill=True):
+    """Create the application pool; with prefill, open its first connection now.
+
+    Without prefill nothing touches the network until the first query (or an
+    explicit pool.prefill(), e.g. from a background thread).
+    """
+    pool = ConnectionPool(max_size=max_size, min_size=min_size)
+    if not prefill:
+        return pool
+    try:
+        pool.prefill()
+        print("Connected to PetAdoptionDB database successfully!")
     except Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        print("Please check:")
-        print("1. MySQL server is running")
-        print("2. Database 'PetAdoptionDB' exists")
-        print("3. Username and password are correct")
-        return None
+        print_connection_help(e)
     except Exception as e:
         print(f"Unexpected error: {e}")
-        return None
+    return pool
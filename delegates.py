@@ -0,0 +1,105 @@
+from PyQt6.QtCore import Qt, QEvent, QModelIndex, QPersistentModelIndex, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (
+    QApplication, QComboBox, QStyle, QStyledItemDelegate, QStyleOptionButton, QStyleOptionComboBox
+)
+
+
+def _style(option):
+    return option.widget.style() if option.widget is not None else QApplication.style()
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Draws a cell's text as a push button and emits clicked(index) when it is pressed.
+
+    Nothing is created per row: the button is only painted, and the view hands
+    mouse and key events for the cell to editorEvent(). Cells without text are
+    drawn as plain cells.
+    """
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = QPersistentModelIndex()
+
+    def paint(self, painter, option, index):
+        text = index.data()
+        if not text:
+            super().paint(painter, option, index)
+            return
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = str(text)
+        button.state = QStyle.StateFlag.State_Enabled
+        if self._pressed.isValid() and QModelIndex(self._pressed) == index:
+            button.state |= QStyle.StateFlag.State_Sunken
+        else:
+            button.state |= QStyle.StateFlag.State_Raised
+        _style(option).drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if not index.data():
+            return False
+        kind = event.type()
+        if kind in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonDblClick):
+            if event.button() == Qt.MouseButton.LeftButton:
+                self._pressed = QPersistentModelIndex(index)
+                return True
+        elif kind == QEvent.Type.MouseButtonRelease:
+            pressed, self._pressed = self._pressed, QPersistentModelIndex()
+            if (event.button() == Qt.MouseButton.LeftButton and pressed.isValid()
+                    and QModelIndex(pressed) == index and option.rect.contains(event.position().toPoint())):
+                self.clicked.emit(index)
+            return True
+        elif kind == QEvent.Type.KeyPress and event.key() in (Qt.Key.Key_Space, Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.clicked.emit(index)
+            return True
+        return False
+
+
+class ComboBoxDelegate(QStyledItemDelegate):
+    """Draws a cell as a drop-down and edits it with a QComboBox of the given items.
+
+    Only the cell being edited has a live combo box. Picking an item emits
+    chosen(index, text) instead of writing the model, so the window can save
+    the change first and patch the row once it is stored.
+    """
+    chosen = pyqtSignal(QModelIndex, str)
+
+    def __init__(self, items, parent=None):
+        super().__init__(parent)
+        self.items = list(items)
+
+    def paint(self, painter, option, index):
+        text = index.data()
+        if not text:
+            super().paint(painter, option, index)
+            return
+        style = _style(option)
+        combo = QStyleOptionComboBox()
+        combo.rect = option.rect.adjusted(2, 2, -2, -2)
+        combo.currentText = str(text)
+        combo.state = QStyle.StateFlag.State_Enabled
+        style.drawComplexControl(QStyle.ComplexControl.CC_ComboBox, combo, painter, option.widget)
+        style.drawControl(QStyle.ControlElement.CE_ComboBoxLabel, combo, painter, option.widget)
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(self.items)
+        editor.activated.connect(lambda _: self._commit(editor))
+        QTimer.singleShot(0, editor.showPopup)
+        return editor
+
+    def _commit(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QStyledItemDelegate.EndEditHint.NoHint)
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(str(index.data() or ""))
+
+    def setModelData(self, editor, model, index):
+        text = editor.currentText()
+        if text != index.data():
+            self.chosen.emit(QModelIndex(index), text)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
@@ -0,0 +1,96 @@
+from collections import Counter
+
+from loadable_index import LoadableIndex
+from queries import PET_COLUMNS
+
+FACETS = ("species", "breed", "shelter", "size", "status")
+COLUMNS = ["petId"] + list(FACETS)
+POSITIONS = tuple(PET_COLUMNS.index(facet) for facet in FACETS)   # in a PET_COLUMNS record
+STATUS = FACETS.index("status")   # position of status in a pet's facet values
+
+
+class FacetCounts(LoadableIndex):
+    """Live pet counts per species, breed, shelter, size and status.
+
+    Counts are kept per (value, status) so "how many huskies are Available"
+    and "how many huskies are there" are both dictionary lookups. Every pet's
+    facet values are remembered, so a write only moves that one pet between
+    counters instead of re-counting with a GROUP BY.
+
+    load() reads only the facet columns; the LoadableIndex write hooks keep
+    the counts current afterwards.
+    """
+    COLUMNS = COLUMNS
+    PAGE_SIZE = 5000
+
+    def __init__(self):
+        super().__init__()
+        self._pets = {}                                   # petId -> facet values (FACETS order)
+        self._counts = {facet: Counter() for facet in FACETS}   # facet -> (value, status) -> pets
+
+    def __len__(self):
+        return len(self._pets)
+
+    # --- Building ---
+    def _load_row(self, row):
+        self._set(row[0], tuple(str(value or "") for value in row[1:]))
+
+    def _set(self, pet_id, values):
+        old = self._pets.get(pet_id)
+        if old == values:
+            return
+        if old is not None:
+            self._count(old, -1)
+        if values is None:
+            self._pets.pop(pet_id, None)
+        else:
+            self._pets[pet_id] = values
+            self._count(values, 1)
+
+    def _count(self, values, step):
+        status = values[STATUS]
+        for facet, value in zip(FACETS, values):
+            counts = self._counts[facet]
+            counts[(value, status)] += step
+            if not counts[(value, status)]:
+                del counts[(value, status)]
+
+    # --- Incremental updates ---
+    def _upsert(self, record):
+        self._set(record[0], tuple(str(record[position] or "") for position in POSITIONS))
+
+    def _remove(self, pet_id):
+        self._set(pet_id, None)
+
+    def _update(self, pet_id, column, value):
+        values = self._pets.get(pet_id)
+        if column != "status" or values is None:
+            return False   # comments are not a facet
+        self._set(pet_id, values[:STATUS] + (value,))
+        return True
+
+    # --- Querying ---
+    def counts(self, facet, status=None):
+        """{value: pets} for facet, only counting pets with status if given"""
+        totals = Counter()
+        with self._lock:
+            for (value, pet_status), pets in self._counts[facet].items():
+                if status is None or pet_status == status:
+                    totals[value] += pets
+        return totals
+
+    def top(self, facet, text="", status=None, limit=5, any_word=False):
+        """The limit largest (value, pets) of facet whose value contains text (case-insensitive).
+
+        With any_word, a value matches if it contains any word of text, so a
+        multi-word search still shows the facets of each of its words.
+        """
+        words = (text.lower().split() or [""]) if any_word else [text.lower()]
+        counts = self.counts(facet, status)
+        return [(value, pets) for value, pets in counts.most_common()
+                if value and any(word in value.lower() for word in words)][:limit]
+
+
+def describe(pairs):
+    """"Husky 42 · Labrador 30" for (value, count) pairs"""
+    return " · ".join(f"{value} {count:,}" for value, count in pairs)
@@ -0,0 +1,162 @@
+from collections import Counter
+
+from loadable_index import LoadableIndex
+from queries import PET_COLUMNS
+from search_index import tokens
+
+FIELDS = ("petName", "species", "breed")
+COLUMNS = ["petId"] + list(FIELDS)
+POSITIONS = tuple(PET_COLUMNS.index(field) for field in FIELDS)   # in a PET_COLUMNS record
+MIN_LENGTH = 3   # shorter terms are prefixes in progress, not typos
+
+
+def levenshtein(a, b):
+    """Edit distance (insertions, deletions, substitutions) between a and b"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def max_distance(term):
+    """Typos tolerated in a term: one for short words, two from six letters on"""
+    if len(term) < MIN_LENGTH:
+        return 0
+    return 1 if len(term) < 6 else 2
+
+
+class BKTree:
+    """Burkhard-Keller tree: words within distance k of a query, without comparing against every word.
+
+    Each child hangs off its parent by its edit distance to it; by the
+    triangle inequality only children at distance d-k..d+k of a node (d being
+    the query's distance to that node) can hold a match. Words are never taken
+    out; FuzzyMatcher skips words no pet has any more.
+    """
+    def __init__(self):
+        self.root = None   # (word, {distance: child node})
+        self.size = 0
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            node_word, children = node
+            distance = levenshtein(word, node_word)
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word, k):
+        """(distance, word) for every word within distance k of word"""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= k:
+                found.append((distance, node_word))
+            for child_distance, child in children.items():
+                if distance - k <= child_distance <= distance + k:
+                    stack.append(child)
+        return found
+
+
+class FuzzyMatcher(LoadableIndex):
+    """Typo-tolerant lookup of the words in pet names, species and breeds.
+
+    Every word of those fields goes into one BKTree per field, with the
+    number of pets using it, so "huskey" finds "husky" and "siamise" finds
+    "siamese" without scanning the pets. Candidates are ranked by edit
+    distance, then by how many pets they would match.
+
+    load() reads only these columns; the LoadableIndex write hooks keep the
+    words current afterwards (status and comments changes do not touch them).
+    """
+    COLUMNS = COLUMNS
+    PAGE_SIZE = 5000
+
+    def __init__(self):
+        super().__init__()
+        self._pets = {}                                        # petId -> words per field (FIELDS order)
+        self._counts = {field: Counter() for field in FIELDS}  # field -> word -> pets using it
+        self._trees = {field: BKTree() for field in FIELDS}
+
+    def __len__(self):
+        return len(self._pets)
+
+    # --- Building ---
+    def _load_row(self, row):
+        self._set(row[0], self._words(row[1:]))
+
+    @staticmethod
+    def _words(values):
+        return tuple(frozenset(tokens(str(value or "").lower())) for value in values)
+
+    def _set(self, pet_id, words):
+        old = self._pets.get(pet_id)
+        if old == words:
+            return
+        for field, field_words in zip(FIELDS, old or ()):
+            self._counts[field].subtract(field_words)
+        if words is None:
+            self._pets.pop(pet_id, None)
+            return
+        self._pets[pet_id] = words
+        for field, field_words in zip(FIELDS, words):
+            counts = self._counts[field]
+            for word in field_words:
+                if counts[word] <= 0:
+                    self._trees[field].add(word)
+                counts[word] += 1
+
+    # --- Incremental updates ---
+    def _upsert(self, record):
+        self._set(record[0], self._words(record[position] for position in POSITIONS))
+
+    def _remove(self, pet_id):
+        self._set(pet_id, None)
+
+    # --- Querying ---
+    def candidates(self, field, term, limit=5):
+        """Up to limit (word, distance, pets) close to term, best first"""
+        k = max_distance(term)
+        if not k:
+            return []
+        with self._lock:
+            counts = self._counts[field]
+            found = [(word, distance, counts[word]) for distance, word in self._trees[field].search(term, k)
+                     if distance and counts[word] > 0]
+        found.sort(key=lambda candidate: (candidate[1], -candidate[2], candidate[0]))
+        return found[:limit]
+
+    def known(self, term, fields=FIELDS):
+        """True if some word of fields contains term, i.e. a substring search already finds it"""
+        with self._lock:
+            return any(term in word for field in fields for word, pets in self._counts[field].items() if pets > 0)
+
+    def correct(self, text, fields=FIELDS):
+        """text with each unknown term replaced by its best candidate in fields; None if nothing changed"""
+        terms = text.lower().split()
+        corrected = []
+        for term in terms:
+            if term.isdigit() or self.known(term, fields):
+                corrected.append(term)
+                continue
+            found = [candidate for field in fields for candidate in self.candidates(field, term, limit=1)]
+            found.sort(key=lambda candidate: (candidate[1], -candidate[2]))
+            corrected.append(found[0][0] if found else term)
+        return " ".join(corrected) if corrected != terms else None
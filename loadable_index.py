@@ -0,0 +1,117 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from pagination import KeysetQuery
+from queries import PET_COLUMNS
+
+
+class LoadableIndex(ABC):
+    """Base of the in-memory structures kept over the pets table.
+
+    load() reads COLUMNS (petId first) of every pet in keyset pages and hands
+    each row to _load_row(); from then on upsert(), update_status(),
+    update_comments() and remove() keep the structure current as pets are
+    written. Subclasses implement _load_row(row), _upsert(record),
+    _remove(pet_id) and, for the columns they keep, _update(pet_id, column, value).
+
+    Writes may arrive while load() is still reading (MenuWindow sends them to
+    structures being rebuilt too). A pet upserted or removed meanwhile is newer
+    than its row, so the row is skipped; a status or comments change is laid
+    over the row, which may have been read before the change was made.
+    """
+    COLUMNS = PET_COLUMNS
+    PAGE_SIZE = 1000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._written_while_loading = None   # while loading: petId -> None (row is stale) or {column: new value}
+        self.ready = False
+        self.loaded_at = None
+
+    # --- Building ---
+    def load(self, pool, page_size=None, cancelled=None):
+        """Read every pet in keyset pages; returns self, ready unless cancelled() stopped it"""
+        with self._lock:
+            self._written_while_loading = {}
+        query = KeysetQuery(self.COLUMNS, "pets", [("petId", "ASC")])
+        token = None
+        while True:
+            if cancelled and cancelled():
+                return self
+            page = query.fetch(pool, page_size or self.PAGE_SIZE, token)
+            with self._lock:
+                for row in page.rows:
+                    self._load_current(row)
+            token = page.next_token
+            if token is None:
+                break
+        with self._lock:
+            self._written_while_loading = None
+            self.ready = True
+            self.loaded_at = time.monotonic()
+        return self
+
+    def _load_current(self, row):
+        pet_id = row[0]
+        if pet_id in self._written_while_loading:
+            changes = self._written_while_loading[pet_id]
+            if changes is None:
+                return
+            row = tuple(changes.get(column, value) for column, value in zip(self.COLUMNS, row))
+        self._load_row(row)
+
+    @abstractmethod
+    def _load_row(self, row):
+        """Add one row (COLUMNS order) read by load()"""
+
+    # --- Incremental updates ---
+    def upsert(self, record):
+        """record in PET_COLUMNS order"""
+        with self._lock:
+            if self._written_while_loading is not None:
+                self._written_while_loading[record[0]] = None
+            self._upsert(record)
+
+    def remove(self, pet_id):
+        with self._lock:
+            if self._written_while_loading is not None:
+                self._written_while_loading[pet_id] = None
+            self._remove(pet_id)
+
+    def update_status(self, pet_id, status):
+        return self._update_column(pet_id, "status", status)
+
+    def update_comments(self, pet_id, comments):
+        return self._update_column(pet_id, "comments", comments)
+
+    def _update_column(self, pet_id, column, value):
+        with self._lock:
+            written = self._written_while_loading
+            if written is not None and written.get(pet_id, {}) is not None:
+                written.setdefault(pet_id, {})[column] = value
+            return self._update(pet_id, column, value)
+
+    @abstractmethod
+    def _upsert(self, record):
+        """Add or replace a pet from its full record (PET_COLUMNS order)"""
+
+    @abstractmethod
+    def _remove(self, pet_id):
+        """Forget a pet; unknown petIds are ignored"""
+
+    def _update(self, pet_id, column, value):
+        """Change one column of a pet already held; False if the pet is unknown or the column not kept"""
+        return False
+
+
+class Unbuilt(LoadableIndex):
+    """Stands in for a structure that has not been built yet: never ready, holds nothing"""
+    def _load_row(self, row):
+        pass
+
+    def _upsert(self, record):
+        pass
+
+    def _remove(self, pet_id):
+        pass
@@ -1,25 +1,71 @@
+import importlib
 import sys
-from PyQt6.QtCore import Qt
+import time
+STARTED = time.perf_counter()   # startup timing counts from here, before the heavy imports
+
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QLabel, QPushButton, QWidget, QVBoxLayout,
-    QTableWidget, QTableWidgetItem, QHeaderView, QDialog
+    QTableView, QHeaderView
 )
-from mysql.connector import Error
 
-from db import get_connection
-from comments_dialog import PetCommentsDialog
-from register_window import RegisterWindow
-from adopt_window import AdoptWindow
-from search_window import SearchWindow
-from applicants_window import ApplicantsWindow
+from metrics import METRICS
+from loadable_index import Unbuilt
+from pet_model import PetTableModel
+from queries import PET_COLUMNS
+from search_cache import SearchCache
+from workers import QueryExecutor
+from delegates import ButtonDelegate
+# Dialog modules (register, search, adopt, applicants, comments) are imported
+# the first time they are opened, the store and change feed (mysql.connector)
+# on the thread that connects, and the in-memory structures (numpy) when they
+# are first built, so none of them cost anything before the first paint.
+
+IMPORTED = time.perf_counter()
+
+# In-memory structures over the pets table, rebuilt in the background by
+# MenuWindow.ensure_structure: attribute -> (module, class, what it is, what happens without it)
+STRUCTURES = {
+    "search_index": ("search_index", "PetSearchIndex", "Search index", "falling back to SQL search"),
+    "pet_columns": ("pet_columns", "PetColumns", "Adopt filters", "falling back to SQL search"),
+    "facets": ("facets", "FacetCounts", "Facet counts", "not showing counts"),
+    "fuzzy": ("fuzzy", "FuzzyMatcher", "Search suggestions", "not suggesting spellings"),
+}
 
 class MenuWindow(QMainWindow):
+    petsWritten = pyqtSignal(object)   # records committed off the GUI thread (bulk import chunks)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Pet Adoption System")
+        self.startup = {"imports": round((IMPORTED - STARTED) * 1000, 1)}   # milestone -> ms since launch
 
-        # DB
-        self.connection = get_connection()
+        # DB (opened and connected in the background; see connect_database)
+        self.store = None
+        self.pool = None
+        self.executor = QueryExecutor(self)
+        for name in STRUCTURES:
+            setattr(self, name, Unbuilt())   # not ready until ensure_structure builds it
+        self.loading = {}   # attribute -> structure being rebuilt in the background
+        self.search_cache = SearchCache()
+
+        # Delta sync: open views are patched with pets changed since the last poll
+        # (here or on another workstation) instead of being reloaded.
+        self.pet_changes = None    # ChangeFeed, once the database is ready
+        self.pet_views = []        # open windows with apply_pet_changes(records) / refresh() / show_facets()
+        self.syncing = False
+        self.sync_again = False
+        self.petsWritten.connect(self.pets_changed)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(lambda: self.sync_pets(periodic=True))
+        self.connect_timer = QTimer(self)   # retries the background connect while the server is down
+        self.connect_timer.setSingleShot(True)
+        self.connect_timer.timeout.connect(self.connect_database)
+
+        # Export query metrics (see metrics.py) every minute and on exit.
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.write_metrics)
+        self.metrics_timer.start(60_000)
 
         # Title
         title = QLabel("Pet Adoption System")
@@ -41,16 +87,23 @@ class MenuWindow(QMainWindow):
         btn_applicants.clicked.connect(self.open_applicants)
         btn_exit.clicked.connect(self.close)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(11)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Name", "Species", "Breed", "Age",
-            "Gender", "Size", "Shelter", "Fee", "Status", "View"
-        ])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # Table (rows are paged in by the model; clicking a header sorts on the server)
+        self.model = PetTableModel(self.pool, self.executor, parent=self)
+        self.model.loadFailed.connect(self.show_load_error)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.model.sort)
         self.table.setAlternatingRowColors(True)
-        self.table.setSortingEnabled(True)
+        self.view_delegate = ButtonDelegate(self.table)
+        self.view_delegate.clicked.connect(self.handle_table_click)
+        self.table.setItemDelegateForColumn(PetTableModel.VIEW_COLUMN, self.view_delegate)
+
+        self.table_label = QLabel("Pet Records from Database:")
 
         # Layout
         layout = QVBoxLayout()
@@ -58,7 +111,7 @@ class MenuWindow(QMainWindow):
         layout.addWidget(btn_register)
         layout.addWidget(btn_search)
         layout.addWidget(btn_adopt)
-        layout.addWidget(QLabel("Pet Records from Database:"))
+        layout.addWidget(self.table_label)
         layout.addWidget(self.table)
         layout.addWidget(btn_load_db)
         layout.addWidget(btn_applicants)
@@ -68,75 +121,256 @@ class MenuWindow(QMainWindow):
 
         container = QWidget(); container.setLayout(layout)
         self.setCentralWidget(container)
+        self.db_status = QLabel("")
+        self.statusBar().addPermanentWidget(self.db_status)
         self.setFixedSize(900, 700)
 
+        self.mark_startup("window")
+        self.connect_database()
+
+    # --- Startup ---
+    def mark_startup(self, name):
+        if name not in self.startup:
+            self.startup[name] = round((time.perf_counter() - STARTED) * 1000, 1)
+            METRICS.observe(f"startup.{name}", self.startup[name])
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self.mark_startup("first_paint")   # the milestones go to METRICS and metrics.json
+
+    def connect_database(self):
+        """Open the store and its first pooled connection off the GUI thread; the window is usable meanwhile"""
+        store = self.store
+        self.db_status.setText(f"Connecting to {store.name if store else 'the database'}...")
+
+        def connect(task):
+            nonlocal store
+            if store is None:
+                from store import open_store
+                store = open_store(connect=False)
+            store.connect()
+            return store
+        self.executor.submit(
+            (self, "connect"), connect,
+            on_result=self.database_ready, on_error=lambda e: self.database_failed(store, e), label="connect",
+        )
+
+    def use_store(self, store):
+        if store is not None:
+            self.store = store
+            self.pool = self.model.pool = store.pool
+
+    def database_ready(self, store):
+        from change_feed import ChangeFeed
+        self.use_store(store)
+        self.pet_changes = ChangeFeed("pets", PET_COLUMNS, "petId")
+        self.mark_startup("database")
+        self.db_status.setText(f"{store.name}: connected")
+        self.sync_pets(periodic=True)   # sets the starting watermark
+        self.sync_timer.start(15_000)
+        self.ensure_structure("facets")
+        self.ensure_structure("fuzzy")
+
+    def database_failed(self, store, e):
+        self.use_store(store)   # dialogs still open while offline; the pool connects on demand
+        name = store.name if store else "the database"
+        print(f"Could not connect to {name}: {e}")
+        self.db_status.setText(f"{name}: offline, retrying in 15s")
+        self.connect_timer.start(15_000)
+
+    def database_needed(self):
+        """True once the store is open; until then the dialogs have nothing to query"""
+        if self.store is None:
+            self.statusBar().showMessage("Still connecting to the database...", 3000)
+            return False
+        return True
+
     # --- Navigation ---
     def open_register(self):
+        if not self.database_needed():
+            return
+        from register_window import RegisterWindow
         RegisterWindow(self).exec()
 
     def open_search(self):
+        if not self.database_needed():
+            return
+        from search_window import SearchWindow
+        self.ensure_structure("search_index")
+        self.ensure_structure("facets")
+        self.ensure_structure("fuzzy")
         SearchWindow(self).exec()
 
     def open_adopt(self):
+        if not self.database_needed():
+            return
+        from adopt_window import AdoptWindow
+        self.ensure_structure("pet_columns")
+        self.ensure_structure("facets")
+        self.ensure_structure("fuzzy")
         AdoptWindow(self).exec()
 
     def open_applicants(self):
+        if not self.database_needed():
+            return
+        from applicants_window import ApplicantsWindow
         ApplicantsWindow(self).exec()
 
     # --- Table loading ---
     def load_from_database(self):
-        try:
-            self.table.setRowCount(0)
-            self.table.setSortingEnabled(False)
-
-            if self.connection and self.connection.is_connected():
-                cursor = self.connection.cursor()
-                cursor.execute("""
-                    SELECT petId, petName, species, breed, age, 
-                           gender, size, shelter, adoptionFee, status, comments 
-                    FROM pets ORDER BY petId
-                """)
-                records = cursor.fetchall()
-                cursor.close()
-
-                self.table.setRowCount(len(records))
-                for row_idx, record in enumerate(records):
-                    (petId, petName, species, breed, age, gender,
-                     size, shelter, adoptionFee, status, comments) = record
-
-                    self.table.setItem(row_idx, 0, QTableWidgetItem(str(petId)))
-                    self.table.setItem(row_idx, 1, QTableWidgetItem(str(petName)))
-                    self.table.setItem(row_idx, 2, QTableWidgetItem(str(species)))
-                    self.table.setItem(row_idx, 3, QTableWidgetItem(str(breed)))
-                    self.table.setItem(row_idx, 4, QTableWidgetItem(str(age)))
-                    self.table.setItem(row_idx, 5, QTableWidgetItem(str(gender)))
-                    self.table.setItem(row_idx, 6, QTableWidgetItem(str(size)))
-                    self.table.setItem(row_idx, 7, QTableWidgetItem(str(shelter)))
-                    self.table.setItem(row_idx, 8, QTableWidgetItem(str(adoptionFee)))
-                    self.table.setItem(row_idx, 9, QTableWidgetItem(str(status)))
-
-                    view_btn = QPushButton("View")
-                    view_btn.clicked.connect(lambda checked, pid=petId, pname=petName, comm=comments:
-                                             self.view_comments(pid, pname, comm))
-                    self.table.setCellWidget(row_idx, 10, view_btn)
-            else:
-                self.table.setRowCount(1)
-                self.table.setItem(0, 0, QTableWidgetItem("No database connection"))
-
-            self.table.setSortingEnabled(True)
-        except Error as e:
-            print(f"Database error: {e}")
-            self.table.setRowCount(1)
-            self.table.setItem(0, 0, QTableWidgetItem(f"Error: {e}"))
+        if not self.database_needed():
+            return
+        self.table_label.setText("Pet Records from Database:")
+        self.model.reload()
+
+    def show_load_error(self, message):
+        self.table_label.setText(f"Pet Records from Database: {message}")
+
+    def handle_table_click(self, index):
+        if index.column() != PetTableModel.VIEW_COLUMN:
+            return
+        record = self.model.record(index.row())
+        if record:
+            petId, petName = record[0], record[1]
+            self.view_comments(petId, petName, record[10])
 
     def view_comments(self, pet_id, pet_name, comments):
-        dlg = PetCommentsDialog(self, pet_id, pet_name, comments)
-        if dlg.exec() == QDialog.DialogCode.Accepted:
-            self.load_from_database()
+        from comments_dialog import PetCommentsDialog
+        PetCommentsDialog(self, pet_id, pet_name, comments).exec()
+
+    # --- Delta sync ---
+    def sync_pets(self, periodic=False):
+        """Fetch pets changed since the last sync and patch every open view with them"""
+        if self.pet_changes is None:
+            return
+        if not self.pet_changes.available:
+            if not periodic:
+                self.load_from_database()
+                for view in self.pet_views:
+                    view.refresh()
+            return
+        if self.syncing:
+            # Never cancel a running poll: its rows are past the watermark already.
+            self.sync_again = True
+            return
+        self.syncing = True
+        self.executor.submit(
+            (self, "sync-pets"), lambda task: self.pet_changes.poll(self.pool),
+            on_result=self.pets_synced, on_error=self.pet_sync_failed, label="sync_pets",
+        )
+
+    def pets_synced(self, records):
+        self.syncing = False
+        if records:
+            self.pets_changed(records)
+        if self.sync_again:
+            self.sync_again = False
+            self.sync_pets()
+
+    def pet_sync_failed(self, e):
+        self.syncing = False
+        self.sync_again = False
+        print(f"Could not sync pet changes: {e}")
+
+    def pets_changed(self, records):
+        self.search_cache.invalidate()
+        self.store.remember_pets(records)
+        for index in self._pet_indexes():
+            for record in records:
+                index.upsert(record)
+        self.model.apply_changes(records)
+        for view in self.pet_views:
+            view.apply_pet_changes(records)
+        self.show_facets()
+
+    # --- In-memory structures (search index, Adopt filters, facet counts, suggestions) ---
+    def ensure_structure(self, name, max_age=300):
+        """(Re)build self.<name> (see STRUCTURES) in the background if it is missing or stale"""
+        current = getattr(self, name)
+        if name in self.loading:
+            return
+        if current.ready and time.monotonic() - current.loaded_at < max_age:
+            return
+        module, factory = STRUCTURES[name][:2]
+        fresh = getattr(importlib.import_module(module), factory)()
+        self.loading[name] = fresh
+        self.executor.submit(
+            (self, name),
+            lambda task: fresh.load(self.pool, cancelled=task.is_cancelled),
+            on_result=lambda loaded: self.structure_loaded(name, loaded),
+            on_error=lambda e: self.structure_failed(name, e), label=name,
+        )
+
+    def structure_loaded(self, name, structure):
+        self.loading.pop(name, None)
+        if not structure.ready:
+            return
+        setattr(self, name, structure)
+        self.statusBar().showMessage(f"{STRUCTURES[name][2]} ready: {len(structure)} pets", 5000)
+        if name == "search_index":
+            self.search_cache.invalidate("search-index")
+        elif name == "facets":
+            self.show_facets()
+
+    def structure_failed(self, name, e):
+        self.loading.pop(name, None)
+        what, fallback = STRUCTURES[name][2:]
+        METRICS.increment(f"{name}.failed")
+        self.statusBar().showMessage(f"{what} unavailable, {fallback}", 5000)
+        print(f"{what} unavailable, {fallback}: {e}")
+
+    # --- Facet counts (shown next to the Search and Adopt inputs) ---
+    def show_facets(self):
+        for view in self.pet_views:
+            view.show_facets()
+
+    # --- Pet write notifications (keep in-memory views in step with the database) ---
+    def _pet_indexes(self):
+        """Search index, column snapshot, facet counts and fuzzy matcher, including any being rebuilt.
+
+        A structure still loading gets the writes too; LoadableIndex.load() makes
+        them win over the (possibly older) rows it reads afterwards.
+        """
+        built = [getattr(self, name) for name in STRUCTURES]
+        return [structure for structure in built if structure.ready] + list(self.loading.values())
+
+    def pet_saved(self, record):
+        self.search_cache.invalidate()
+        for index in self._pet_indexes():
+            index.upsert(record)
+        self.show_facets()
+        self.sync_pets()
+
+    def pet_status_changed(self, pet_id, status):
+        self.search_cache.invalidate()
+        for index in self._pet_indexes():
+            index.update_status(pet_id, status)
+        self.show_facets()
+        self.sync_pets()
+
+    def pet_comments_changed(self, pet_id, comments):
+        self.search_cache.invalidate()
+        for index in self._pet_indexes():
+            index.update_comments(pet_id, comments)
+        self.sync_pets()
+
+    # --- Metrics ---
+    def write_metrics(self):
+        if self.store is None:
+            return METRICS.write(search_cache=self.search_cache.statistics(), startup=self.startup)
+        return METRICS.write(pool=self.store.statistics(), search_cache=self.search_cache.statistics(),
+                             pet_cache=self.store.pet_cache.statistics(), startup=self.startup)
 
     def closeEvent(self, event):
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        self.connect_timer.stop()
+        self.sync_timer.stop()
+        self.executor.shutdown()
+        self.metrics_timer.stop()
+        path = self.write_metrics()
+        if path:
+            print(f"Query metrics written to {path}")
+        if self.store is not None:
+            self.store.close()
             print("Database connection closed")
         event.accept()
 
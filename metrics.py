@@ -0,0 +1,238 @@
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+SLOW_QUERY_MS = float(os.environ.get("PETADOPTION_SLOW_MS", 100))
+SLOW_QUERY_LOG = os.environ.get("PETADOPTION_SLOW_LOG", "slow_queries.log")
+METRICS_FILE = os.environ.get("PETADOPTION_METRICS", "metrics.json")
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalise_sql(sql):
+    """Statement shape with literals and placeholders folded to ?, for grouping"""
+    sql = _STRING_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _LIST_RE.sub("(?...)", sql)
+    return " ".join(sql.split())
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self):
+        buckets = {f"le_{bound}": n for bound, n in zip(BUCKETS_MS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.count, "total_ms": round(self.total_ms, 3), "max_ms": round(self.max_ms, 3),
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0, "buckets": buckets}
+
+
+class Metrics:
+    """Process-wide counters and latency histograms.
+
+    Every statement run through an InstrumentedCursor is timed and grouped by
+    its normalised SQL; statements slower than slow_ms are appended to the
+    slow-query log (JSON lines). Code paths are timed per phase with timed(),
+    e.g. timed("search_pet", "db") on the worker and timed("search_pet", "ui")
+    while the rows are put into the table, so the two can be compared.
+    """
+    def __init__(self, slow_ms=SLOW_QUERY_MS, slow_log=SLOW_QUERY_LOG, slow_keep=50):
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+        self.slow_queries = deque(maxlen=slow_keep)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.statements = {}   # normalised sql -> {count, rows, total_ms, max_ms}
+            self.started = time.time()
+
+    # --- Recording ---
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, ms):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    @contextmanager
+    def timed(self, name, phase):
+        """Time the block into the histogram name.phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}.{phase}", (time.perf_counter() - started) * 1000)
+
+    @contextmanager
+    def operation(self, name):
+        """Attribute statements run on this thread to operation name (and time it as its db phase)"""
+        previous = getattr(self._local, "operation", None)
+        self._local.operation = name
+        try:
+            with self.timed(name, "db"):
+                yield
+        finally:
+            self._local.operation = previous
+
+    def record_statement(self, sql, params, ms, rows):
+        operation = getattr(self._local, "operation", None)
+        shape = normalise_sql(sql)
+        with self._lock:
+            stats = self.statements.get(shape)
+            if stats is None:
+                stats = self.statements[shape] = {"count": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0}
+            stats["count"] += 1
+            stats["rows"] += rows
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            self.counters["statements"] = self.counters.get("statements", 0) + 1
+            self.counters["rows"] = self.counters.get("rows", 0) + rows
+            if operation:
+                key = f"{operation}.statements"
+                self.counters[key] = self.counters.get(key, 0) + 1
+        self.observe("sql", ms)
+        if ms >= self.slow_ms:
+            self._log_slow(shape, params, ms, rows, operation)
+
+    def _log_slow(self, shape, params, ms, rows, operation):
+        entry = {"at": time.strftime("%Y-%m-%d %H:%M:%S"), "ms": round(ms, 3), "rows": rows,
+                 "operation": operation, "sql": shape, "params": [repr(p)[:80] for p in (params or ())][:20]}
+        self.slow_queries.append(entry)
+        self.increment("slow_statements")
+        if not self.slow_log:
+            return
+        try:
+            with self._lock, open(self.slow_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Could not write slow query log: {e}")
+
+    # --- Export ---
+    def snapshot(self, top=25):
+        with self._lock:
+            statements = sorted(self.statements.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+            return {
+                "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                "counters": dict(self.counters),
+                "histograms": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+                "statements": [dict(stats, sql=sql, total_ms=round(stats["total_ms"], 3),
+                                    max_ms=round(stats["max_ms"], 3)) for sql, stats in statements[:top]],
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def write(self, path=METRICS_FILE, **extra):
+        """Write snapshot() (plus any extra sections) as JSON; returns the path or None on failure"""
+        try:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(self.snapshot(), **extra), f, indent=2, default=str)
+            os.replace(tmp, path)
+            return path
+        except OSError as e:
+            print(f"Could not write metrics: {e}")
+            return None
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times each statement, including fetching its rows.
+
+    A statement is recorded when the next one starts or the cursor closes, so
+    rows read with fetchmany() over several calls count toward one entry.
+    """
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+        self._pending = None   # [sql, params, ms, rows]
+
+    def _finish(self):
+        if self._pending is not None:
+            sql, params, ms, rows = self._pending
+            self._pending = None
+            self._metrics.record_statement(sql, params, ms, rows)
+
+    def _timed(self, call, *args):
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += (time.perf_counter() - started) * 1000
+
+    def execute(self, sql, params=()):
+        self._finish()
+        self._pending = [sql, params, 0.0, 0]
+        result = self._timed(self._cursor.execute, sql, params)
+        if self._cursor.description is None:
+            self._pending[3] = max(self._cursor.rowcount, 0)   # rows affected by a write
+        return result
+
+    def executemany(self, sql, seq_params):
+        self._finish()
+        seq_params = list(seq_params)
+        self._pending = [sql, seq_params[:1], 0.0, 0]
+        result = self._timed(self._cursor.executemany, sql, seq_params)
+        self._pending[3] = max(self._cursor.rowcount, 0)
+        self._finish()
+        return result
+
+    def _fetched(self, rows):
+        if self._pending is not None and rows:
+            self._pending[3] += len(rows)
+        return rows
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None and self._pending is not None:
+            self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size):
+        return self._fetched(self._timed(self._cursor.fetchmany, size))
+
+    def fetchall(self):
+        return self._fetched(self._timed(self._cursor.fetchall))
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+
+METRICS = Metrics()
@@ -0,0 +1,134 @@
+import base64
+import datetime
+import decimal
+import json
+from collections import namedtuple
+
+Page = namedtuple('Page', 'rows next_token total')
+
+
+def encode_token(values):
+    """Opaque, URL-safe page token holding the sort key of the last row on a page"""
+    def plain(value):
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+        return value
+    raw = json.dumps([plain(v) for v in values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page token: {token!r}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid page token: {token!r}")
+    return values
+
+
+class KeysetQuery:
+    """A SELECT paged with seek predicates instead of OFFSET.
+
+    Rather than skipping N rows, each page starts strictly after the sort key of
+    the previous page's last row (e.g. WHERE petId > %s ORDER BY petId LIMIT n),
+    so every page costs the same no matter how deep the user has scrolled.
+
+    order_by is a list of (column, 'ASC'|'DESC'); the last column must be unique
+    (a primary key) so the order is total. Every order column must appear in
+    columns. Columns listed in nullable are compared through COALESCE(col, '').
+    """
+    def __init__(self, columns, table, order_by, where=None, params=(), nullable=()):
+        self.columns = list(columns)
+        self.table = table
+        self.order_by = [(col, direction.upper()) for col, direction in order_by]
+        self.where = where
+        self.params = tuple(params)
+        self.nullable = set(nullable)
+        self.key_positions = [self.columns.index(col) for col, _ in self.order_by]
+
+    def _expr(self, column):
+        return f"COALESCE({column}, '')" if column in self.nullable else column
+
+    def key_of(self, row):
+        return [("" if row[pos] is None and col in self.nullable else row[pos])
+                for (col, _), pos in zip(self.order_by, self.key_positions)]
+
+    def _seek(self, key):
+        """(c1 > v1) OR (c1 = v1 AND c2 > v2) OR ... with < for DESC columns"""
+        clauses, params = [], []
+        for i, (col, direction) in enumerate(self.order_by):
+            parts = []
+            for prev_col, _ in self.order_by[:i]:
+                parts.append(f"{self._expr(prev_col)} = %s")
+            parts.append(f"{self._expr(col)} {'<' if direction == 'DESC' else '>'} %s")
+            clauses.append("(" + " AND ".join(parts) + ")")
+            params.extend(key[:i + 1])
+        return "(" + " OR ".join(clauses) + ")", params
+
+    def sql(self, limit, token=None):
+        conditions, params = [], []
+        if self.where:
+            conditions.append(f"({self.where})")
+            params.extend(self.params)
+        if token:
+            key = decode_token(token)
+            if len(key) != len(self.order_by):
+                raise ValueError(f"Page token does not match this query: {token!r}")
+            seek, seek_params = self._seek(key)
+            conditions.append(seek)
+            params.extend(seek_params)
+        where_sql = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_sql = ", ".join(f"{self._expr(col)} {direction}" for col, direction in self.order_by)
+        sql = (f"SELECT {', '.join(self.columns)} FROM {self.table}{where_sql} "
+               f"ORDER BY {order_sql} LIMIT %s")
+        params.append(limit)
+        return sql, tuple(params)
+
+    def count_sql(self):
+        where_sql = f" WHERE {self.where}" if self.where else ""
+        return f"SELECT COUNT(*) FROM {self.table}{where_sql}", self.params
+
+    def fetch(self, pool, limit, token=None, with_total=False, on_chunk=None, chunk_size=50, cancelled=None):
+        """Return a Page of at most limit rows starting after token.
+
+        One extra row is read to learn whether another page exists, so
+        next_token is None exactly on the last page. With on_chunk, rows are
+        read with fetchmany and handed over chunk by chunk as they arrive;
+        cancelled() is polled between chunks to stop early.
+        """
+        sql, params = self.sql(limit + 1, token)
+        if on_chunk is None:
+            rows = pool.fetchall(sql, params)
+        else:
+            rows = self._stream(pool, sql, params, limit, on_chunk, chunk_size, cancelled)
+        next_token = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_token = encode_token(self.key_of(rows[-1]))
+        total = None
+        if with_total:
+            count_sql, count_params = self.count_sql()
+            total = pool.fetchone(count_sql, count_params)[0]
+        return Page(rows, next_token, total)
+
+    @staticmethod
+    def _stream(pool, sql, params, limit, on_chunk, chunk_size, cancelled):
+        rows = []
+        with pool.cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                if cancelled and cancelled():
+                    cursor.fetchall()   # drain so the connection can go back to the pool
+                    break
+                visible = chunk[:max(0, limit - len(rows))]   # never stream the look-ahead row
+                rows.extend(chunk)
+                if visible:
+                    on_chunk(visible)
+        return rows
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PetCache:
+    """Bounded LRU cache of pet records (PET_COLUMNS order) keyed by petId.
+
+    The store writes through it: every pet write it makes updates the cached
+    record, so only writes from other workstations can leave an entry stale,
+    and entries expire after ttl seconds to bound that.
+    """
+    def __init__(self, max_entries=2000, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # petId -> (stored_at, record)
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, pet_id):
+        with self._lock:
+            item = self._entries.get(pet_id)
+            if item is not None and self.ttl and time.monotonic() - item[0] > self.ttl:
+                del self._entries[pet_id]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(pet_id)
+            self.hits += 1
+            return item[1]
+
+    def put(self, record):
+        self.put_many([record])
+
+    def put_many(self, records):
+        now = time.monotonic()
+        with self._lock:
+            for record in records:
+                self._entries[record[0]] = (now, tuple(record))
+                self._entries.move_to_end(record[0])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, pet_id, position, value):
+        """Patch one column of a cached record; a pet that is not cached is left alone"""
+        with self._lock:
+            item = self._entries.get(pet_id)
+            if item is not None:
+                record = list(item[1])
+                record[position] = value
+                self._entries[pet_id] = (item[0], tuple(record))
+
+    def invalidate(self, pet_id=None):
+        with self._lock:
+            if pet_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(pet_id, None)
+
+    def statistics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0}
@@ -0,0 +1,204 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:   # optional: without numpy the filters run as Python loops over array columns
+    numpy = None
+
+from loadable_index import LoadableIndex
+from queries import PET_COLUMNS
+
+# Positions in a PET_COLUMNS record
+ID, SPECIES, BREED, AGE, SIZE, SHELTER, FEE, STATUS = 0, 2, 3, 4, 6, 7, 8, 9
+ENCODED = {"species": SPECIES, "breed": BREED, "shelter": SHELTER, "size": SIZE, "status": STATUS}
+REMOVED = -1   # status code of a row whose pet was deleted
+
+
+class Dictionary:
+    """Maps each distinct value of a column to a small integer code"""
+    def __init__(self):
+        self.values = []      # code -> value
+        self.lowered = []     # code -> lowercased value, for substring matching
+        self.codes = {}       # value -> code
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        value = "" if value is None else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.lowered.append(value.lower())
+        return code
+
+    def containing(self, text):
+        """Codes whose value contains text, case-insensitively (SQL LOWER(col) LIKE '%text%')"""
+        return [code for code, value in enumerate(self.lowered) if text in value]
+
+
+class PetColumns(LoadableIndex):
+    """Column-oriented snapshot of the pets table for the Adopt a Pet filters.
+
+    species, breed, shelter, size and status are stored as dictionary codes;
+    age and adoption fee as plain number arrays. A filter compares each column
+    once and ANDs the results, so its cost depends on the number of pets, not on
+    how many criteria are given. With numpy the comparisons are vectorised
+    masks; without it the same columns are scanned in a Python loop.
+
+    It is filled once with load() and then kept current by the LoadableIndex
+    write hooks as pets are written. Rows are never
+    moved: a changed pet is rewritten in place and a deleted one is marked
+    REMOVED, so incremental updates cost a few array stores.
+    """
+    def __init__(self, capacity=1024):
+        super().__init__()
+        self.dictionaries = {name: Dictionary() for name in ENCODED}
+        self._records = []            # row -> record (PET_COLUMNS order)
+        self._rows = {}               # petId -> row
+        self._ordered = True          # rows are in petId order (as load() reads them)
+        if numpy is not None:
+            self._ids = numpy.zeros(capacity, dtype=numpy.int64)
+            self._ages = numpy.zeros(capacity, dtype=numpy.int64)
+            self._fees = numpy.zeros(capacity, dtype=numpy.float64)
+            self._codes = {name: numpy.zeros(capacity, dtype=numpy.int32) for name in ENCODED}
+        else:
+            self._ids, self._ages, self._fees = array("q"), array("q"), array("d")
+            self._codes = {name: array("i") for name in ENCODED}
+
+    def __len__(self):
+        return len(self._rows)
+
+    # --- Building ---
+    def _columns(self):
+        return [self._ids, self._ages, self._fees] + list(self._codes.values())
+
+    def _grow(self):
+        size = len(self._ids) * 2
+        self._ids, self._ages, self._fees = (numpy.resize(column, size) for column in (self._ids, self._ages, self._fees))
+        self._codes = {name: numpy.resize(codes, size) for name, codes in self._codes.items()}
+
+    def _store(self, record):
+        record = tuple(record)
+        pet_id = record[ID]
+        row = self._rows.get(pet_id)
+        if row is None:
+            row = len(self._records)
+            if self._records and pet_id < self._records[-1][ID]:
+                self._ordered = False
+            self._rows[pet_id] = row
+            self._records.append(record)
+            if numpy is None:
+                for column in self._columns():
+                    column.append(0)
+            elif row == len(self._ids):
+                self._grow()
+            self._ids[row] = pet_id
+        else:
+            self._records[row] = record
+        self._ages[row] = int(record[AGE] or 0)
+        self._fees[row] = float(record[FEE] or 0)
+        for name, position in ENCODED.items():
+            self._codes[name][row] = self.dictionaries[name].encode(record[position])
+
+    # --- Incremental updates ---
+    def _load_row(self, record):
+        self._store(record)
+
+    def _upsert(self, record):
+        self._store(record)
+
+    def _remove(self, pet_id):
+        row = self._rows.get(pet_id)
+        if row is not None:
+            self._codes["status"][row] = REMOVED
+
+    def _update(self, pet_id, column, value):
+        row = self._rows.get(pet_id)
+        if row is None or self._codes["status"][row] == REMOVED:
+            return False
+        record = list(self._records[row])
+        record[PET_COLUMNS.index(column)] = value
+        self._store(record)
+        return True
+
+    def get(self, pet_id):
+        with self._lock:
+            row = self._rows.get(pet_id)
+            if row is None or self._codes["status"][row] == REMOVED:
+                return None
+            return self._records[row]
+
+    # --- Querying ---
+    def match(self, species="", breed="", age=None, fee=None, status="Available"):
+        """Rows of the pets matching every criterion, in petId order; see records().
+
+        species and breed match as case-insensitive substrings; age and fee are
+        (low, high) bounds, either end None for open. status="" matches any pet.
+        Only row numbers are produced, so a broad filter stays cheap until its
+        records are actually shown.
+        """
+        with self._lock:
+            criteria = []
+            for name, value in (("status", status), ("species", species), ("breed", breed)):
+                if not value:
+                    continue
+                dictionary = self.dictionaries[name]
+                if name == "status":
+                    codes = [dictionary.codes[value]] if value in dictionary.codes else []
+                else:
+                    codes = dictionary.containing(value.lower())
+                if not codes:
+                    return []
+                criteria.append((name, codes))
+            if numpy is not None:
+                return self._match_vectorised(criteria, age, fee)
+            return self._match_scan(criteria, age, fee)
+
+    def records(self, rows):
+        """Current records of rows returned by match()"""
+        with self._lock:
+            return [self._records[row] for row in rows]
+
+    def filter(self, species="", breed="", age=None, fee=None, status="Available"):
+        """Records matching every criterion, ordered by petId"""
+        return self.records(self.match(species, breed, age, fee, status))
+
+    def _match_vectorised(self, criteria, age, fee):
+        count = len(self._records)
+        mask = None if criteria and criteria[0][0] == "status" else self._codes["status"][:count] != REMOVED
+        for name, codes in criteria:
+            column = self._codes[name][:count]
+            if len(codes) == 1:
+                matched = column == codes[0]
+            else:
+                wanted = numpy.zeros(len(self.dictionaries[name]), dtype=bool)
+                wanted[codes] = True
+                matched = wanted.take(column)
+            mask = matched if mask is None else numpy.logical_and(mask, matched, out=mask)
+        for column, (low, high) in ((self._ages, age or (None, None)), (self._fees, fee or (None, None))):
+            if low is not None:
+                mask &= column[:count] >= low
+            if high is not None:
+                mask &= column[:count] <= high
+        rows = numpy.flatnonzero(mask)
+        if not self._ordered:
+            rows = rows[numpy.argsort(self._ids[rows], kind="stable")]
+        return rows
+
+    def _match_scan(self, criteria, age, fee):
+        checks = [(self._codes[name], set(codes)) for name, codes in criteria]
+        status = self._codes["status"]
+        age_low, age_high = age or (None, None)
+        fee_low, fee_high = fee or (None, None)
+        rows = [row for row in range(len(self._records))
+                if status[row] != REMOVED
+                and all(column[row] in codes for column, codes in checks)
+                and (age_low is None or self._ages[row] >= age_low)
+                and (age_high is None or self._ages[row] <= age_high)
+                and (fee_low is None or self._fees[row] >= fee_low)
+                and (fee_high is None or self._fees[row] <= fee_high)]
+        if not self._ordered:
+            rows.sort(key=lambda row: self._ids[row])
+        return rows
@@ -0,0 +1,323 @@
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from pagination import KeysetQuery, decode_token
+from queries import NULLABLE_PET_COLUMNS, PET_COLUMNS
+
+
+class PetTableModel(QAbstractTableModel):
+    """Pet list that pulls rows from the database page by page as the view scrolls.
+
+    Pages are read with keyset cursors, so scrolling deep costs the same as the
+    first page. Only the most recently used max_pages pages are kept in memory;
+    a page that was dropped is fetched again from its saved cursor when it
+    scrolls back into view. Sorting is done by the server (ORDER BY), never by
+    the view. With an executor, pages load on a worker thread and rows appear
+    (or are repainted) when they arrive; without one they load inline.
+    """
+    HEADERS = ["ID", "Name", "Species", "Breed", "Age",
+               "Gender", "Size", "Shelter", "Fee", "Status", "View"]
+    VIEW_COLUMN = 10
+
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, pool, executor=None, page_size=200, max_pages=10, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.executor = executor
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.sort_column = 0
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+        self._pages = OrderedDict()   # page number -> list of records, least recently used first
+        self._page_tokens = [None]    # page number -> keyset token that starts it
+        self._row_count = 0
+        self._exhausted = True
+        self._loaded = False
+        self._pending = set()         # page numbers being loaded in the background
+        self._generation = 0          # bumped on reload so late pages are dropped
+        self._known_ids = set()       # every petId loaded since the last reload
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if index.column() == self.VIEW_COLUMN:
+            return "View"
+        record = self.record(index.row())
+        if record is None:
+            return None
+        return str(record[index.column()])
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (not parent.isValid() and self._loaded and not self._exhausted
+                and self._row_count // self.page_size not in self._pending)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._request_page(self._row_count // self.page_size)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column >= len(PET_COLUMNS) - 1:
+            return
+        self.sort_column = column
+        self.sort_order = order
+        if self._loaded:
+            self.reload()
+
+    # --- Loading ---
+    def reload(self):
+        """Drop everything and show the first page again"""
+        if self.executor is not None:
+            self.executor.cancel_owner(self)
+        self.beginResetModel()
+        self._generation += 1
+        self._pending.clear()
+        self._pages.clear()
+        self._page_tokens = [None]
+        self._known_ids.clear()
+        self._row_count = 0
+        self._exhausted = False
+        self._loaded = True
+        self.endResetModel()
+        self.fetchMore()
+
+    def record(self, row):
+        """Full pet record (including comments) for a view row"""
+        if row < 0 or row >= self._row_count:
+            return None
+        page_no, offset = divmod(row, self.page_size)
+        rows = self._pages.get(page_no)
+        if rows is None:
+            rows = self._request_page(page_no) or []
+        else:
+            self._pages.move_to_end(page_no)
+        return rows[offset] if offset < len(rows) else None
+
+    def query(self):
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        direction = "DESC" if descending else "ASC"
+        column = PET_COLUMNS[self.sort_column]
+        order_by = [("petId", direction)]
+        if column != "petId":
+            order_by.insert(0, (column, direction))
+        return KeysetQuery(PET_COLUMNS, "pets", order_by, nullable=NULLABLE_PET_COLUMNS)
+
+    def _request_page(self, page_no):
+        """Load a page; returns its rows when loaded inline, None while it loads in the background"""
+        if page_no in self._pending:
+            return None
+        query, token, generation = self.query(), self._page_tokens[page_no], self._generation
+
+        def work(task=None):
+            return query.fetch(self.pool, self.page_size, token)
+
+        if self.executor is None:
+            from mysql.connector import Error   # headless use only (benchmark); the GUI never loads pages inline
+            try:
+                page = work()
+            except Error as e:
+                self._load_failed(generation, page_no, e)
+                return None
+            return self._page_loaded(generation, page_no, page)
+
+        self._pending.add(page_no)
+        self.executor.submit(
+            (self, "page", page_no), work,
+            on_result=lambda page: self._page_loaded(generation, page_no, page),
+            on_error=lambda e: self._load_failed(generation, page_no, e), label="load_from_database",
+        )
+        return None
+
+    def _page_loaded(self, generation, page_no, page):
+        if generation != self._generation:
+            return None
+        self._pending.discard(page_no)
+        rows = page.rows
+        if page_no == len(self._page_tokens) - 1:
+            if page.next_token:
+                self._page_tokens.append(page.next_token)
+            else:
+                self._exhausted = True
+        self._pages[page_no] = rows
+        self._known_ids.update(row[0] for row in rows)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+        first = page_no * self.page_size
+        if first == self._row_count:
+            if rows:
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self._row_count += len(rows)
+                self.endInsertRows()
+        elif rows and self.executor is not None:
+            # A page that was dropped from memory came back: repaint its rows.
+            last = min(first + len(rows), self._row_count) - 1
+            self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
+        return rows
+
+    # --- Delta sync ---
+    def apply_changes(self, records):
+        """Patch changed pets into the loaded rows instead of reloading everything.
+
+        A change that would move rows (its sort column changed, or a new pet
+        sorts inside the range already loaded) still reloads, because only the
+        server knows the new positions. Rows on pages dropped from memory are
+        read fresh when they scroll back into view anyway.
+        """
+        if not self._loaded or not records:
+            return
+        positions = {row[0]: (page_no, offset)
+                     for page_no, rows in self._pages.items() for offset, row in enumerate(rows)}
+        patched = []
+        for record in records:
+            where = positions.get(record[0])
+            if where is not None:
+                rows = self._pages[where[0]]
+                if rows[where[1]][self.sort_column] != record[self.sort_column]:
+                    self.reload()
+                    return
+                rows[where[1]] = tuple(record)
+                patched.append(where[0] * self.page_size + where[1])
+            elif record[0] not in self._known_ids and not self._after_loaded_rows(record[0]):
+                self.reload()
+                return
+        for row in patched:
+            if row < self._row_count:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def _after_loaded_rows(self, pet_id):
+        """True if a pet sorts after every loaded row, so it will simply be paged in later"""
+        if self._exhausted or self.sort_column != 0 or len(self._page_tokens) < 2:
+            return False
+        last_id = decode_token(self._page_tokens[-1])[-1]
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            return pet_id < last_id
+        return pet_id > last_id
+
+    def _load_failed(self, generation, page_no, e):
+        if generation != self._generation:
+            return
+        self._pending.discard(page_no)
+        print(f"Database error: {e}")
+        self._exhausted = True
+        self.loadFailed.emit(f"Error: {e}")
+
+
+class PetListModel(QAbstractTableModel):
+    """Table of records for search results and dashboards, keyed on their first field.
+
+    Rows arrive in chunks through append_rows(), so a view can show the first
+    results while the rest are still streaming in. Only the cells the view
+    actually paints are ever formatted. Trailing action columns (e.g. "View")
+    display their label; the window reacts to clicks on them. Columns listed in
+    editable can open a delegate's editor, which reports the choice to the
+    window rather than writing the model.
+    """
+    def __init__(self, columns, actions=(), editable=(), parent=None):
+        super().__init__(parent)
+        self.columns = columns      # (header, record position, formatter) triples
+        self.actions = list(actions)
+        self.editable = set(editable)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns) + len(self.actions)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if section < len(self.columns):
+                return self.columns[section][0]
+            return self.actions[section - len(self.columns)]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if column >= len(self.columns):
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.actions[column - len(self.columns)]
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor("#2986cc")
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            _, position, formatter = self.columns[column]
+            return formatter(self.rows[index.row()][position])
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() in self.editable:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def action_at(self, index):
+        """Label of the action column that was clicked, or None"""
+        column = index.column() - len(self.columns)
+        return self.actions[column] if 0 <= column < len(self.actions) else None
+
+    def record(self, row):
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def prepend_rows(self, rows):
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self.rows[:0] = rows
+        self.endInsertRows()
+
+    def patch_rows(self, records, keep=None):
+        """Replace rows whose key matches a changed record; rows keep() rejects are removed.
+
+        Returns the number of rows removed.
+        """
+        changed = {record[0]: record for record in records}
+        removed = 0
+        for row in range(len(self.rows) - 1, -1, -1):
+            record = changed.get(self.rows[row][0])
+            if record is None:
+                continue
+            if keep is not None and not keep(record):
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+                removed += 1
+            else:
+                self.rows[row] = record
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        return removed
+
+    def clear(self):
+        self.set_rows([])
@@ -0,0 +1,97 @@
+"""Pet and application columns and the list queries shared by the windows, the API and the tools; no Qt here."""
+from pagination import KeysetQuery
+
+PET_COLUMNS = ["petId", "petName", "species", "breed", "age",
+               "gender", "size", "shelter", "adoptionFee", "status", "comments"]
+NULLABLE_PET_COLUMNS = ("gender", "size", "shelter", "comments")
+APPLICATION_COLUMNS = ["appId", "petId", "petName", "adopterName", "adopterEmail", "adopterPhone",
+                       "appStatus", "submittedAt"]   # the applications dashboard's list
+PET_STATUSES = ("Available", "Pending", "Adopted")
+SEARCH_COLUMNS = ("petName", "species", "breed", "shelter", "status")   # text the search box looks in
+PAGE_SIZE = 200
+
+
+def adoption_fee(species):
+    """Fee charged for a pet of the given (lowercased) species"""
+    if species == "dog":
+        return 250.00
+    if species == "cat":
+        return 150.00
+    return 0.00
+
+
+def parse_range(text, convert=int):
+    """(low, high) from "3", "2-5", "2-" or "-5" (either end None when open); None if blank"""
+    text = text.strip()
+    if not text:
+        return None
+    low, dash, high = (part.strip() for part in text.partition("-"))
+    if not dash:
+        value = convert(low)
+        return (value, value)
+    if not low and not high:
+        raise ValueError(f"Empty range: {text!r}")
+    bounds = (convert(low) if low else None, convert(high) if high else None)
+    if None not in bounds and bounds[0] > bounds[1]:
+        raise ValueError(f"Range is backwards: {text!r}")
+    return bounds
+
+
+def available_pets_query(species="", breed="", age=None, fee=None):
+    """Available pets matching all of the given criteria.
+
+    age and fee are (low, high) bounds as parse_range returns them; a plain
+    number for age means exactly that age.
+    """
+    where_clauses, params = ["status = 'Available'"], []
+
+    if species:
+        where_clauses.append("LOWER(species) LIKE %s")
+        params.append(f"%{species}%")
+    if breed:
+        where_clauses.append("LOWER(breed) LIKE %s")
+        params.append(f"%{breed}%")
+    if isinstance(age, int):
+        age = (age, age)
+    for column, bounds in (("age", age), ("adoptionFee", fee)):
+        low, high = bounds or (None, None)
+        if low is not None:
+            where_clauses.append(f"{column} >= %s")
+            params.append(low)
+        if high is not None:
+            where_clauses.append(f"{column} <= %s")
+            params.append(high)
+
+    return KeysetQuery(PET_COLUMNS, "pets", [("petId", "ASC")], where=" AND ".join(where_clauses), params=params)
+
+
+def _literal(text):
+    """text as a LIKE pattern matching itself, for LIKE ... ESCAPE '!'"""
+    return text.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def pet_search_query(text):
+    """SQL fallback for the search box, matching the way PetSearchIndex does.
+
+    Every term of text (normalised) must match: one of three or more
+    characters anywhere in SEARCH_COLUMNS, a shorter one at the start of a
+    word there (after a space or hyphen), and a number also as the exact
+    petId or age. "husky 3" thus finds the same pets with or without the index.
+    """
+    clauses, params = [], []
+    for term in text.split():
+        pattern = _literal(term)
+        if len(term) >= 3:
+            patterns = [f"%{pattern}%"]
+        else:
+            patterns = [f"{pattern}%", f"% {pattern}%", f"%-{pattern}%"]
+        options = []
+        for column in SEARCH_COLUMNS:
+            for like in patterns:
+                options.append(f"LOWER({column}) LIKE %s ESCAPE '!'")
+                params.append(like)
+        if term.isdigit():
+            options += ["petId = %s", "age = %s"]
+            params += [int(term), int(term)]
+        clauses.append(f"({' OR '.join(options)})")
+    return KeysetQuery(PET_COLUMNS, "pets", [("petId", "ASC")], where=" AND ".join(clauses) or None, params=params)
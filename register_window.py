@@ -1,6 +1,9 @@
+from decimal import Decimal
 from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QDialog, QLabel, QLineEdit, QTextEdit, QComboBox, QFormLayout, QHBoxLayout, QVBoxLayout, QPushButton
+from PyQt6.QtWidgets import QDialog, QLabel, QLineEdit, QTextEdit, QComboBox, QFormLayout, QHBoxLayout, QVBoxLayout, QPushButton, QFileDialog
 from mysql.connector import Error
+from queries import PET_STATUSES, adoption_fee
+from bulk_import import import_pets
 
 class RegisterWindow(QDialog):
     def __init__(self, parent=None):
@@ -23,7 +26,7 @@ class RegisterWindow(QDialog):
         self.shelterLE = QLineEdit()
 
         self.statusCombo = QComboBox()
-        self.statusCombo.addItems(["Available", "Pending", "Adopted"])
+        self.statusCombo.addItems(PET_STATUSES)
 
         self.commentsTE = QTextEdit()
         self.commentsTE.setPlaceholderText("Enter any comments or notes about this pet...")
@@ -44,8 +47,10 @@ class RegisterWindow(QDialog):
         save_btn = QPushButton("Save")
         reset_btn = QPushButton("Reset")
         close_btn = QPushButton("Close")
+        self.import_btn = QPushButton("Import File...")
 
         save_btn.clicked.connect(self.add_pet)
+        self.import_btn.clicked.connect(self.import_file)
         reset_btn.clicked.connect(self.reset_fields)
         close_btn.clicked.connect(self.close)
 
@@ -54,15 +59,26 @@ class RegisterWindow(QDialog):
         btn_layout.addWidget(save_btn)
         btn_layout.addWidget(close_btn)
 
+        self.import_label = QLabel("Import many pets at once from a CSV or JSONL file.")
+        self.import_label.setWordWrap(True)
+        import_layout = QHBoxLayout()
+        import_layout.addWidget(self.import_label, 1)
+        import_layout.addWidget(self.import_btn)
+
         layout = QVBoxLayout()
         layout.addWidget(title)
         layout.addLayout(form)
         layout.addLayout(btn_layout)
+        layout.addLayout(import_layout)
         layout.setContentsMargins(20, 20, 20, 20)
         self.setLayout(layout)
         self.setFixedWidth(450)
         self.adjustSize()
 
+    def done(self, result):
+        self.parent_window.executor.cancel_owner(self)
+        super().done(result)
+
     def reset_fields(self):
         self.petIdLE.clear(); self.petNameLE.clear(); self.speciesLE.clear(); self.breedLE.clear()
         self.ageLE.clear(); self.genderLE.clear(); self.sizeLE.clear(); self.shelterLE.clear()
@@ -85,48 +101,61 @@ class RegisterWindow(QDialog):
                 print("Error: Name, Species, and Breed are required fields")
                 return
 
-            if species == "dog":
-                adoptionFee = 250.00
-            elif species == "cat":
-                adoptionFee = 150.00
-            else:
-                adoptionFee = 0.00
-
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-
-                cursor.execute("SELECT petId FROM pets WHERE petId = %s", (petId,))
-                existing_pet = cursor.fetchone()
-
-                if existing_pet:
-                    cursor.execute("""
-                        UPDATE pets 
-                        SET petName=%s, species=%s, breed=%s, age=%s, gender=%s,
-                            size=%s, shelter=%s, adoptionFee=%s, status=%s, comments=%s
-                        WHERE petId=%s
-                    """, (petName, species, breed, age, gender, size, shelter, adoptionFee, status, comments, petId))
-                    print(f"Pet updated in database: ID={petId}, Name={petName}")
-                else:
-                    cursor.execute("""
-                        INSERT INTO pets (petId, petName, species, breed, age, 
-                                         gender, size, shelter, adoptionFee, status, comments) 
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (petId, petName, species, breed, age, gender, size, shelter, adoptionFee, status, comments))
-                    print(f"Pet registered successfully in database: ID={petId}, Name={petName}")
-
-                self.parent_window.connection.commit()
-                cursor.close()
-                print(f"✓ Pet '{petName}' saved successfully to database!")
+            adoptionFee = adoption_fee(species)
+
+            record = (petId, petName, species, breed, age, gender, size, shelter,
+                      Decimal(f"{adoptionFee:.2f}"), status, comments)
+            if self.parent_window.store.save_pet(record):
+                print(f"Pet updated in database: ID={petId}, Name={petName}")
             else:
-                print("Error: Database connection not available.")
-                return
+                print(f"Pet registered successfully in database: ID={petId}, Name={petName}")
+            print(f"✓ Pet '{petName}' saved successfully to database!")
+            self.parent_window.pet_saved(record)
 
             self.reset_fields()
         except ValueError as ve:
             print(f"Invalid input - ID and age must be numbers: {ve}")
         except Error as e:
             print(f"Database error: {e}")
-            if self.parent_window.connection:
-                self.parent_window.connection.rollback()
         except Exception as e:
             print(f"Unexpected error: {e}")
+
+    # --- Bulk import ---
+    def import_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Pets", "", "Pet files (*.csv *.jsonl);;All files (*)")
+        if not path:
+            return
+        store = self.parent_window.store
+        # Committed chunks go straight to the main window (queued to the GUI
+        # thread), so they reach its views even if this dialog closes mid-import.
+        written = self.parent_window.petsWritten.emit
+
+        def work(task):
+            report = import_pets(store, path, on_progress=lambda report: task.emit_chunk(report.summary()),
+                                 cancelled=task.is_cancelled, on_written=written)
+            if report.cancelled:
+                print(f"Import of {path} stopped when the window closed: {report.summary()}")
+            return report
+
+        self.import_btn.setEnabled(False)
+        self.import_label.setText("Importing...")
+        self.parent_window.executor.submit(
+            (self, "import"), work,
+            on_result=self.import_finished, on_error=self.import_failed, label="bulk_import",
+            on_chunk=self.import_label.setText,
+        )
+
+    def import_finished(self, report):
+        self.import_btn.setEnabled(True)
+        for line_no, message in report.errors:
+            print(f"Import error, line {line_no}: {message}")
+        print(f"Imported {report.path}: {report.summary()}")
+        self.import_label.setText(report.summary())
+
+    def import_failed(self, e):
+        self.import_btn.setEnabled(True)
+        if isinstance(e, Error):
+            self.import_label.setText(f"Database error: {e}")
+        else:
+            self.import_label.setText(f"Import failed: {e}")
+        print(f"Import failed: {e}")
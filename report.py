@@ -0,0 +1,170 @@
+"""Headless reports over the pets and applications tables.
+
+Every report is a single GROUP BY query answered by the server; its rows are
+read with fetchmany and written out as they arrive, so memory use does not
+grow with the size of the tables.
+
+    python report.py                                # every report, JSON on stdout
+    python report.py shelter species --format csv -o nightly.csv
+    python report.py funnel monthly --since 2025-01-01 --db sqlite:pets.db
+"""
+import argparse
+import contextlib
+import csv
+import datetime
+import decimal
+import json
+import sys
+
+from mysql.connector import Error
+
+from metrics import METRICS
+
+FETCH_SIZE = 500
+
+
+def _pet_breakdown(column):
+    return f"""
+        SELECT {column}, COUNT(*) AS pets,
+               SUM(CASE WHEN status = 'Available' THEN 1 ELSE 0 END) AS available,
+               SUM(CASE WHEN status = 'Pending' THEN 1 ELSE 0 END) AS pending,
+               SUM(CASE WHEN status = 'Adopted' THEN 1 ELSE 0 END) AS adopted,
+               SUM(adoptionFee) AS fee_total, ROUND(AVG(age), 2) AS avg_age
+        FROM pets GROUP BY {column} ORDER BY {column}
+    """
+
+
+_APPLICATION_TOTALS = """
+        COUNT(*) AS applications,
+        SUM(CASE WHEN appStatus = 'Submitted' THEN 1 ELSE 0 END) AS open,
+        SUM(CASE WHEN appStatus = 'Approved' THEN 1 ELSE 0 END) AS approved,
+        SUM(CASE WHEN appStatus = 'Denied' THEN 1 ELSE 0 END) AS denied,
+        COUNT(DISTINCT petId) AS pets
+"""
+
+# name -> (description, SQL, whether --since/--until apply to it)
+REPORTS = {
+    "shelter": ("Pets per shelter", _pet_breakdown("shelter"), False),
+    "species": ("Pets per species", _pet_breakdown("species"), False),
+    "status": ("Pets per status", _pet_breakdown("status"), False),
+    "size": ("Pets per size", _pet_breakdown("size"), False),
+    "fees": ("Adoption fees per species: listed (Available/Pending) and collected (Adopted)", """
+        SELECT species, COUNT(*) AS pets,
+               SUM(CASE WHEN status <> 'Adopted' THEN adoptionFee ELSE 0 END) AS fees_listed,
+               SUM(CASE WHEN status = 'Adopted' THEN adoptionFee ELSE 0 END) AS fees_collected,
+               SUM(adoptionFee) AS fee_total, MIN(adoptionFee) AS min_fee, MAX(adoptionFee) AS max_fee
+        FROM pets GROUP BY species ORDER BY species
+    """, False),
+    "funnel": ("Applications per status", """
+        SELECT appStatus, COUNT(*) AS applications, COUNT(DISTINCT petId) AS pets,
+               MIN(submittedAt) AS first_submitted, MAX(submittedAt) AS last_submitted
+        FROM applications{where} GROUP BY appStatus ORDER BY appStatus
+    """, True),
+    "monthly": ("Application funnel per month submitted", f"""
+        SELECT SUBSTR(CAST(submittedAt AS CHAR), 1, 7) AS month, {_APPLICATION_TOTALS}
+        FROM applications{{where}} GROUP BY month ORDER BY month
+    """, True),
+}
+
+
+def date_filter(since=None, until=None):
+    """WHERE clause (with leading space) and params limiting submittedAt to a date range"""
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("submittedAt >= %s")
+        params.append(since)
+    if until is not None:
+        clauses.append("submittedAt < %s")
+        params.append(until + datetime.timedelta(days=1))
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def stream_report(pool, name, since=None, until=None, fetch_size=FETCH_SIZE):
+    """Yield the column names of report name, then its rows one at a time"""
+    _, sql, dated = REPORTS[name]
+    params = []
+    if dated:
+        where, params = date_filter(since, until)
+        sql = sql.format(where=where)
+    with METRICS.operation(f"report.{name}"), pool.cursor() as cursor:
+        cursor.execute(sql, tuple(params))
+        yield [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def _plain(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+    return value
+
+
+def write_csv(pool, names, out, **filters):
+    """One section per report: a header row, then its rows, each led by the report name"""
+    writer = csv.writer(out)
+    for name in names:
+        rows = stream_report(pool, name, **filters)
+        writer.writerow(["report"] + next(rows))
+        for row in rows:
+            writer.writerow([name] + [_plain(value) for value in row])
+
+
+def write_json(pool, names, out, **filters):
+    """{"report": [{column: value, ...}, ...], ...} written row by row"""
+    out.write("{")
+    for i, name in enumerate(names):
+        rows = stream_report(pool, name, **filters)
+        columns = next(rows)
+        out.write(f'{"," if i else ""}\n  {json.dumps(name)}: [')
+        for j, row in enumerate(rows):
+            record = {column: _plain(value) for column, value in zip(columns, row)}
+            out.write(f'{"," if j else ""}\n    {json.dumps(record)}')
+        out.write("\n  ]")
+    out.write("\n}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pet and application reports computed by the database",
+        epilog="Reports: " + "; ".join(f"{name} - {description}" for name, (description, _, _) in REPORTS.items()))
+    parser.add_argument("reports", nargs="*", metavar="report", help="reports to run (default: all)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("-o", "--output", help="write to this file instead of stdout")
+    parser.add_argument("--since", type=datetime.date.fromisoformat,
+                        help="only applications submitted on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=datetime.date.fromisoformat,
+                        help="only applications submitted on or before this date (YYYY-MM-DD)")
+    parser.add_argument("--db", help='e.g. "sqlite:pets.db" (default: $PETADOPTION_DB, else MySQL)')
+    args = parser.parse_args(argv)
+
+    names = args.reports or list(REPORTS)
+    unknown = [name for name in names if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}; choose from {', '.join(REPORTS)}")
+
+    from store import open_store
+    with contextlib.redirect_stdout(sys.stderr):   # keep stdout for the report itself
+        store = open_store(args.db)
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        write = write_csv if args.format == "csv" else write_json
+        write(store.pool, names, out, since=args.since, until=args.until)
+    except Error as e:
+        print(f"Report failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        store.close()
+    if args.output:
+        print(f"Report written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import time
+from collections import OrderedDict, namedtuple
+
+from queries import PET_COLUMNS, SEARCH_COLUMNS
+
+SEARCH_POSITIONS = tuple(PET_COLUMNS.index(column) for column in SEARCH_COLUMNS)   # in a PET_COLUMNS record
+
+# rows: the cached rows; total: size of the full result; next_token: keyset
+# token for the rest (None when rows is the complete result set).
+CachedResult = namedtuple('CachedResult', 'rows total next_token')
+
+
+def normalise_query(text):
+    return " ".join(text.lower().split())
+
+
+class SearchCache:
+    """LRU cache of search results keyed by (namespace, normalised query).
+
+    Besides exact hits it can hand back a cached *complete* result that is a
+    superset of a new query (see find_superset), so a query the user is still
+    typing can be answered by filtering rows already in memory. Entries expire
+    after ttl seconds so writes from other workstations show up eventually;
+    local writes call invalidate().
+    """
+    def __init__(self, max_entries=128, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # (namespace, key) -> (stored_at, CachedResult)
+        self.hits = self.narrowed = self.misses = 0
+
+    def _fresh(self, cache_key):
+        item = self._entries.get(cache_key)
+        if item is None:
+            return None
+        stored_at, result = item
+        if self.ttl and time.monotonic() - stored_at > self.ttl:
+            del self._entries[cache_key]
+            return None
+        return result
+
+    def get(self, namespace, key):
+        result = self._fresh((namespace, key))
+        if result is None:
+            return None
+        self._entries.move_to_end((namespace, key))
+        self.hits += 1
+        return result
+
+    def find_superset(self, namespace, refines):
+        """Smallest complete cached result whose query the new one refines.
+
+        refines(old_key) must only return True when every row matching the new
+        query also matches old_key.
+        """
+        best = None
+        for ns, key in list(self._entries):
+            if ns != namespace:
+                continue
+            result = self._fresh((ns, key))
+            if result is None or result.next_token is not None or not refines(key):
+                continue
+            if best is None or len(result.rows) < len(best[1].rows):
+                best = (key, result)
+        if best is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((namespace, best[0]))
+        self.narrowed += 1
+        return best[1]
+
+    def put(self, namespace, key, rows, total=None, next_token=None):
+        result = CachedResult(list(rows), len(rows) if total is None else total, next_token)
+        self._entries[(namespace, key)] = (time.monotonic(), result)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, namespace=None):
+        if namespace is None:
+            self._entries.clear()
+        else:
+            for cache_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[cache_key]
+
+    def statistics(self):
+        return {'entries': len(self._entries), 'hits': self.hits,
+                'narrowed': self.narrowed, 'misses': self.misses}
+
+
+# --- Refinement rules and in-memory filters for the pet searches ---
+
+def _substring_term(term):
+    return len(term) >= 3 and not term.isdigit()
+
+
+def extends_terms(old, new):
+    """True if every pet matching the search new also matches old (AND of terms)"""
+    new_terms = new.split()
+    for term in old.split():
+        if term in new_terms:
+            continue
+        if not (_substring_term(term) and any(_substring_term(u) and term in u for u in new_terms)):
+            return False
+    return True
+
+
+def _term_matches(record, term):
+    texts = [str(record[position] or "").lower() for position in SEARCH_POSITIONS]
+    if len(term) >= 3:
+        found = any(term in text for text in texts)
+    else:
+        found = any(text.startswith(term) or f" {term}" in text or f"-{term}" in text for text in texts)
+    return found or (term.isdigit() and int(term) in (record[0], record[4]))
+
+
+def search_matches(record, text):
+    """Python version of pet_search_query for one PET_COLUMNS record"""
+    return all(_term_matches(record, term) for term in text.split())
+
+
+def _within(new, old):
+    """True if the (low, high) bounds new lie inside old; None means unbounded"""
+    if old is None:
+        return True
+    if new is None:
+        return False
+    (new_low, new_high), (old_low, old_high) = new, old
+    return ((old_low is None or (new_low is not None and new_low >= old_low))
+            and (old_high is None or (new_high is not None and new_high <= old_high)))
+
+
+def in_range(value, bounds):
+    if bounds is None:
+        return True
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def extends_adopt(old, new):
+    """Adopt criteria are AND-ed, so a refinement may add or narrow criteria but never widen one"""
+    old_species, old_breed, old_age, old_fee = old
+    new_species, new_breed, new_age, new_fee = new
+    return (old_species in new_species and old_breed in new_breed
+            and _within(new_age, old_age) and _within(new_fee, old_fee))
+
+
+def adopt_matches(record, key):
+    species, breed, age, fee = key
+    return (species in str(record[2]).lower() and breed in str(record[3]).lower()
+            and in_range(record[4], age) and in_range(record[8], fee))
@@ -0,0 +1,163 @@
+import bisect
+import re
+from collections import defaultdict
+
+from loadable_index import LoadableIndex
+from queries import PET_COLUMNS, SEARCH_COLUMNS
+
+# Positions in a PET_COLUMNS record
+ID, NAME, SPECIES, BREED, AGE, STATUS = 0, 1, 2, 3, 4, 9
+TEXT_FIELDS = tuple(PET_COLUMNS.index(column) for column in SEARCH_COLUMNS)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def tokens(text):
+    return set(_TOKEN_RE.findall(text))
+
+
+class PetSearchIndex(LoadableIndex):
+    """In-memory inverted index over pet name, species, breed, shelter and status.
+
+    A search is split into whitespace-separated terms that must all match (AND):
+      - numeric terms hit exact petId / age postings, plus any text containing them,
+      - terms of three or more characters match substrings via trigram postings,
+      - shorter terms match word prefixes ("hu" finds "Husky").
+    The index is filled once with load() and then kept current by upsert(),
+    update_status(), update_comments() and remove() (see LoadableIndex).
+    """
+    def __init__(self):
+        super().__init__()
+        self._records = {}                  # petId -> record (PET_COLUMNS order)
+        self._texts = {}                    # petId -> lowercased searchable text fields
+        self._trigrams = defaultdict(set)   # trigram -> petIds
+        self._tokens = defaultdict(set)     # word -> petIds
+        self._ages = defaultdict(set)       # age -> petIds
+        self._vocab = []                    # sorted words, for prefix lookups
+
+    def __len__(self):
+        return len(self._records)
+
+    # --- Building ---
+    def _add(self, record):
+        pet_id = record[ID]
+        if pet_id in self._records:
+            self._drop(pet_id)
+        texts = tuple(str(record[pos] or "").lower() for pos in TEXT_FIELDS)
+        self._records[pet_id] = tuple(record)
+        self._texts[pet_id] = texts
+        for text in texts:
+            for gram in trigrams(text):
+                self._trigrams[gram].add(pet_id)
+            for word in tokens(text):
+                postings = self._tokens[word]
+                if not postings:
+                    bisect.insort(self._vocab, word)
+                postings.add(pet_id)
+        self._ages[record[AGE]].add(pet_id)
+
+    def _drop(self, pet_id):
+        record = self._records.pop(pet_id)
+        texts = self._texts.pop(pet_id)
+        for text in texts:
+            for gram in trigrams(text):
+                postings = self._trigrams.get(gram)
+                if postings is not None:
+                    postings.discard(pet_id)
+                    if not postings:
+                        del self._trigrams[gram]
+            for word in tokens(text):
+                postings = self._tokens.get(word)
+                if postings is not None:
+                    postings.discard(pet_id)
+                    if not postings:
+                        del self._tokens[word]
+                        i = bisect.bisect_left(self._vocab, word)
+                        if i < len(self._vocab) and self._vocab[i] == word:
+                            del self._vocab[i]
+        ages = self._ages.get(record[AGE])
+        if ages is not None:
+            ages.discard(pet_id)
+            if not ages:
+                del self._ages[record[AGE]]
+
+    # --- Incremental updates ---
+    def _load_row(self, record):
+        self._add(record)
+
+    def _upsert(self, record):
+        self._add(record)
+
+    def _remove(self, pet_id):
+        if pet_id in self._records:
+            self._drop(pet_id)
+
+    def _update(self, pet_id, column, value):
+        record = self._records.get(pet_id)
+        if record is None:
+            return False
+        record = list(record)
+        record[PET_COLUMNS.index(column)] = value
+        self._add(record)
+        return True
+
+    def get(self, pet_id):
+        with self._lock:
+            return self._records.get(pet_id)
+
+    # --- Querying ---
+    def search(self, text, within=None):
+        """Records matching every term of text, ordered by petId.
+
+        within optionally restricts the search to a set of petIds already known
+        to contain every match (e.g. the results of a shorter query).
+        """
+        terms = text.lower().split()
+        with self._lock:
+            ids = set(self._records) if within is None else {i for i in within if i in self._records}
+            for term in sorted(terms, key=len, reverse=True):
+                ids &= self._match(term, ids)
+                if not ids:
+                    return []
+            return [self._records[pet_id] for pet_id in sorted(ids)]
+
+    def _match(self, term, within):
+        if len(term) < 3:
+            matches = self._prefix(term)
+        else:
+            matches = self._substring(term, within)
+        if term.isdigit():
+            number = int(term)
+            if number in self._records:
+                matches.add(number)
+            matches |= self._ages.get(number, set())
+        return matches
+
+    def _prefix(self, term):
+        matches = set()
+        i = bisect.bisect_left(self._vocab, term)
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            matches |= self._tokens[self._vocab[i]]
+            i += 1
+        return matches
+
+    def _substring(self, term, within):
+        postings = [within]
+        for gram in trigrams(term):
+            found = self._trigrams.get(gram)
+            if not found:
+                return set()
+            postings.append(found)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for found in postings[1:]:
+            candidates &= found
+            if not candidates:
+                return candidates
+        # Trigrams can all be present without being contiguous, so confirm.
+        return {pet_id for pet_id in candidates
+                if any(term in text for text in self._texts[pet_id])}
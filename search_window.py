@@ -1,7 +1,22 @@
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QDialog, QLabel, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QComboBox
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QDialog, QLabel, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout, QTableView, QHeaderView
 from mysql.connector import Error
 from comments_dialog import PetCommentsDialog
+from delegates import ButtonDelegate, ComboBoxDelegate
+from facets import FACETS, describe
+from pagination import Page
+from pet_model import PetListModel
+from queries import PAGE_SIZE, PET_STATUSES, pet_search_query
+from search_cache import normalise_query, extends_terms, search_matches
+
+DEBOUNCE_MS = 250
+STATUS_COLUMN = 10
+
+RESULT_COLUMNS = [
+    ("ID", 0, str), ("Name", 1, str), ("Species", 2, str), ("Breed", 3, str), ("Age", 4, str),
+    ("Gender", 5, str), ("Size", 6, str), ("Shelter", 7, str), ("Fee", 8, lambda fee: f"${fee}"),
+    ("Status", 9, str), ("Change Status", 9, str),
+]
 
 class SearchWindow(QDialog):
     def __init__(self, parent=None):
@@ -17,6 +32,20 @@ class SearchWindow(QDialog):
         self.searchLE.setPlaceholderText("Enter pet ID, name, species, breed, age, or shelter")
         self.searchLE.setStyleSheet("padding:5px;")
 
+        # Search as you type: wait for a pause in typing before querying.
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.search_pet)
+        self.searchLE.textChanged.connect(self.debounce.start)
+        self.searchLE.returnPressed.connect(self.search_pet)
+
+        # How many pets each species / breed / shelter / size / status matching a
+        # typed word has, from the live facet counts; refreshed with each search.
+        self.facets_label = QLabel("")
+        self.facets_label.setWordWrap(True)
+        self.facets_label.setStyleSheet("color: gray;")
+
         btn_search = QPushButton("Search")
         btn_clear = QPushButton("Clear")
         btn_close = QPushButton("Close")
@@ -27,121 +56,230 @@ class SearchWindow(QDialog):
         btn_row = QHBoxLayout()
         btn_row.addWidget(btn_search); btn_row.addWidget(btn_clear); btn_row.addWidget(btn_close)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(12)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Name", "Species", "Breed", "Age",
-            "Gender", "Size", "Shelter", "Fee", "Status", "Change Status", "View"
-        ])
+        self.count_label = QLabel("")
+        self.btn_more = QPushButton("Load More")
+        self.btn_more.setEnabled(False)
+        self.btn_more.clicked.connect(self.load_more)
+        self.next_token = None
+        self.query = None
+        self.matches = None
+        self.total = 0
+
+        # Only the rows scrolled into view are painted, and rows are appended as
+        # they stream in from the database.
+        self.model = PetListModel(RESULT_COLUMNS, actions=["View"], editable=[STATUS_COLUMN], parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.setAlternatingRowColors(True)
 
+        # The status drop-down and View button are drawn by delegates; only the
+        # cell being edited gets a real combo box.
+        self.status_delegate = ComboBoxDelegate(PET_STATUSES, self.table)
+        self.status_delegate.chosen.connect(self.status_chosen)
+        self.view_delegate = ButtonDelegate(self.table)
+        self.view_delegate.clicked.connect(lambda index: self.view_comments(*self.comments_of(index.row())))
+        self.table.setItemDelegateForColumn(STATUS_COLUMN, self.status_delegate)
+        self.table.setItemDelegateForColumn(len(RESULT_COLUMNS), self.view_delegate)
+        self.table.clicked.connect(self.handle_table_click)
+
         layout = QVBoxLayout()
         layout.addWidget(title)
         layout.addWidget(self.searchLE)
+        layout.addWidget(self.facets_label)
         layout.addLayout(btn_row)
         layout.addWidget(self.table)
+        # "Did you mean ...?" when a misspelt name, species or breed finds nothing (see fuzzy.py)
+        self.suggestion = None
+        self.suggest_btn = QPushButton("")
+        self.suggest_btn.setFlat(True)
+        self.suggest_btn.setStyleSheet("color: #2986cc; text-align: left;")
+        self.suggest_btn.clicked.connect(self.use_suggestion)
+        self.suggest_btn.hide()
+        more_row = QHBoxLayout()
+        more_row.addWidget(self.count_label); more_row.addWidget(self.suggest_btn)
+        more_row.addStretch(); more_row.addWidget(self.btn_more)
+        layout.addLayout(more_row)
         layout.setContentsMargins(20, 20, 20, 20)
         self.setLayout(layout)
         self.setFixedSize(1000, 600)
+        self.parent_window.pet_views.append(self)
+        self.show_facets()
+
+    def done(self, result):
+        self.parent_window.executor.cancel_owner(self)
+        if self in self.parent_window.pet_views:
+            self.parent_window.pet_views.remove(self)
+        super().done(result)
+
+    def refresh(self):
+        self.search_pet()
+
+    def apply_pet_changes(self, records):
+        """Patch rows for pets that changed; pets not on screen are left alone"""
+        self.model.patch_rows(records)
 
     def clear_fields(self):
+        self.searchLE.blockSignals(True)
         self.searchLE.clear()
-        self.table.setRowCount(0)
+        self.searchLE.blockSignals(False)
+        self.debounce.stop()
+        self.parent_window.executor.cancel_owner(self)
+        self.model.clear()
+        self.count_label.setText("")
+        self.btn_more.setEnabled(False)
+        self.suggest_btn.hide()
+        self.show_facets()
+
+    def show_facets(self):
+        facets = self.parent_window.facets
+        if not facets.ready:
+            self.facets_label.setText("")
+            return
+        text = normalise_query(self.searchLE.text())
+        parts = []
+        for facet in FACETS:
+            top = facets.top(facet, text, limit=3, any_word=True)
+            if top:
+                parts.append(f"{facet.capitalize()}: {describe(top)}")
+        self.facets_label.setText("    ".join(parts) if parts else "No species, breed, shelter, size or status matches.")
 
     def search_pet(self):
-        query = self.searchLE.text().strip().lower()
-        try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                if query == "":
-                    cursor.execute("""
-                        SELECT petId, petName, species, breed, age, 
-                               gender, size, shelter, adoptionFee, status, comments 
-                        FROM pets ORDER BY petId
-                    """)
-                else:
-                    search_query = """
-                        SELECT petId, petName, species, breed, age, 
-                               gender, size, shelter, adoptionFee, status, comments 
-                        FROM pets 
-                        WHERE LOWER(petName) LIKE %s 
-                           OR LOWER(species) LIKE %s 
-                           OR LOWER(breed) LIKE %s 
-                           OR LOWER(shelter) LIKE %s 
-                           OR LOWER(status) LIKE %s
-                           OR CAST(petId AS CHAR) LIKE %s
-                           OR CAST(age AS CHAR) LIKE %s
-                        ORDER BY petId
-                    """
-                    term = f"%{query}%"
-                    cursor.execute(search_query, (term, term, term, term, term, term, term))
-
-                records = cursor.fetchall()
-                cursor.close()
-
-                self.table.setRowCount(len(records))
-                for row_idx, record in enumerate(records):
-                    petId, petName, species, breed, age, gender, size, shelter, adoptionFee, status, comments = record
-
-                    self.table.setItem(row_idx, 0, QTableWidgetItem(str(petId)))
-                    self.table.setItem(row_idx, 1, QTableWidgetItem(petName))
-                    self.table.setItem(row_idx, 2, QTableWidgetItem(species))
-                    self.table.setItem(row_idx, 3, QTableWidgetItem(breed))
-                    self.table.setItem(row_idx, 4, QTableWidgetItem(str(age)))
-                    self.table.setItem(row_idx, 5, QTableWidgetItem(gender))
-                    self.table.setItem(row_idx, 6, QTableWidgetItem(size))
-                    self.table.setItem(row_idx, 7, QTableWidgetItem(shelter))
-                    self.table.setItem(row_idx, 8, QTableWidgetItem(f"${adoptionFee}"))
-                    self.table.setItem(row_idx, 9, QTableWidgetItem(status))
-
-                    status_combo = QComboBox()
-                    status_combo.addItems(["Available", "Pending", "Adopted"])
-                    status_combo.setCurrentText(status)
-                    status_combo.currentTextChanged.connect(
-                        lambda new_status, pid=petId, pname=petName: self.change_pet_status(pid, pname, new_status)
-                    )
-                    self.table.setCellWidget(row_idx, 10, status_combo)
-
-                    view_btn = QPushButton("View")
-                    view_btn.clicked.connect(
-                        lambda checked, pid=petId, pname=petName, comm=comments: self.view_comments(pid, pname, comm)
-                    )
-                    self.table.setCellWidget(row_idx, 11, view_btn)
-
-                if not records:
-                    self.table.setRowCount(1)
-                    self.table.setItem(0, 0, QTableWidgetItem("No pets found"))
-            else:
-                self.table.setRowCount(1)
-                self.table.setItem(0, 0, QTableWidgetItem("No database connection"))
-        except Error as e:
-            print(f"Database error: {e}")
-            self.table.setRowCount(1)
-            self.table.setItem(0, 0, QTableWidgetItem(f"Error: {e}"))
-        except Exception as e:
-            print(f"Error: {e}")
-            self.table.setRowCount(1)
-            self.table.setItem(0, 0, QTableWidgetItem(f"Error: {e}"))
+        self.debounce.stop()
+        self.suggest_btn.hide()
+        self.show_facets()
+        self.parent_window.executor.cancel_owner(self)
+        query = normalise_query(self.searchLE.text())
+        cache = self.parent_window.search_cache
+        self.model.clear()
+
+        index = self.parent_window.search_index
+        if index.ready:
+            # Fast path: answer from the in-memory index, no database round trip.
+            cached = cache.get("search-index", query)
+            if cached is None:
+                base = cache.find_superset("search-index", lambda old: extends_terms(old, query))
+                within = {record[0] for record in base.rows} if base else None
+                cached = cache.put("search-index", query, index.search(query, within))
+            self.show_cached(cached)
+            return
+
+        cached = cache.get("search-sql", query)
+        if cached is None:
+            # The user extended an earlier query: filter its rows instead of re-querying.
+            base = cache.find_superset("search-sql", lambda old: extends_terms(old, query))
+            if base is not None:
+                cached = cache.put("search-sql", query, [r for r in base.rows if search_matches(r, query)])
+        if cached is not None and cached.next_token is None:
+            self.show_cached(cached)
+            return
+
+        self.matches = None
+        self.query = pet_search_query(query)
+        if cached is not None:
+            # First page is cached; further pages come from the database.
+            self.append_rows(cached.rows)
+            self.page_loaded(Page(cached.rows, cached.next_token, cached.total))
+            return
+        self.fetch_page(None, cache_key=query)
+
+    def show_cached(self, cached):
+        self.query = None
+        self.matches = cached.rows
+        self.show_matches()
+
+    def load_more(self):
+        if self.matches is not None:
+            self.show_matches()
+        elif self.query and self.next_token:
+            self.fetch_page(self.next_token)
+
+    def show_matches(self):
+        start = self.model.rowCount()
+        self.append_rows(self.matches[start:start + PAGE_SIZE])
+        self.total = len(self.matches)
+        self.btn_more.setEnabled(self.model.rowCount() < self.total)
+        self.update_count()
+
+    def fetch_page(self, token, cache_key=None):
+        query, pool = self.query, self.parent_window.pool
+        self.btn_more.setEnabled(False)
+        self.count_label.setText("Searching...")
+        # Runs on a worker thread; rows stream into the table as they arrive and a
+        # newer search cancels this one.
+        self.parent_window.executor.submit(
+            (self, "search"),
+            lambda task: query.fetch(pool, PAGE_SIZE, token, with_total=token is None,
+                                     on_chunk=task.emit_chunk, cancelled=task.is_cancelled),
+            on_result=lambda page: self.page_loaded(page, cache_key),
+            on_error=self.page_failed, on_chunk=self.append_rows, label="search_pet",
+        )
+
+    def page_loaded(self, page, cache_key=None):
+        if cache_key is not None:
+            self.parent_window.search_cache.put("search-sql", cache_key, page.rows, page.total, page.next_token)
+        if page.total is not None:
+            self.total = page.total
+        self.next_token = page.next_token
+        self.btn_more.setEnabled(page.next_token is not None)
+        self.update_count()
+
+    def update_count(self):
+        if not self.model.rowCount():
+            self.count_label.setText("No pets found")
+            self.show_suggestion()
+        else:
+            self.count_label.setText(f"Showing {self.model.rowCount()} of {self.total} pet(s)")
+
+    def show_suggestion(self):
+        """Offer the search with misspelt words replaced by their closest name, species or breed"""
+        fuzzy = self.parent_window.fuzzy
+        text = normalise_query(self.searchLE.text())
+        self.suggestion = fuzzy.correct(text) if text and fuzzy.ready else None
+        if self.suggestion is None:
+            self.suggest_btn.hide()
+            return
+        self.suggest_btn.setText(f'Did you mean "{self.suggestion}"?')
+        self.suggest_btn.show()
+
+    def use_suggestion(self):
+        if self.suggestion is None:
+            return
+        self.searchLE.blockSignals(True)
+        self.searchLE.setText(self.suggestion)
+        self.searchLE.blockSignals(False)
+        self.search_pet()
+
+    def page_failed(self, e):
+        print(f"Database error: {e}" if isinstance(e, Error) else f"Error: {e}")
+        self.count_label.setText(f"Error: {e}")
+
+    def append_rows(self, records):
+        self.model.append_rows(records)
+
+    def comments_of(self, row_idx):
+        record = self.model.record(row_idx)
+        return record[0], record[1], record[10]
+
+    def handle_table_click(self, index):
+        if index.column() == STATUS_COLUMN:
+            self.table.edit(index)
+
+    def status_chosen(self, index, new_status):
+        record = self.model.record(index.row())
+        if record is not None:
+            self.change_pet_status(record[0], record[1], new_status)
 
     def change_pet_status(self, pet_id, pet_name, new_status):
         try:
-            if self.parent_window.connection and self.parent_window.connection.is_connected():
-                cursor = self.parent_window.connection.cursor()
-                cursor.execute("UPDATE pets SET status = %s WHERE petId = %s", (new_status, pet_id))
-                self.parent_window.connection.commit()
-                cursor.close()
-                print(f"✓ Status updated: Pet '{pet_name}' (ID: {pet_id}) → {new_status}")
-            else:
-                print("Error: No database connection")
+            self.parent_window.store.set_pet_status(pet_id, new_status)
+            print(f"✓ Status updated: Pet '{pet_name}' (ID: {pet_id}) → {new_status}")
+            self.parent_window.pet_status_changed(pet_id, new_status)
         except Error as e:
             print(f"Database error updating status: {e}")
-            if self.parent_window.connection:
-                self.parent_window.connection.rollback()
         except Exception as e:
             print(f"Error updating status: {e}")
 
     def view_comments(self, pet_id, pet_name, comments):
-        dialog = PetCommentsDialog(self.parent_window, pet_id, pet_name, comments)
-        if dialog.exec():
-            self.search_pet()
+        # Saving comments syncs the change back into this table (see apply_pet_changes).
+        PetCommentsDialog(self.parent_window, pet_id, pet_name, comments).exec()
@@ -0,0 +1,28 @@
+"""Registry of statements worth a server-side prepared statement.
+
+Code that runs the same SQL over and over (single-pet lookups, status and
+comment updates, the submit path, change polling) defines it once with
+prepared(sql). ConnectionPool cursors recognise registered SQL and execute it
+through the connection's StatementCache, so MySQL parses it once per pooled
+connection instead of on every call. Everything else runs as before.
+"""
+import threading
+
+_lock = threading.Lock()
+_registered = set()
+
+
+def prepared(sql):
+    """Register sql and return it unchanged, for use as a module constant"""
+    with _lock:
+        _registered.add(sql)
+    return sql
+
+
+def is_prepared(sql):
+    return sql in _registered
+
+
+def registered():
+    with _lock:
+        return sorted(_registered)
@@ -0,0 +1,509 @@
+import datetime
+import functools
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from decimal import Decimal
+
+from mysql.connector import errors
+
+from metrics import METRICS, InstrumentedCursor
+from pet_cache import PetCache
+from queries import PET_COLUMNS
+from statements import is_prepared, prepared
+
+APPLICATION_FIELDS = ["petId", "petName", "adopterName", "adopterEmail", "adopterPhone",
+                      "ownedBefore", "awareNeeds", "readyCosts", "adoptionDate",
+                      "ownOtherPets", "otherPetsType", "livingSituation", "fencedYard",
+                      "primaryCaregiver", "notes"]
+APPLICATION_DETAIL_COLUMNS = ["appId"] + APPLICATION_FIELDS + ["appStatus", "submittedAt"]
+
+# Positions in a PET_COLUMNS record
+STATUS, COMMENTS = PET_COLUMNS.index("status"), PET_COLUMNS.index("comments")
+
+# Pet status an application decision leaves behind
+DECISION_PET_STATUS = {"Approved": "Adopted", "Denied": "Available"}
+
+# Statements run on every lookup and edit, prepared once per pooled connection (see statements.py)
+PET_BY_ID = prepared(f"SELECT {', '.join(PET_COLUMNS)} FROM pets WHERE petId = %s")
+PET_STATUS_BY_ID = prepared("SELECT status FROM pets WHERE petId = %s")
+SET_PET_STATUS = prepared("UPDATE pets SET status = %s WHERE petId = %s")
+SET_PET_COMMENTS = prepared("UPDATE pets SET comments = %s WHERE petId = %s")
+CLAIM_PET = prepared("UPDATE pets SET status = 'Pending' WHERE petId = %s AND status = 'Available'")
+APPLICATION_BY_ID = prepared(f"SELECT {', '.join(APPLICATION_DETAIL_COLUMNS)} FROM applications WHERE appId = %s")
+INSERT_APPLICATION = prepared(
+    f"INSERT INTO applications ({', '.join(APPLICATION_FIELDS)}, appStatus) "
+    f"VALUES ({', '.join(['%s'] * len(APPLICATION_FIELDS))}, 'Submitted')")
+
+# Rows changed by decide_applications(); pet_statuses maps each pet touched to its new status
+DecisionReport = namedtuple('DecisionReport', 'approved denied competing_denied pet_statuses')
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def _operation(method):
+    """Time a store method as metrics operation <method name>"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with METRICS.operation(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class PetStore:
+    """Every read and write the windows make, behind one interface.
+
+    The SQL here is plain enough to run unchanged on MySQL and SQLite; the only
+    engine-specific statement is the upsert, which subclasses provide. pool is
+    a db.ConnectionPool or anything with the same run/fetchall/fetchone/
+    execute/cursor methods (SQLitePool below). List screens page with
+    KeysetQuery objects executed on store.pool.
+
+    Pet records are kept in an LRU PetCache keyed by petId; every pet write
+    below updates it (write-through), and list screens can prime it with
+    remember_pets() so opening a pet that was just listed costs no query.
+    """
+    name = "database"
+    upsert_sql = None
+
+    def __init__(self, pool, pet_cache=None):
+        self.pool = pool
+        self.pet_cache = pet_cache or PetCache()
+
+    # --- Pets ---
+    @_operation
+    def get_pet(self, pet_id):
+        """Full record in PET_COLUMNS order, or None"""
+        record = self.pet_cache.get(pet_id)
+        if record is None:
+            record = self.pool.fetchone(PET_BY_ID, (pet_id,))
+            if record is not None:
+                self.pet_cache.put(record)
+        return record
+
+    def remember_pets(self, records):
+        """Cache full pet records that were just read by a list query"""
+        self.pet_cache.put_many(records)
+
+    @_operation
+    def save_pet(self, record):
+        """Insert or update one pet; returns True if it already existed"""
+        def save(cursor):
+            existed = self._existing_ids(cursor, [record[0]])
+            cursor.execute(self.upsert_sql, tuple(record))
+            return bool(existed)
+        existed = self.pool.run(save, write=True)
+        self.pet_cache.put(record)
+        return existed
+
+    @_operation
+    def upsert_pets(self, records):
+        """Insert or update many pets in one transaction; returns the petIds that already existed"""
+        def save(cursor):
+            existed = self._existing_ids(cursor, [record[0] for record in records])
+            cursor.executemany(self.upsert_sql, [tuple(record) for record in records])
+            return existed
+        existed = self.pool.run(save, write=True)
+        self.pet_cache.put_many(records)
+        return existed
+
+    @staticmethod
+    def _existing_ids(cursor, ids):
+        cursor.execute(f"SELECT petId FROM pets WHERE petId IN ({', '.join(['%s'] * len(ids))})", ids)
+        return {row[0] for row in cursor.fetchall()}
+
+    @_operation
+    def set_pet_status(self, pet_id, status):
+        rows = self.pool.execute(SET_PET_STATUS, (status, pet_id))
+        self.pet_cache.update(pet_id, STATUS, status)
+        return rows
+
+    @_operation
+    def set_pet_comments(self, pet_id, comments):
+        rows = self.pool.execute(SET_PET_COMMENTS, (comments, pet_id))
+        self.pet_cache.update(pet_id, COMMENTS, comments)
+        return rows
+
+    # --- Applications ---
+    @_operation
+    def get_application(self, app_id):
+        return self.pool.fetchone(APPLICATION_BY_ID, (app_id,))
+
+    @_operation
+    def application_pets(self, app_ids):
+        """{appId: petId} for those of app_ids that exist"""
+        if not app_ids:
+            return {}
+        return dict(self.pool.fetchall(
+            f"SELECT appId, petId FROM applications WHERE appId IN ({_placeholders(app_ids)})", tuple(app_ids)))
+
+    @_operation
+    def application_counts(self, where=None, params=()):
+        """Applications per appStatus among those matching where, from one GROUP BY"""
+        where_sql = f" WHERE {where}" if where else ""
+        rows = self.pool.fetchall(
+            f"SELECT appStatus, COUNT(*) FROM applications{where_sql} GROUP BY appStatus", tuple(params))
+        return {status: count for status, count in rows}
+
+    @_operation
+    def submit_application(self, values):
+        """Record an application (APPLICATION_FIELDS order) and mark the pet Pending.
+
+        Returns the pet's status as it was beforehand (None if there is no such
+        pet); the application is only written when that status was Available.
+        The pet is claimed with a conditional UPDATE, so of two workstations
+        submitting at once exactly one sees a row change; the other gets the
+        status the winner left behind and writes nothing.
+        """
+        pet_id = values[0]
+
+        def submit(cursor):
+            cursor.execute(CLAIM_PET, (pet_id,))
+            if cursor.rowcount != 1:
+                cursor.execute(PET_STATUS_BY_ID, (pet_id,))
+                row = cursor.fetchone()
+                return row[0] if row else None
+            cursor.execute(INSERT_APPLICATION, tuple(values))
+            return "Available"
+        previous = self.pool.run(submit, write=True)
+        if previous is None:
+            self.pet_cache.invalidate(pet_id)
+        elif previous.lower() == "available":
+            self.pet_cache.update(pet_id, STATUS, "Pending")
+        else:
+            self.pet_cache.update(pet_id, STATUS, previous)
+        return previous
+
+    def decide_application(self, app_id, pet_id, decision):
+        """Approve or deny one application; returns the pet's new status"""
+        return self.decide_applications([(app_id, pet_id, decision)]).pet_statuses.get(pet_id)
+
+    @_operation
+    def decide_applications(self, decisions):
+        """Approve or deny many applications in one transaction; returns a DecisionReport.
+
+        decisions are (appId, petId, "Approved"|"Denied") triples. Approving
+        also denies every other Submitted application for the same pet in one
+        set-based UPDATE and marks the pet Adopted. A denial puts its pet back
+        to Available, but only while the pet is still Pending.
+        """
+        for _, _, decision in decisions:
+            if decision not in DECISION_PET_STATUS:
+                raise ValueError(f"Unknown decision: {decision!r}")
+        approved = {app_id: pet_id for app_id, pet_id, decision in decisions if decision == "Approved"}
+        denied = [app_id for app_id, _, decision in decisions if decision == "Denied"]
+        adopted = list(approved.values())
+        if len(set(adopted)) != len(adopted):
+            raise ValueError("Only one application per pet can be approved")
+        released = list({pet_id for _, pet_id, decision in decisions if decision == "Denied"} - set(adopted))
+        pets = adopted + released
+
+        def decide(cursor):
+            denied_rows = approved_rows = competing_rows = 0
+            if denied:
+                cursor.execute(f"UPDATE applications SET appStatus = 'Denied' WHERE appId IN ({_placeholders(denied)})",
+                               denied)
+                denied_rows = cursor.rowcount
+            if approved:
+                app_ids = list(approved)
+                cursor.execute(f"UPDATE applications SET appStatus = 'Approved' WHERE appId IN ({_placeholders(app_ids)})",
+                               app_ids)
+                approved_rows = cursor.rowcount
+                cursor.execute(f"""
+                    UPDATE applications SET appStatus = 'Denied'
+                    WHERE petId IN ({_placeholders(adopted)}) AND appStatus = 'Submitted'
+                      AND appId NOT IN ({_placeholders(app_ids)})
+                """, adopted + app_ids)
+                competing_rows = cursor.rowcount
+                cursor.execute(f"UPDATE pets SET status = 'Adopted' WHERE petId IN ({_placeholders(adopted)})", adopted)
+            if released:
+                cursor.execute(f"UPDATE pets SET status = 'Available' "
+                               f"WHERE petId IN ({_placeholders(released)}) AND status = 'Pending'", released)
+            statuses = {}
+            if pets:
+                cursor.execute(f"SELECT petId, status FROM pets WHERE petId IN ({_placeholders(pets)})", pets)
+                statuses = dict(cursor.fetchall())
+            return DecisionReport(approved_rows, denied_rows, competing_rows, statuses)
+        report = self.pool.run(decide, write=True)
+        for pet_id, status in report.pet_statuses.items():
+            self.pet_cache.update(pet_id, STATUS, status)
+        return report
+
+    # --- Lifecycle ---
+    def connect(self):
+        """Open the pool's first connections; slow when the server is remote or down"""
+        return self.pool.prefill()
+
+    def statistics(self):
+        return self.pool.statistics()
+
+    def close(self):
+        self.pool.close()
+
+
+class MySQLStore(PetStore):
+    name = "MySQL"
+    upsert_sql = f"""
+        INSERT INTO pets ({', '.join(PET_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(PET_COLUMNS))}) AS new
+        ON DUPLICATE KEY UPDATE {', '.join(f'{col}=new.{col}' for col in PET_COLUMNS[1:])}
+    """
+
+    def connect(self):
+        try:
+            return super().connect()
+        except errors.Error as e:
+            from db import print_connection_help
+            print_connection_help(e)
+            raise
+
+
+# --- Embedded SQLite backend ---
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pets (
+  petId INTEGER PRIMARY KEY,
+  petName VARCHAR(100) NOT NULL,
+  species VARCHAR(50) NOT NULL,
+  breed VARCHAR(100) NOT NULL,
+  age INT NOT NULL,
+  gender VARCHAR(20),
+  size VARCHAR(20),
+  shelter VARCHAR(100),
+  adoptionFee DECIMAL(10,2) DEFAULT 0.00,
+  status VARCHAR(10) DEFAULT 'Available' CHECK (status IN ('Available','Pending','Adopted')),
+  comments TEXT,
+  updatedAt TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS applications (
+  appId INTEGER PRIMARY KEY AUTOINCREMENT,
+  petId INT NOT NULL,
+  petName VARCHAR(100) NOT NULL,
+  adopterName VARCHAR(100) NOT NULL,
+  adopterEmail VARCHAR(120) NOT NULL,
+  adopterPhone VARCHAR(60) NOT NULL,
+  ownedBefore VARCHAR(10) NOT NULL,
+  awareNeeds VARCHAR(10) NOT NULL,
+  readyCosts VARCHAR(10) NOT NULL,
+  adoptionDate DATE NOT NULL,
+  ownOtherPets VARCHAR(10) NOT NULL,
+  otherPetsType VARCHAR(200),
+  livingSituation VARCHAR(30) NOT NULL,
+  fencedYard VARCHAR(10) NOT NULL,
+  primaryCaregiver VARCHAR(120) NOT NULL,
+  notes TEXT,
+  appStatus VARCHAR(10) DEFAULT 'Submitted' CHECK (appStatus IN ('Submitted','Approved','Denied')),
+  submittedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updatedAt TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+"""
+
+# Indexes, plus triggers that do what MySQL's ON UPDATE CURRENT_TIMESTAMP(3) does.
+SQLITE_INDEXES = """
+CREATE INDEX IF NOT EXISTS applications_petId ON applications (petId);
+CREATE INDEX IF NOT EXISTS applications_appStatus ON applications (appStatus);
+CREATE INDEX IF NOT EXISTS applications_submittedAt ON applications (submittedAt, appStatus);
+"""
+for _table, _key in (("pets", "petId"), ("applications", "appId")):
+    SQLITE_INDEXES += f"""
+CREATE INDEX IF NOT EXISTS {_table}_updatedAt ON {_table} (updatedAt);
+CREATE TRIGGER IF NOT EXISTS {_table}_touch AFTER UPDATE ON {_table}
+FOR EACH ROW WHEN NEW.updatedAt IS OLD.updatedAt
+BEGIN
+  UPDATE {_table} SET updatedAt = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE {_key} = NEW.{_key};
+END;
+CREATE TRIGGER IF NOT EXISTS {_table}_stamp AFTER INSERT ON {_table}
+FOR EACH ROW WHEN NEW.updatedAt IS NULL
+BEGIN
+  UPDATE {_table} SET updatedAt = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE {_key} = NEW.{_key};
+END;
+"""
+
+# Hand back the same Python types mysql-connector does for these column types.
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+# Millisecond text sorts and compares the same way as the updatedAt defaults.
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(sep=" ", timespec="milliseconds"))
+sqlite3.register_converter("DECIMAL", lambda raw: Decimal(raw.decode()).quantize(Decimal("0.01")))
+sqlite3.register_converter("DATE", lambda raw: datetime.date.fromisoformat(raw.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.datetime.fromisoformat(raw.decode()))
+
+
+@contextmanager
+def _translate_errors():
+    """Re-raise sqlite3 errors as mysql.connector errors, which is what the windows catch"""
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        raise errors.IntegrityError(msg=str(e)) from e
+    except sqlite3.Error as e:
+        raise errors.DatabaseError(msg=str(e)) from e
+
+
+class SQLiteCursor:
+    """sqlite3 cursor that accepts the %s placeholders the rest of the code uses"""
+    def __init__(self, cursor, on_execute=None):
+        self._cursor = cursor
+        self._on_execute = on_execute
+
+    def execute(self, sql, params=()):
+        if self._on_execute is not None:
+            self._on_execute(sql)
+        with _translate_errors():
+            self._cursor.execute(sql.replace("%s", "?"), tuple(params))
+
+    def executemany(self, sql, seq_params):
+        with _translate_errors():
+            self._cursor.executemany(sql.replace("%s", "?"), seq_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLitePool:
+    """Single shared SQLite connection with the ConnectionPool interface.
+
+    SQLite serialises writers anyway, so one connection guarded by a lock is
+    enough for the GUI's worker threads, and it is the only way to share an
+    in-memory database between them. sqlite3 already keeps compiled statements
+    in a per-connection cache, which covers the statements registered in
+    statements.py; their reuse is counted the same way ConnectionPool does.
+    """
+    def __init__(self, path=":memory:", metrics=None):
+        self.path = path
+        self.metrics = metrics or METRICS
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        for table in ("pets", "applications"):
+            # Databases created before updatedAt existed get the column added.
+            columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+            if "updatedAt" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN updatedAt TIMESTAMP")
+                self._conn.execute(f"UPDATE {table} SET updatedAt = strftime('%Y-%m-%d %H:%M:%f', 'now')")
+        self._conn.executescript(SQLITE_INDEXES)
+        self._stats = {'queries': 0, 'transactions': 0, 'rollbacks': 0, 'prepared_hits': 0, 'prepared_misses': 0}
+        self._prepared = set()
+
+    def run(self, work, write=False):
+        with self._lock, _translate_errors():
+            cursor = InstrumentedCursor(SQLiteCursor(self._conn.cursor(), self._note_statement), self.metrics)
+            if write:
+                self._conn.execute("BEGIN")
+                self._stats['transactions'] += 1
+            try:
+                result = work(cursor)
+                if write:
+                    self._conn.execute("COMMIT")
+            except BaseException:
+                if write:
+                    self._conn.execute("ROLLBACK")
+                    self._stats['rollbacks'] += 1
+                raise
+            finally:
+                cursor.close()
+                self._stats['queries'] += 1
+            return result
+
+    def fetchall(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        return self.run(work)
+
+    def fetchone(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        return self.run(work)
+
+    def execute(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.rowcount
+        return self.run(work, write=True)
+
+    @contextmanager
+    def cursor(self):
+        with self._lock:
+            cursor = InstrumentedCursor(SQLiteCursor(self._conn.cursor(), self._note_statement), self.metrics)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+                self._stats['queries'] += 1
+
+    def _note_statement(self, sql):
+        if is_prepared(sql):
+            hit = sql in self._prepared
+            self._prepared.add(sql)
+            self._stats['prepared_hits' if hit else 'prepared_misses'] += 1
+
+    def prefill(self):
+        """Nothing to open: the connection was made in __init__"""
+        return 0
+
+    def statistics(self):
+        stats = dict(self._stats, path=self.path)
+        lookups = stats['prepared_hits'] + stats['prepared_misses']
+        stats['prepared_hit_rate'] = round(stats['prepared_hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteStore(PetStore):
+    name = "SQLite"
+    upsert_sql = f"""
+        INSERT INTO pets ({', '.join(PET_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(PET_COLUMNS))})
+        ON CONFLICT (petId) DO UPDATE SET {', '.join(f'{col}=excluded.{col}' for col in PET_COLUMNS[1:])}
+    """
+
+    def __init__(self, path=":memory:", pet_cache=None):
+        super().__init__(SQLitePool(path), pet_cache)
+
+
+def open_store(url=None, connect=True, pool_size=5):
+    """Open the store named by url or the PETADOPTION_DB environment variable.
+
+    "sqlite:<file>" (or "sqlite::memory:") selects the embedded backend;
+    anything else, including unset, connects to MySQL with db.DB_CONFIG
+    through a pool of up to pool_size connections. With connect=False the
+    MySQL pool is created without connecting; call store.connect() (off the
+    GUI thread) to warm it up.
+    """
+    url = url or os.environ.get("PETADOPTION_DB", "")
+    if url.startswith("sqlite:"):
+        path = url[len("sqlite:"):] or ":memory:"
+        print(f"Using SQLite database {path}")
+        return SQLiteStore(path)
+    from db import get_pool
+    return MySQLStore(get_pool(max_size=pool_size, prefill=connect))
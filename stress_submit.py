@@ -0,0 +1,130 @@
+"""Concurrency stress test for application submission.
+
+Several workers, each with its own store (like separate workstations),
+submit applications for the same Available pets at the same moment. Every
+pet must end up with exactly one Submitted application; the run fails
+(exit code 1) on any double booking.
+
+    python stress_submit.py                          # 8 workers, 200 pets, SQLite file in a temp dir
+    python stress_submit.py --workers 32 --pets 1000
+    python stress_submit.py --db mysql --reset       # scratch MySQL database only
+
+Against MySQL the pets and applications tables must be empty, or pass
+--reset to DELETE their contents first.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from mysql.connector import Error
+
+from benchmark import generate_pets, percentile
+from store import open_store
+
+
+def application(pet_id, worker):
+    name = f"Stress Adopter {worker}"
+    return (pet_id, "Stress", name, f"worker{worker}@example.com", "555-0000", "Yes", "Yes", "Yes",
+            datetime.date(2026, 1, 1), "No", "", "House", "Yes", name, "")
+
+
+def prepare(store, pet_count, seed, reset):
+    counts = [store.pool.fetchone(f"SELECT COUNT(*) FROM {table}")[0] for table in ("pets", "applications")]
+    if any(counts):
+        if not reset:
+            raise SystemExit("The pets/applications tables are not empty; pass --reset to clear them.")
+        store.pool.execute("DELETE FROM applications")
+        store.pool.execute("DELETE FROM pets")
+    pets = [record[:9] + ("Available",) + record[10:] for record in generate_pets(pet_count, random.Random(seed))]
+    store.upsert_pets(pets)
+
+
+def run_worker(url, worker, pet_ids, start, results):
+    """Submit for every pet in a shuffled order; results gets (won, lost, errors, latencies)"""
+    store = open_store(url)
+    won = lost = errors = 0
+    latencies = []
+    order = list(pet_ids)
+    random.Random(worker).shuffle(order)
+    try:
+        start.wait()
+        for pet_id in order:
+            started = time.perf_counter()
+            try:
+                previous = store.submit_application(application(pet_id, worker))
+            except Error as e:
+                errors += 1
+                print(f"Worker {worker}: database error on pet {pet_id}: {e}")
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            if previous is not None and previous.lower() == "available":
+                won += 1
+            else:
+                lost += 1
+    finally:
+        store.close()
+        results[worker] = (won, lost, errors, latencies)
+
+
+def check(store):
+    """(pets with more than one Submitted application, applications, Pending pets)"""
+    doubles = store.pool.fetchall(
+        "SELECT petId, COUNT(*) FROM applications WHERE appStatus = 'Submitted' "
+        "GROUP BY petId HAVING COUNT(*) > 1")
+    applications = store.pool.fetchone("SELECT COUNT(*) FROM applications")[0]
+    pending = store.pool.fetchone("SELECT COUNT(*) FROM pets WHERE status = 'Pending'")[0]
+    return doubles, applications, pending
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress concurrent application submission")
+    parser.add_argument("--db", help='store URL (default a fresh SQLite file; "mysql" for MySQL)')
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--pets", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete existing pets and applications first")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.db or f"sqlite:{os.path.join(tmp, 'stress.db')}"
+        store = open_store(url)
+        try:
+            prepare(store, args.pets, args.seed, args.reset)
+            pet_ids = list(range(1, args.pets + 1))
+            start = threading.Barrier(args.workers + 1)
+            results = {}
+            threads = [threading.Thread(target=run_worker, args=(url, worker, pet_ids, start, results))
+                       for worker in range(args.workers)]
+            for thread in threads:
+                thread.start()
+            start.wait()
+            started = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - started
+            doubles, applications, pending = check(store)
+        finally:
+            store.close()
+
+    won = sum(r[0] for r in results.values())
+    lost = sum(r[1] for r in results.values())
+    errors = sum(r[2] for r in results.values())
+    latencies = sorted(ms for r in results.values() for ms in r[3])
+    attempts = won + lost + errors
+    print(f"{args.workers} workers x {args.pets} pets: {attempts} attempts in {seconds:.2f}s "
+          f"({attempts / seconds:.0f} submissions/sec)")
+    print(f"  won {won}, lost {lost}, errors {errors}; latency p50 {percentile(latencies, 50):.3f} ms, "
+          f"p95 {percentile(latencies, 95):.3f} ms, p99 {percentile(latencies, 99):.3f} ms")
+    print(f"  applications {applications}, Pending pets {pending}, double-booked pets {len(doubles)}")
+    for pet_id, count in doubles[:10]:
+        print(f"  DOUBLE BOOKING: pet {pet_id} has {count} Submitted applications")
+    return 0 if not doubles and won == applications == pending else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import datetime
+import random
+from decimal import Decimal
+
+import pytest
+
+from store import APPLICATION_FIELDS, SQLiteStore
+
+
+def pet(pet_id, name="Rex", species="dog", breed="husky", age=2, status="Available", shelter="Springfield", fee="250.00"):
+    """A pets record in PET_COLUMNS order"""
+    return (pet_id, name, species, breed, age, "Male", "Medium", shelter, Decimal(fee), status, "")
+
+
+def application(pet_id, adopter="Sam Adopter"):
+    """Values for PetStore.submit_application (APPLICATION_FIELDS order)"""
+    values = {name: "Yes" for name in APPLICATION_FIELDS}
+    values.update(petId=pet_id, petName="Rex", adopterName=adopter, adopterEmail="sam@example.com",
+                  adopterPhone="555-0100", adoptionDate=datetime.date(2026, 1, 1), otherPetsType="",
+                  livingSituation="House", primaryCaregiver=adopter, notes="")
+    return tuple(values[name] for name in APPLICATION_FIELDS)
+
+
+SPECIES = {"dog": ["husky", "labrador", "beagle"], "cat": ["siamese", "persian"], "rabbit": ["lop"]}
+
+
+def seed_pets(store, count=60):
+    """count pets with repeatable, varied species, breeds, ages, fees, shelters and statuses"""
+    chance = random.Random(count)
+    records = []
+    for pet_id in range(1, count + 1):
+        species = chance.choice(sorted(SPECIES))
+        records.append(pet(pet_id, name=f"Pet{pet_id}", species=species, breed=chance.choice(SPECIES[species]),
+                           age=chance.randint(0, 12), status=chance.choice(["Available", "Available", "Pending"]),
+                           shelter=chance.choice(["North", "South", None]), fee=f"{chance.choice([0, 150, 250])}.00"))
+    store.upsert_pets(records)
+
+
+def all_pages(query, pool, limit=7):
+    """Every row of query, read limit rows per page"""
+    rows, token = [], None
+    while True:
+        page = query.fetch(pool, limit, token)
+        rows.extend(page.rows)
+        token = page.next_token
+        if token is None:
+            return rows
+
+
+@pytest.fixture
+def store():
+    store = SQLiteStore()
+    yield store
+    store.close()
@@ -0,0 +1,124 @@
+"""Scriptable stand-in for a MySQL server, for exercising ConnectionPool without one."""
+from mysql.connector import errorcode, errors
+
+
+def lost_error():
+    return errors.OperationalError(msg="Lost connection to MySQL server during query", errno=errorcode.CR_SERVER_LOST)
+
+
+class FakeServer:
+    """Hands out FakeConnections; set up, lose, fail or fail_commits to script failures.
+
+    lose is the number of upcoming statements whose connection drops;
+    fail is the number that fail with an ordinary (non-connection) error.
+    """
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.up = True
+        self.lose = 0
+        self.fail = 0
+        self.fail_commits = 0
+        self.connections = []
+        self.executed = []   # (connection number, sql)
+
+    def connect(self):
+        if not self.up:
+            raise errors.InterfaceError(msg="Can't connect to MySQL server", errno=errorcode.CR_CONN_HOST_ERROR)
+        conn = FakeConnection(self, len(self.connections))
+        self.connections.append(conn)
+        return conn
+
+
+class FakeConnection:
+    def __init__(self, server, number):
+        self.server = server
+        self.number = number
+        self.autocommit = True
+        self.in_transaction = False
+        self.unread_result = False
+        self.lost = False
+        self.closed = False
+        self.commits = self.rollbacks = self.pings = 0
+
+    def cursor(self, prepared=False):
+        return FakeCursor(self, prepared)
+
+    def _check(self):
+        if self.lost or not self.server.up:
+            self.lost = True
+            raise lost_error()
+
+    def start_transaction(self):
+        self._check()
+        self.in_transaction = True
+
+    def commit(self):
+        if self.server.fail_commits:
+            self.server.fail_commits -= 1
+            self.lost = True
+            raise lost_error()
+        self._check()
+        self.in_transaction = False
+        self.commits += 1
+
+    def rollback(self):
+        self._check()
+        self.in_transaction = False
+        self.rollbacks += 1
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        self._check()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    def __init__(self, conn, prepared):
+        self.conn = conn
+        self.prepared = prepared
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        server = self.conn.server
+        self.conn._check()
+        if server.lose:
+            server.lose -= 1
+            self.conn.lost = True
+            raise lost_error()
+        if server.fail:
+            server.fail -= 1
+            raise errors.ProgrammingError(msg="You have an error in your SQL syntax", errno=errorcode.ER_PARSE_ERROR)
+        server.executed.append((self.conn.number, sql))
+        if sql.lstrip().upper().startswith("SELECT"):
+            self._rows = list(server.rows)
+            self.description = [("value",)]
+            self.rowcount = len(self._rows)
+        else:
+            self._rows = []
+            self.description = None
+            self.rowcount = 1
+
+    def executemany(self, sql, seq_params):
+        for params in seq_params:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        self.conn._check()
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size):
+        self.conn._check()
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        self.conn._check()
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
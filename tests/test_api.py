@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+
+from api import MAX_BODY, PetAPI, Request
+from tests.conftest import pet
+
+APPLICANT = {"adopterName": "Sam Adopter", "adopterEmail": "sam@example.com", "adopterPhone": "555-0100",
+             "primaryCaregiver": "Sam Adopter", "ownedBefore": "Yes", "awareNeeds": "Yes", "readyCosts": "Yes",
+             "ownOtherPets": "No", "livingSituation": "House", "fencedYard": "Yes", "certified": True}
+
+
+def http(method, path, body=None, headers=()):
+    """Raw HTTP/1.1 request bytes"""
+    data = b"" if body is None else json.dumps(body).encode()
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(data)}", *headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return int(status_line.split()[1]), json.loads(body)
+
+
+def exchange(store, *requests, **options):
+    """Send requests over one keep-alive connection; returns their (status, payload) responses"""
+    async def run():
+        api = PetAPI(store, **dict({"concurrency": 2, "keepalive": 5}, **options))
+        server = await asyncio.start_server(api.serve_client, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        responses = []
+        try:
+            for request in requests:
+                writer.write(request)
+                await writer.drain()
+                responses.append(await read_response(reader))
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            api.close()
+        return responses
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def pets(store):
+    store.upsert_pets([pet(1, breed="husky", age=2), pet(2, breed="beagle", age=5), pet(3, breed="husky", age=7),
+                       pet(4, species="cat", breed="siamese", fee="150.00"), pet(5, breed="husky", status="Adopted")])
+    return store
+
+
+# --- Pets ---
+def test_search_pages_available_pets(pets):
+    (status, first), = exchange(pets, http("GET", "/pets?species=Dog&limit=2"))
+    assert status == 200
+    assert [p["petId"] for p in first["pets"]] == [1, 2]
+    assert first["total"] == 3
+    (status, second), = exchange(pets, http("GET", f"/pets?species=dog&limit=2&token={first['next_token']}"))
+    assert ([p["petId"] for p in second["pets"]], second["next_token"], second["total"]) == ([3], None, None)
+
+
+def test_search_filters(pets):
+    (_, husky), (_, cheap) = exchange(pets, http("GET", "/pets?breed=husky&age=5-"), http("GET", "/pets?fee=-200"))
+    assert [p["petId"] for p in husky["pets"]] == [3]
+    assert [(p["petId"], p["adoptionFee"]) for p in cheap["pets"]] == [(4, "150.00")]
+
+
+@pytest.mark.parametrize("query", ["age=old", "fee=5-2", "limit=0", "limit=9999", "token=garbage"])
+def test_search_rejects(pets, query):
+    (status, payload), = exchange(pets, http("GET", f"/pets?{query}"))
+    assert status == 400 and payload["error"]
+
+
+def test_get_pet(pets):
+    (_, found), (status, _) = exchange(pets, http("GET", "/pets/4"), http("GET", "/pets/99"))
+    assert (found["breed"], status) == ("siamese", 404)
+
+
+# --- Applications ---
+def test_submit_once(pets):
+    responses = exchange(pets, http("POST", "/applications", dict(APPLICANT, petId=1)),
+                         http("POST", "/applications", dict(APPLICANT, petId=1)),
+                         http("POST", "/applications", dict(APPLICANT, petId=99)),
+                         http("GET", "/applications/1"))
+    assert [status for status, _ in responses] == [201, 409, 404, 200]
+    assert responses[3][1]["petName"] == "Rex" and responses[3][1]["appStatus"] == "Submitted"
+    assert pets.get_pet(1)[9] == "Pending"
+
+
+@pytest.mark.parametrize("change", [{"adopterEmail": ""}, {"fencedYard": "Maybe"}, {"certified": False},
+                                    {"adoptionDate": "tomorrow"}, {"petId": "one"}])
+def test_submit_rejects(pets, change):
+    (status, _), = exchange(pets, http("POST", "/applications", {**APPLICANT, "petId": 1, **change}))
+    assert status == 400
+    assert pets.get_pet(1)[9] == "Available"
+
+
+def test_decisions(pets):
+    for pet_id in (1, 1, 2):
+        pets.pool.execute("UPDATE pets SET status = 'Available' WHERE petId = %s", (pet_id,))
+        exchange(pets, http("POST", "/applications", dict(APPLICANT, petId=pet_id)))
+    responses = exchange(pets, http("POST", "/applications/1/decision", {"decision": "Approved"}),
+                         http("POST", "/applications/decisions", {"decisions": [{"appId": 3, "decision": "Denied"}]}),
+                         http("POST", "/applications/decisions", {"decisions": [{"appId": 9, "decision": "Denied"}]}),
+                         http("POST", "/applications/3/decision", {"decision": "Maybe"}),
+                         http("POST", "/applications/decisions", {"decisions": "all"}))
+    assert [status for status, _ in responses] == [200, 200, 404, 400, 400]
+    assert responses[0][1] == {"approved": 1, "denied": 0, "competing_denied": 1, "pet_statuses": {"1": "Adopted"}}
+    assert responses[1][1]["pet_statuses"] == {"2": "Available"}
+
+
+def test_two_approvals_for_one_pet_conflict(pets):
+    for _ in range(2):
+        pets.pool.execute("UPDATE pets SET status = 'Available' WHERE petId = 1")
+        exchange(pets, http("POST", "/applications", dict(APPLICANT, petId=1)))
+    (status, _), = exchange(pets, http("POST", "/applications/decisions", {"decisions": [
+        {"appId": 1, "decision": "Approved"}, {"appId": 2, "decision": "Approved"}]}))
+    assert status == 409
+
+
+# --- HTTP ---
+def test_routing(pets):
+    responses = exchange(pets, http("DELETE", "/pets/1"), http("GET", "/nowhere"), http("GET", "/health"),
+                         http("GET", "/metrics"))
+    assert [status for status, _ in responses] == [405, 404, 200, 200]
+    assert "pool" in responses[3][1]
+
+
+@pytest.mark.parametrize("request_bytes, status", [
+    (b"GET /" + b"x" * 70000 + b" HTTP/1.1\r\n\r\n", 413),
+    (b"GET /pets HTTP/1.1\r\nX-Long: " + b"x" * 70000 + b"\r\n\r\n", 431),
+    (b"POST /applications HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n", 411),
+    (f"POST /applications HTTP/1.1\r\nContent-Length: {MAX_BODY + 1}\r\n\r\n".encode(), 413),
+    (b"GARBAGE\r\n\r\n", 400),
+    (b"POST /applications HTTP/1.1\r\nContent-Length: 5\r\n\r\n{nope", 400),
+])
+def test_bad_requests(pets, request_bytes, status):
+    (answered, payload), = exchange(pets, request_bytes)
+    assert answered == status and payload["error"]
+
+
+def test_busy_server_answers_503(pets):
+    async def run():
+        api = PetAPI(pets, concurrency=1, queue_seconds=0.01)
+        await api.slots.acquire()
+        try:
+            return await api.dispatch(Request("GET", "/pets/1", {}, {}, b"", "HTTP/1.1"))
+        finally:
+            api.close()
+    assert asyncio.run(run())[0] == 503
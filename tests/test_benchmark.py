@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("PyQt6")   # benchmark drives the Qt models
+
+from benchmark import percentile
+
+
+def test_percentile_nearest_rank():
+    ordered = list(range(1, 21))
+    assert (percentile(ordered, 50), percentile(ordered, 95), percentile(ordered, 99)) == (10, 19, 20)
+    assert percentile(ordered, 0) == 1
+    assert percentile(ordered, 100) == 20
+
+
+def test_percentile_small_samples():
+    assert percentile([], 50) == 0.0
+    assert percentile([4.0], 99) == 4.0
+    assert percentile([1.0, 2.0, 3.0], 50) == 2.0
@@ -0,0 +1,93 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from bulk_import import import_pets, validate_pet
+from tests.conftest import pet
+
+HEADER = "petId,petName,species,breed,age,gender,size,shelter,status,comments\n"
+
+
+def write_csv(tmp_path, lines):
+    path = tmp_path / "pets.csv"
+    path.write_text(HEADER + "".join(f"{line}\n" for line in lines), encoding="utf-8")
+    return str(path)
+
+
+def names(store):
+    return dict(store.pool.fetchall("SELECT petId, petName FROM pets ORDER BY petId"))
+
+
+# --- Validation ---
+def test_validate_pet():
+    record = validate_pet({"PetID": " 7 ", "petName": "Rex", "Species": "Dog", "breed": "Husky", "age": "3",
+                           "status": "pending"})
+    assert record == (7, "Rex", "dog", "Husky", 3, "", "", "", Decimal("250.00"), "Pending", "")
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"petId": "x", "age": "1"}, "numbers"),
+    ({"petId": "1", "age": "1", "species": "dog", "breed": "lab"}, "petName is required"),
+    ({"petId": "1", "age": "1", "petName": "R" * 101, "species": "dog", "breed": "lab"}, "longer than 100"),
+    ({"petId": "1", "age": "1", "petName": "Rex", "species": "dog", "breed": "lab", "status": "Lost"}, "status"),
+])
+def test_validate_pet_rejects(row, message):
+    with pytest.raises(ValueError, match=message):
+        validate_pet(row)
+
+
+# --- Importing ---
+def test_import_counts_inserts_updates_and_errors(store, tmp_path):
+    store.upsert_pets([pet(1, name="Old")])
+    path = write_csv(tmp_path, [
+        "1,Rex,dog,husky,2,,,,,",
+        "2,Luna,cat,siamese,1,,,,,",
+        "3,,dog,husky,2,,,,,",
+        "4,Max,dog,beagle,old,,,,,",
+        "2,Luna Belle,cat,siamese,1,,,,,",
+    ])
+    written = []
+    report = import_pets(store, path, chunk_size=2, on_written=written.append)
+    assert (report.read, report.inserted, report.updated) == (5, 1, 2)
+    assert [line for line, _ in report.errors] == [4, 5]
+    assert names(store) == {1: "Rex", 2: "Luna Belle"}
+    assert [[record[0] for record in chunk] for chunk in written] == [[1, 2], [2]]
+
+
+def test_import_jsonl(store, tmp_path):
+    path = tmp_path / "pets.jsonl"
+    rows = [json.dumps({"petId": 1, "petName": "Rex", "species": "dog", "breed": "husky", "age": 2}), "not json", "[1]"]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    report = import_pets(store, str(path))
+    assert (report.inserted, [line for line, _ in report.errors]) == (1, [2, 3])
+
+
+def test_rejected_chunk_is_written_row_by_row(store, tmp_path):
+    store.pool.execute("""
+        CREATE TRIGGER reject_bad_pets BEFORE INSERT ON pets WHEN NEW.petName = 'Bad'
+        BEGIN SELECT RAISE(ABORT, 'rejected by the database'); END
+    """)
+    path = write_csv(tmp_path, ["1,Rex,dog,husky,2,,,,,", "2,Bad,dog,husky,2,,,,,", "3,Luna,cat,siamese,1,,,,,"])
+    written = []
+    report = import_pets(store, path, chunk_size=10, on_written=written.append)
+    assert names(store) == {1: "Rex", 3: "Luna"}
+    assert report.inserted == 2
+    assert len(report.errors) == 1
+    assert report.errors[0][0] == 3 and "rejected by the database" in report.errors[0][1]
+    assert [[record[0] for record in chunk] for chunk in written] == [[1, 3]]
+
+
+def test_cancelled_import_keeps_the_chunks_written(store, tmp_path):
+    path = write_csv(tmp_path, [f"{pet_id},Pet{pet_id},dog,husky,2,,,,," for pet_id in range(1, 11)])
+    polls = []
+
+    def cancelled():
+        polls.append(1)
+        return len(polls) > 2
+
+    report = import_pets(store, path, chunk_size=3, cancelled=cancelled)
+    assert report.cancelled
+    assert report.inserted == 6
+    assert len(names(store)) == 6
+    assert report.summary().endswith("cancelled")
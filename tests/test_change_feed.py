@@ -0,0 +1,39 @@
+import time
+
+from change_feed import ChangeFeed
+from queries import PET_COLUMNS
+from tests.conftest import pet
+
+
+def primed_feed(store):
+    """A feed that has been primed and has read back the rows inside its lag window"""
+    feed = ChangeFeed("pets", PET_COLUMNS, "petId")
+    assert feed.poll(store.pool) == []
+    assert feed.watermark is not None
+    feed.poll(store.pool)
+    time.sleep(0.01)   # updatedAt has millisecond resolution; later writes must get a newer one
+    return feed
+
+
+def test_first_poll_primes(store):
+    store.upsert_pets([pet(1), pet(2)])
+    feed = primed_feed(store)
+    assert feed.poll(store.pool) == []
+
+
+def test_changes_are_delivered_once(store):
+    store.upsert_pets([pet(1), pet(2)])
+    feed = primed_feed(store)
+    watermark = feed.watermark
+
+    store.set_pet_status(2, "Adopted")
+    store.upsert_pets([pet(3, name="Newcomer")])
+    changed = feed.poll(store.pool)
+    assert [(row[0], row[9]) for row in changed] == [(2, "Adopted"), (3, "Available")]
+    assert feed.watermark >= watermark
+    assert feed.poll(store.pool) == []
+
+    time.sleep(0.01)
+    store.set_pet_comments(2, "Went home")
+    assert [(row[0], row[10]) for row in feed.poll(store.pool)] == [(2, "Went home")]
+    assert feed.poll(store.pool) == []
@@ -0,0 +1,286 @@
+import threading
+import time
+
+import pytest
+from mysql.connector import Error
+
+from db import CircuitBreaker, CircuitOpenError, ConnectionPool, PoolTimeout, StatementCache
+from metrics import Metrics
+from statements import prepared
+from tests.fake_mysql import FakeServer
+
+
+@pytest.fixture
+def server():
+    return FakeServer(rows=[(1,), (2,), (3,)])
+
+
+@pytest.fixture
+def make_pool(server):
+    pools = []
+
+    def make(**options):
+        options.setdefault("maintenance_interval", 0)
+        options.setdefault("backoff", 0)
+        pool = ConnectionPool(connect=server.connect, metrics=Metrics(slow_log=None), **options)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+# --- Checkout / checkin ---
+def test_connections_are_reused(server, make_pool):
+    pool = make_pool()
+    for _ in range(3):
+        assert pool.fetchall("SELECT 1") == [(1,), (2,), (3,)]
+    stats = pool.statistics()
+    assert (stats['created'], stats['checkouts'], stats['idle'], stats['in_use']) == (1, 3, 1, 0)
+
+
+def test_pool_is_bounded(make_pool):
+    pool = make_pool(max_size=2, checkout_timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert pool.statistics()['timeouts'] == 1
+    pool.release(first)
+    pool.release(second)
+
+
+def test_waiting_checkout_gets_the_released_connection(make_pool):
+    pool = make_pool(max_size=1, checkout_timeout=5)
+    conn = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(conn)
+    waiter.join(5)
+    assert got == [conn]
+    assert pool.statistics()['waits'] == 1
+    pool.release(conn)
+
+
+def test_release_rolls_back_an_open_transaction(make_pool):
+    pool = make_pool()
+    conn = pool.acquire()
+    conn.start_transaction()
+    pool.release(conn)
+    assert (conn.rollbacks, conn.in_transaction) == (1, False)
+
+
+def test_prefill(server, make_pool):
+    pool = make_pool(min_size=2)
+    assert pool.prefill() == 2
+    assert pool.prefill() == 0
+    assert len(server.connections) == 2
+
+
+# --- Transactions ---
+def test_write_commits(make_pool):
+    pool = make_pool()
+    assert pool.execute("UPDATE pets SET status = 'Adopted'") == 1
+    conn = pool.acquire()
+    assert (conn.commits, conn.in_transaction) == (1, False)
+    pool.release(conn)
+
+
+def test_failed_write_rolls_back(server, make_pool):
+    pool = make_pool()
+
+    def work(cursor):
+        cursor.execute("UPDATE pets SET status = 'Adopted'")
+        raise ValueError("changed my mind")
+    with pytest.raises(ValueError):
+        pool.run(work, write=True)
+    conn = pool.acquire()
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+    pool.release(conn)
+
+
+def test_statement_error_is_not_retried(server, make_pool):
+    pool = make_pool()
+    server.fail = 1
+    with pytest.raises(Error):
+        pool.fetchall("SELECT 1")
+    stats = pool.statistics()
+    assert (stats['retries'], stats['discarded'], stats['circuit']) == (0, 0, 'closed')
+
+
+# --- Maintenance ---
+def test_evict_idle_keeps_min_size(server, make_pool):
+    pool = make_pool(min_size=1, idle_timeout=0.01)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    time.sleep(0.02)
+    assert pool.evict_idle() == 2
+    assert pool.statistics()['idle'] == 1
+    assert sum(conn.closed for conn in server.connections) == 2
+
+
+def test_health_check_drops_dead_connections(server, make_pool):
+    pool = make_pool()
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    conns[1].lost = True
+    assert pool.health_check() == (2, 1)
+    assert conns[1].closed
+    assert pool.statistics()['idle'] == 2
+
+
+def test_maintenance_thread(server, make_pool):
+    pool = make_pool(min_size=0, idle_timeout=0.01, maintenance_interval=0.02)
+    pool.release(pool.acquire())
+    deadline = time.monotonic() + 5
+    while pool.statistics()['idle'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.statistics()['evicted'] == 1
+    assert server.connections[0].closed
+
+
+def test_close(server, make_pool):
+    pool = make_pool()
+    pool.release(pool.acquire())
+    pool.close()
+    assert server.connections[0].closed
+    with pytest.raises(Error):
+        pool.acquire()
+
+
+# --- Lost connections ---
+def test_lost_connection_is_retried(server, make_pool):
+    pool = make_pool()
+    pool.release(pool.acquire())
+    server.lose = 1
+    assert pool.fetchall("SELECT 1") == [(1,), (2,), (3,)]
+    stats = pool.statistics()
+    assert (stats['retries'], stats['discarded'], stats['created']) == (1, 1, 2)
+    assert server.connections[0].closed
+
+
+def test_retries_run_out(server, make_pool):
+    pool = make_pool(retries=2)
+    server.lose = 3
+    with pytest.raises(Error):
+        pool.fetchall("SELECT 1")
+    assert pool.statistics()['retries'] == 2
+
+
+def test_lost_commit_is_not_retried(server, make_pool):
+    pool = make_pool()
+    server.fail_commits = 1
+    with pytest.raises(Error):
+        pool.execute("UPDATE pets SET status = 'Adopted'")
+    assert pool.statistics()['retries'] == 0
+    assert [sql for _, sql in server.executed] == ["UPDATE pets SET status = 'Adopted'"]
+
+
+def test_long_idle_connection_is_pinged(server, make_pool):
+    pool = make_pool(liveness_interval=0.01)
+    pool.release(pool.acquire())
+    assert pool.acquire() is server.connections[0]
+    assert server.connections[0].pings == 0
+    pool.release(server.connections[0])
+    time.sleep(0.02)
+    server.connections[0].lost = True
+    conn = pool.acquire()
+    assert conn is server.connections[1]
+    assert pool.statistics()['reconnects'] == 1
+    pool.release(conn)
+
+
+# --- Streamed reads ---
+def test_cursor_retries_before_the_first_row(server, make_pool):
+    pool = make_pool()
+    server.lose = 1
+    with pool.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        assert cursor.fetchmany(2) == [(1,), (2,)]
+        assert cursor.fetchmany(2) == [(3,)]
+    stats = pool.statistics()
+    assert (stats['retries'], stats['in_use'], stats['idle']) == (1, 0, 1)
+
+
+def test_cursor_does_not_retry_after_rows_were_read(server, make_pool):
+    pool = make_pool()
+    with pytest.raises(Error):
+        with pool.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchmany(1)
+            server.lose = 1
+            cursor.execute("SELECT 2")
+    stats = pool.statistics()
+    assert (stats['retries'], stats['discarded'], stats['in_use']) == (0, 1, 0)
+
+
+def test_unused_cursor_checks_nothing_out(server, make_pool):
+    pool = make_pool()
+    with pool.cursor():
+        pass
+    assert server.connections == []
+
+
+# --- Circuit breaker ---
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == 'half-open'
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()   # one trial at a time
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+
+def test_pool_fails_fast_while_the_server_is_down(server, make_pool):
+    pool = make_pool(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60), retries=0)
+    server.up = False
+    for _ in range(2):
+        with pytest.raises(Error):
+            pool.fetchall("SELECT 1")
+    with pytest.raises(CircuitOpenError):
+        pool.fetchall("SELECT 1")
+    assert pool.statistics()['circuit'] == 'open'
+
+
+# --- Prepared statements ---
+def test_registered_statements_are_prepared_once_per_connection(server, make_pool):
+    sql = prepared("SELECT status FROM pets WHERE petId = %s")
+    pool = make_pool()
+    for pet_id in range(3):
+        pool.fetchone(sql, (pet_id,))
+    pool.fetchall("SELECT 1")
+    stats = pool.statistics()
+    assert (stats['prepared_misses'], stats['prepared_hits']) == (1, 2)
+
+
+def test_statement_cache_evicts_the_least_recently_used(server):
+    cache = StatementCache(server.connect(), max_size=2)
+    first, _ = cache.get("SELECT 1")
+    cache.get("SELECT 2")
+    assert cache.get("SELECT 1")[0] is first
+    cache.get("SELECT 3")
+    cache.get("SELECT 2")
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 4, 2)
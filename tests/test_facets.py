@@ -0,0 +1,31 @@
+from facets import FacetCounts, describe
+from tests.conftest import pet
+
+
+def test_facet_counts(store):
+    store.upsert_pets([pet(1, breed="husky"), pet(2, breed="husky", status="Pending"),
+                       pet(3, species="cat", breed="siamese")])
+    facets = FacetCounts().load(store.pool)
+    assert facets.counts("breed") == {"husky": 2, "siamese": 1}
+    assert facets.counts("breed", "Available") == {"husky": 1, "siamese": 1}
+    facets.update_status(1, "Adopted")
+    assert facets.counts("status") == {"Adopted": 1, "Pending": 1, "Available": 1}
+    facets.remove(3)
+    assert facets.top("species") == [("dog", 2)]
+
+
+def test_top_and_describe(store):
+    store.upsert_pets([pet(1, breed="Husky"), pet(2, breed="Husky"), pet(3, breed="Labrador"), pet(4, breed="Pug")])
+    facets = FacetCounts().load(store.pool)
+    assert facets.top("breed", limit=2) == [("Husky", 2), ("Labrador", 1)]
+    assert facets.top("breed", "A") == [("Labrador", 1)]
+    assert describe(facets.top("breed", limit=2)) == "Husky 2 · Labrador 1"
+
+
+def test_top_any_word(store):
+    store.upsert_pets([pet(1, breed="Husky"), pet(2, breed="Husky", status="Pending"), pet(3, species="cat", breed="Siamese")])
+    facets = FacetCounts().load(store.pool)
+    assert facets.top("breed", "husky male") == []
+    assert facets.top("breed", "husky male", any_word=True) == [("Husky", 2)]
+    assert facets.top("status", "husky pend", any_word=True) == [("Pending", 1)]
+    assert facets.top("species", "  ", any_word=True) == [("dog", 2), ("cat", 1)]
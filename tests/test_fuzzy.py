@@ -0,0 +1,39 @@
+from fuzzy import BKTree, FuzzyMatcher, levenshtein, max_distance
+from tests.conftest import pet
+
+
+def test_levenshtein():
+    assert levenshtein("husky", "huskey") == 1
+    assert levenshtein("siamese", "siamise") == 1
+    assert levenshtein("", "cat") == 3
+    assert levenshtein("kitten", "sitting") == 3
+
+
+def test_bk_tree_search():
+    tree = BKTree()
+    for word in ("husky", "hush", "labrador", "beagle", "husky"):
+        tree.add(word)
+    assert tree.size == 4
+    assert sorted(tree.search("huskey", 1)) == [(1, "husky")]
+    assert sorted(tree.search("husk", 1)) == [(1, "hush"), (1, "husky")]
+
+
+def test_max_distance():
+    assert [max_distance(term) for term in ("hu", "husk", "siamise")] == [0, 1, 2]
+
+
+def test_correct(store):
+    store.upsert_pets([pet(1, breed="husky"), pet(2, species="cat", breed="siamese"), pet(3, name="Bella", breed="beagle")])
+    fuzzy = FuzzyMatcher().load(store.pool)
+    assert fuzzy.correct("huskey") == "husky"
+    assert fuzzy.correct("siamise cat") == "siamese cat"
+    assert fuzzy.correct("husky") is None
+    assert fuzzy.correct("xy") is None
+    fuzzy.remove(1)
+    assert fuzzy.correct("huskey") is None
+
+
+def test_candidates_prefer_common_words(store):
+    store.upsert_pets([pet(1, breed="pug"), pet(2, breed="pug"), pet(3, breed="pig")])
+    fuzzy = FuzzyMatcher().load(store.pool)
+    assert fuzzy.candidates("breed", "pog") == [("pug", 1, 2), ("pig", 1, 1)]
@@ -0,0 +1,96 @@
+import pytest
+
+from facets import FACETS, FacetCounts
+from fuzzy import FIELDS, FuzzyMatcher
+from loadable_index import LoadableIndex, Unbuilt
+from pet_columns import PetColumns
+from search_index import PetSearchIndex
+from store import PET_BY_ID
+from tests.conftest import pet, seed_pets
+
+INDEXES = [PetSearchIndex, PetColumns, FacetCounts]
+
+
+class WritingPool:
+    """Pool that runs write() once, after the first page is read but before it is handed back"""
+    def __init__(self, pool, write):
+        self.pool = pool
+        self.write = write
+
+    def fetchall(self, sql, params=()):
+        rows = self.pool.fetchall(sql, params)
+        if self.write:
+            self.write()
+            self.write = None
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+
+def contents(index):
+    """Everything an index knows, comparable between two indexes over the same pets"""
+    if isinstance(index, PetColumns):
+        return index.filter(status="")
+    if isinstance(index, FacetCounts):
+        return {facet: index.counts(facet) for facet in FACETS}
+    if isinstance(index, FuzzyMatcher):
+        return {field: sorted(word for word, pets in index._counts[field].items() if pets > 0) for field in FIELDS}
+    return index.search("")
+
+
+@pytest.mark.parametrize("cls", INDEXES)
+def test_status_change_during_load(store, cls):
+    seed_pets(store)
+    index = cls()
+
+    def adopt():   # what MenuWindow does when a pet already read by load() is adopted
+        store.set_pet_status(3, "Adopted")
+        index.update_status(3, "Adopted")
+
+    index.load(WritingPool(store.pool, adopt), page_size=10)
+    assert index.ready
+    assert contents(index) == contents(cls().load(store.pool))
+
+
+@pytest.mark.parametrize("cls", INDEXES)
+def test_status_change_during_load_before_the_row_is_read(store, cls):
+    seed_pets(store)
+    index = cls()
+
+    def adopt():   # pet 50 is on a later page, which is read after the change
+        store.set_pet_status(50, "Adopted")
+        index.update_status(50, "Adopted")
+
+    index.load(WritingPool(store.pool, adopt), page_size=10)
+    assert contents(index) == contents(cls().load(store.pool))
+
+
+@pytest.mark.parametrize("cls", INDEXES + [FuzzyMatcher])
+def test_upsert_and_remove_during_load(store, cls):
+    seed_pets(store)
+    index = cls()
+
+    def edit():
+        store.upsert_pets([pet(2, name="Renamed", species="cat", breed="persian"), pet(61, name="Newcomer")])
+        for pet_id in (2, 61):
+            index.upsert(store.pool.fetchone(PET_BY_ID, (pet_id,)))
+        store.pool.execute("DELETE FROM pets WHERE petId = %s", (40,))
+        index.remove(40)
+
+    index.load(WritingPool(store.pool, edit), page_size=10)
+    assert contents(index) == contents(cls().load(store.pool))
+
+
+def test_cancelled_load(store):
+    seed_pets(store)
+    index = PetSearchIndex().load(store.pool, page_size=10, cancelled=lambda: True)
+    assert not index.ready
+
+
+def test_hooks_are_abstract():
+    with pytest.raises(TypeError):
+        LoadableIndex()
+    placeholder = Unbuilt()
+    placeholder.upsert(pet(1))
+    assert not placeholder.ready
@@ -0,0 +1,58 @@
+import time
+
+from pet_cache import PetCache
+from tests.conftest import pet
+
+
+def test_lru_eviction():
+    cache = PetCache(max_entries=2)
+    cache.put_many([pet(1), pet(2)])
+    assert cache.get(1) is not None
+    cache.put(pet(3))
+    assert cache.get(2) is None
+    assert cache.get(1)[0] == 1 and cache.get(3)[0] == 3
+    assert cache.statistics()["evictions"] == 1
+
+
+def test_update_patches_only_cached_pets():
+    cache = PetCache()
+    cache.put(pet(1))
+    cache.update(1, 9, "Adopted")
+    cache.update(2, 9, "Adopted")
+    assert cache.get(1)[9] == "Adopted"
+    assert cache.get(2) is None
+
+
+def test_entries_expire():
+    cache = PetCache(ttl=0.01)
+    cache.put(pet(1))
+    time.sleep(0.02)
+    assert cache.get(1) is None
+
+
+def test_statistics():
+    cache = PetCache()
+    cache.put(pet(1))
+    cache.get(1)
+    cache.get(2)
+    cache.invalidate(1)
+    assert cache.statistics() == {"entries": 0, "hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5}
+
+
+# --- Write-through in the store ---
+def test_store_reads_through_the_cache(store):
+    store.upsert_pets([pet(1)])
+    misses = store.pet_cache.statistics()["misses"]
+    store.pool.execute("UPDATE pets SET petName = 'Changed elsewhere' WHERE petId = 1")
+    assert store.get_pet(1)[1] == "Rex"   # cached by the upsert, so no query
+    assert store.pet_cache.statistics()["misses"] == misses
+
+
+def test_store_writes_through_the_cache(store):
+    store.upsert_pets([pet(1)])
+    store.set_pet_status(1, "Pending")
+    store.set_pet_comments(1, "Meet on Saturday")
+    assert store.get_pet(1)[9:] == ("Pending", "Meet on Saturday")
+    store.pet_cache.invalidate()
+    assert store.get_pet(1)[9:] == ("Pending", "Meet on Saturday")
+    assert store.get_pet(99) is None
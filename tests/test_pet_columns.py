@@ -0,0 +1,43 @@
+import pytest
+
+import pet_columns
+from pet_columns import PetColumns
+from queries import available_pets_query
+from tests.conftest import all_pages, pet, seed_pets
+
+
+@pytest.fixture(params=["numpy", "scan"])
+def vectorised(request, monkeypatch):
+    """Run a test with numpy masks and again with the plain Python scan"""
+    if request.param == "scan":
+        monkeypatch.setattr(pet_columns, "numpy", None)
+    elif pet_columns.numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("criteria", [
+    {},
+    {"species": "dog"},
+    {"species": "CAT", "breed": "si"},
+    {"breed": "a", "age": (2, 6)},
+    {"age": (None, 3), "fee": (100.0, None)},
+    {"species": "parrot"},
+])
+def test_filter_matches_the_sql_query(store, vectorised, criteria):
+    seed_pets(store)
+    columns = PetColumns(capacity=4).load(store.pool, page_size=9)
+    sql_criteria = dict(criteria, species=criteria.get("species", "").lower())
+    expected = all_pages(available_pets_query(**sql_criteria), store.pool)
+    assert [record[0] for record in columns.filter(**criteria)] == [row[0] for row in expected]
+
+
+def test_writes_keep_petId_order(store, vectorised):
+    store.upsert_pets([pet(2), pet(5)])
+    columns = PetColumns().load(store.pool)
+    columns.upsert(pet(3, breed="beagle"))
+    columns.update_status(2, "Adopted")
+    columns.remove(5)
+    assert [record[0] for record in columns.filter()] == [3]
+    assert [record[0] for record in columns.filter(status="")] == [2, 3]
+    assert columns.get(5) is None
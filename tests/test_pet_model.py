@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from PyQt6.QtCore import Qt
+
+from search_window import RESULT_COLUMNS, STATUS_COLUMN
+from pet_model import PetListModel
+from tests.conftest import pet
+
+
+@pytest.fixture
+def model():
+    return PetListModel(RESULT_COLUMNS, actions=["View"], editable=[STATUS_COLUMN])
+
+
+def test_cells_are_formatted_from_records(model):
+    model.append_rows([pet(1), pet(2, name="Bella")])
+    assert model.rowCount() == 2
+    assert model.columnCount() == len(RESULT_COLUMNS) + 1
+    assert model.data(model.index(1, 1)) == "Bella"
+    assert model.data(model.index(0, 8)) == "$250.00"
+    assert model.data(model.index(0, STATUS_COLUMN)) == "Available"
+    assert model.data(model.index(0, len(RESULT_COLUMNS))) == "View"
+    assert model.action_at(model.index(0, len(RESULT_COLUMNS))) == "View"
+    assert model.action_at(model.index(0, 1)) is None
+
+
+def test_only_editable_columns_open_an_editor(model):
+    model.append_rows([pet(1)])
+    assert model.flags(model.index(0, STATUS_COLUMN)) & Qt.ItemFlag.ItemIsEditable
+    assert not model.flags(model.index(0, 9)) & Qt.ItemFlag.ItemIsEditable
+
+
+def test_prepend_and_patch_rows(model):
+    model.append_rows([pet(3), pet(2)])
+    model.prepend_rows([pet(5), pet(4)])
+    assert [model.record(row)[0] for row in range(model.rowCount())] == [5, 4, 3, 2]
+
+    removed = model.patch_rows([pet(4, status="Adopted"), pet(3, name="Max"), pet(9)],
+                               keep=lambda record: record[9] == "Available")
+    assert removed == 1
+    assert [model.record(row)[0] for row in range(model.rowCount())] == [5, 3, 2]
+    assert model.record(1)[1] == "Max"
+    assert model.record(7) is None
@@ -0,0 +1,30 @@
+import pytest
+
+from queries import adoption_fee, parse_range
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", None),
+    ("  ", None),
+    ("3", (3, 3)),
+    ("2-5", (2, 5)),
+    ("2-", (2, None)),
+    ("-5", (None, 5)),
+    (" 2 - 5 ", (2, 5)),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+@pytest.mark.parametrize("text", ["-", "5-2", "two"])
+def test_parse_range_rejects(text):
+    with pytest.raises(ValueError):
+        parse_range(text)
+
+
+def test_parse_range_converts():
+    assert parse_range("99.5-150", float) == (99.5, 150.0)
+
+
+def test_adoption_fee():
+    assert (adoption_fee("dog"), adoption_fee("cat"), adoption_fee("parrot")) == (250.00, 150.00, 0.00)
@@ -0,0 +1,79 @@
+import csv
+import datetime
+import io
+import json
+
+import pytest
+
+from report import REPORTS, main, stream_report, write_csv, write_json
+from store import SQLiteStore
+from tests.conftest import application, pet
+
+
+def seed(store):
+    store.upsert_pets([pet(1, breed="husky"), pet(2, status="Adopted"), pet(3, species="cat", fee="150.00"),
+                       pet(4, species="cat", fee="150.00", shelter=None)])
+    for pet_id in (1, 3):
+        store.submit_application(application(pet_id))
+    store.pool.execute("UPDATE applications SET submittedAt = '2025-01-15 10:00:00' WHERE petId = 1")
+    store.pool.execute("UPDATE applications SET submittedAt = '2025-03-02 09:30:00' WHERE petId = 3")
+
+
+def test_species_breakdown(store):
+    seed(store)
+    rows = stream_report(store.pool, "species", fetch_size=1)
+    assert next(rows)[:5] == ["species", "pets", "available", "pending", "adopted"]
+    assert [tuple(row[:5]) for row in rows] == [("cat", 2, 1, 1, 0), ("dog", 2, 0, 1, 1)]
+
+
+def test_date_filter(store):
+    seed(store)
+    since = list(stream_report(store.pool, "monthly", since=datetime.date(2025, 2, 1)))
+    assert [row[0] for row in since[1:]] == ["2025-03"]
+    until = list(stream_report(store.pool, "funnel", until=datetime.date(2025, 1, 15)))
+    assert [(row[0], row[1]) for row in until[1:]] == [("Submitted", 1)]
+
+
+def test_every_report_runs(store):
+    seed(store)
+    for name in REPORTS:
+        columns, *rows = stream_report(store.pool, name)
+        assert rows and all(len(row) == len(columns) for row in rows)
+
+
+def test_json_output(store):
+    seed(store)
+    out = io.StringIO()
+    write_json(store.pool, ["fees", "funnel"], out)
+    data = json.loads(out.getvalue())
+    assert [row["species"] for row in data["fees"]] == ["cat", "dog"]
+    assert [(row["fees_listed"], row["fees_collected"]) for row in data["fees"]] == [(300, 0), (250, 250)]
+    assert data["funnel"] == [dict(data["funnel"][0], appStatus="Submitted", applications=2)]
+
+
+def test_csv_output(store):
+    seed(store)
+    out = io.StringIO()
+    write_csv(store.pool, ["status", "shelter"], out)
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0][:2] == ["report", "status"]
+    assert [row[:3] for row in rows if row[0] == "status"] == [
+        ["status", "Adopted", "1"], ["status", "Available", "1"], ["status", "Pending", "2"]]
+    assert rows[4][:2] == ["report", "shelter"]
+    assert [row[:3] for row in rows[5:]] == [["shelter", "", "1"], ["shelter", "Springfield", "3"]]
+
+
+def test_main_writes_a_file(tmp_path, capsys):
+    db = tmp_path / "pets.db"
+    store = SQLiteStore(str(db))
+    seed(store)
+    store.close()
+    output = tmp_path / "nightly.json"
+    assert main(["species", "--db", f"sqlite:{db}", "-o", str(output)]) == 0
+    assert [row["species"] for row in json.loads(output.read_text())["species"]] == ["cat", "dog"]
+    assert capsys.readouterr().out == ""
+
+
+def test_main_rejects_unknown_reports():
+    with pytest.raises(SystemExit):
+        main(["nonsense", "--db", "sqlite:"])
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from search_cache import SearchCache, adopt_matches, extends_adopt, extends_terms, normalise_query, search_matches
+from tests.conftest import pet
+
+
+def test_lru_and_namespaces():
+    cache = SearchCache(max_entries=2)
+    cache.put("search", "husky", [1])
+    cache.put("adopt", "husky", [2])
+    assert cache.get("search", "husky").rows == [1]
+    cache.put("search", "cat", [3])
+    assert cache.get("adopt", "husky") is None   # least recently used
+    assert cache.get("search", "husky").rows == [1]
+    cache.invalidate("search")
+    assert cache.get("search", "cat") is None
+
+
+def test_entries_expire():
+    cache = SearchCache(ttl=0.01)
+    cache.put("search", "husky", [1])
+    time.sleep(0.02)
+    assert cache.get("search", "husky") is None
+
+
+def test_find_superset_takes_the_smallest_complete_result():
+    cache = SearchCache()
+    cache.put("search", "dog", [1, 2, 3, 4, 5])
+    cache.put("search", "hus", [1, 2, 3, 4])
+    cache.put("search", "husk", [1, 2, 3])
+    cache.put("search", "usk", [1, 2], total=50, next_token="more")   # only the first page
+    cache.put("search", "hu", [1])   # a word prefix, which "husk" does not refine
+    cache.put("adopt", "husk", [1])
+    result = cache.find_superset("search", lambda old: extends_terms(old, "husky"))
+    assert result.rows == [1, 2, 3]
+    assert cache.statistics()["narrowed"] == 1
+
+
+def test_find_superset_miss():
+    cache = SearchCache()
+    cache.put("search", "cat", [1])
+    assert cache.find_superset("search", lambda old: extends_terms(old, "husky")) is None
+    assert cache.statistics()["misses"] == 1
+
+
+def test_normalise_query():
+    assert normalise_query("  Husky   MALE ") == "husky male"
+
+
+@pytest.mark.parametrize("old, new, refines", [
+    ("hus", "husky", True),
+    ("husky", "husky male", True),
+    ("husky male", "male husky", True),
+    ("hu", "husky", False),     # prefix terms match words, not substrings
+    ("3", "34", False),         # numbers match exactly
+    ("husky", "hus", False),
+    ("husky", "cat", False),
+])
+def test_extends_terms(old, new, refines):
+    assert extends_terms(old, new) is refines
+
+
+@pytest.mark.parametrize("old, new, refines", [
+    (("dog", "", None, None), ("dog", "husky", None, None), True),
+    (("", "", (2, 8), None), ("", "", (3, 5), None), True),
+    (("", "", (2, 8), None), ("", "", (1, 5), None), False),
+    (("", "", None, (None, 200)), ("", "", None, None), False),
+    (("do", "", None, None), ("dog", "", None, None), True),
+])
+def test_extends_adopt(old, new, refines):
+    assert extends_adopt(old, new) is refines
+
+
+def test_adopt_matches():
+    record = pet(1, species="dog", breed="husky", age=4, fee="250.00")
+    assert adopt_matches(record, ("dog", "hus", (3, 5), (None, 300)))
+    assert not adopt_matches(record, ("dog", "hus", (5, None), None))
+
+
+@pytest.mark.parametrize("text, matches", [
+    ("husky", True),
+    ("sky 7", True),
+    ("sh hu", True),        # word starts, after a space
+    ("tz", True),           # ... or a hyphen
+    ("ih", False),          # short terms do not match inside words
+    ("7", True),            # petId
+    ("3", True),            # age
+    ("12", False),
+    ("husky cat", False),
+])
+def test_search_matches(text, matches):
+    record = pet(7, breed="Shih-Tzu husky", age=3)
+    assert search_matches(record, text) is matches
@@ -0,0 +1,28 @@
+from queries import pet_search_query
+from search_cache import search_matches
+from search_index import PetSearchIndex
+from tests.conftest import all_pages, pet, seed_pets
+
+
+def test_search(store):
+    store.upsert_pets([pet(1, name="Rex", breed="husky"), pet(2, name="Luna", species="cat", breed="siamese"),
+                       pet(3, name="Max", breed="husky", age=7)])
+    index = PetSearchIndex().load(store.pool)
+    assert [record[0] for record in index.search("husky")] == [1, 3]
+    assert [record[0] for record in index.search("hus 7")] == [3]
+    assert [record[0] for record in index.search("lu")] == [2]
+    assert index.search("parrot") == []
+    index.update_status(1, "Adopted")
+    assert [record[0] for record in index.search("adopted")] == [1]
+
+
+def test_sql_fallback_finds_what_the_index_finds(store):
+    seed_pets(store)
+    store.upsert_pets([pet(61, name="Max", breed="German Shepherd", age=12), pet(62, name="Tiny Tim", breed="Shih-Tzu"),
+                       pet(63, name="50% Off", breed="Mixed_Breed", age=1)])
+    index = PetSearchIndex().load(store.pool)
+    for text in ["husky 3", "husky", "hu", "3", "12", "pet1", "north dog", "pend", "ge sh", "tz", "ti",
+                 "50%", "d_b", "_", "cat persian 7", "zzz", ""]:
+        rows = all_pages(pet_search_query(text), store.pool)
+        assert rows == index.search(text), text
+        assert [record for record in index.search("") if search_matches(record, text)] == rows, text
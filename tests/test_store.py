@@ -0,0 +1,195 @@
+import threading
+
+import pytest
+from mysql.connector import errors
+
+from store import MySQLStore, SQLiteStore, open_store
+from tests.conftest import application, pet
+
+
+def applications(store, pet_id):
+    return store.pool.fetchall("SELECT appId, adopterName, appStatus FROM applications WHERE petId = %s ORDER BY appId",
+                               (pet_id,))
+
+
+def submitted(store, pet_id, adopters):
+    """Submit one application per adopter for pet_id, freeing the pet before each; returns their appIds"""
+    for adopter in adopters:
+        store.pool.execute("UPDATE pets SET status = 'Available' WHERE petId = %s", (pet_id,))
+        assert store.submit_application(application(pet_id, adopter)) == "Available"
+    return [row[0] for row in applications(store, pet_id)]
+
+
+def pet_status(store, pet_id):
+    return store.pool.fetchone("SELECT status FROM pets WHERE petId = %s", (pet_id,))[0]
+
+
+# --- Pets ---
+def test_upsert_and_status(store):
+    assert store.upsert_pets([pet(1), pet(2)]) == set()
+    assert store.upsert_pets([pet(1, name="Renamed"), pet(3)]) == {1}
+    assert store.get_pet(1)[1] == "Renamed"
+    store.set_pet_status(2, "Adopted")
+    assert pet_status(store, 2) == "Adopted"
+    store.set_pet_comments(2, "Went home")
+    assert store.get_pet(2)[9:] == ("Adopted", "Went home")
+
+
+def test_mysql_upsert_uses_a_row_alias():
+    # VALUES(col) in ON DUPLICATE KEY UPDATE is deprecated since MySQL 8.0.20.
+    sql = MySQLStore.upsert_sql
+    assert "VALUES(" not in sql
+    assert ") AS new" in sql and "comments=new.comments" in sql
+
+
+def test_save_pet(store):
+    assert store.save_pet(pet(1)) is False
+    assert store.save_pet(pet(1, age=5)) is True
+    assert store.pool.fetchone("SELECT age FROM pets WHERE petId = 1") == (5,)
+
+
+def test_sqlite_errors_are_mysql_errors(store):
+    with pytest.raises(errors.IntegrityError):
+        store.pool.execute("INSERT INTO pets (petId, petName, species, breed, age, status) "
+                           "VALUES (1, 'Rex', 'dog', 'husky', 2, 'Lost')")
+    with pytest.raises(errors.DatabaseError):
+        store.pool.fetchall("SELECT nothing FROM pets")
+
+
+def test_failed_write_rolls_back(store):
+    def work(cursor):
+        cursor.execute("UPDATE pets SET status = 'Adopted'")
+        raise ValueError("changed my mind")
+    store.upsert_pets([pet(1)])
+    with pytest.raises(ValueError):
+        store.pool.run(work, write=True)
+    assert pet_status(store, 1) == "Available"
+
+
+def test_open_store_sqlite_file(tmp_path):
+    path = tmp_path / "pets.db"
+    first = open_store(f"sqlite:{path}")
+    assert isinstance(first, SQLiteStore)
+    first.upsert_pets([pet(1)])
+    first.close()
+    second = open_store(f"sqlite:{path}")
+    assert second.get_pet(1)[1] == "Rex"
+    second.close()
+
+
+# --- Applications dashboard ---
+def test_application_counts(store):
+    store.upsert_pets([pet(1), pet(2)])
+    first, second = submitted(store, 1, ["A", "B"])
+    submitted(store, 2, ["C"])
+    store.pool.execute("UPDATE applications SET appStatus = 'Denied' WHERE appId = %s", (first,))
+    assert store.application_counts() == {"Submitted": 2, "Denied": 1}
+    assert store.application_counts("petId = %s", (1,)) == {"Submitted": 1, "Denied": 1}
+    assert store.application_counts("petId = %s", (3,)) == {}
+
+
+def test_application_pets(store):
+    store.upsert_pets([pet(1), pet(2)])
+    (first,) = submitted(store, 1, ["A"])
+    (second,) = submitted(store, 2, ["B"])
+    assert store.application_pets([first, second, 999]) == {first: 1, second: 2}
+    assert store.application_pets([]) == {}
+
+
+# --- Deciding ---
+def test_approval_denies_competing_applications(store):
+    store.upsert_pets([pet(1), pet(2)])
+    first, second, third = submitted(store, 1, ["A", "B", "C"])
+    (other,) = submitted(store, 2, ["D"])
+
+    report = store.decide_applications([(second, 1, "Approved")])
+
+    assert (report.approved, report.denied, report.competing_denied) == (1, 0, 2)
+    assert report.pet_statuses == {1: "Adopted"}
+    assert [row[2] for row in applications(store, 1)] == ["Denied", "Approved", "Denied"]
+    assert [row[2] for row in applications(store, 2)] == ["Submitted"]
+    assert pet_status(store, 1) == "Adopted"
+    assert store.get_pet(1)[9] == "Adopted"
+
+
+def test_approve_and_deny_in_one_batch(store):
+    store.upsert_pets([pet(1)])
+    first, second = submitted(store, 1, ["A", "B"])
+    report = store.decide_applications([(first, 1, "Denied"), (second, 1, "Approved")])
+    assert (report.approved, report.denied, report.competing_denied) == (1, 1, 0)
+    assert pet_status(store, 1) == "Adopted"
+
+
+def test_denial_releases_a_pending_pet(store):
+    store.upsert_pets([pet(1)])
+    (app_id,) = submitted(store, 1, ["A"])
+    assert store.decide_application(app_id, 1, "Denied") == "Available"
+    assert pet_status(store, 1) == "Available"
+
+
+def test_denial_leaves_an_adopted_pet(store):
+    store.upsert_pets([pet(1)])
+    first, second = submitted(store, 1, ["A", "B"])
+    store.pool.execute("UPDATE pets SET status = 'Adopted' WHERE petId = 1")
+    assert store.decide_application(first, 1, "Denied") == "Adopted"
+
+
+def test_two_approvals_for_one_pet(store):
+    store.upsert_pets([pet(1)])
+    first, second = submitted(store, 1, ["A", "B"])
+    with pytest.raises(ValueError):
+        store.decide_applications([(first, 1, "Approved"), (second, 1, "Approved")])
+    assert [row[2] for row in applications(store, 1)] == ["Submitted", "Submitted"]
+
+
+def test_unknown_decision(store):
+    with pytest.raises(ValueError):
+        store.decide_applications([(1, 1, "Maybe")])
+
+
+# --- Submitting ---
+def test_submit_claims_the_pet(store):
+    store.upsert_pets([pet(1)])
+    assert store.submit_application(application(1)) == "Available"
+    assert pet_status(store, 1) == "Pending"
+    assert [row[2] for row in applications(store, 1)] == ["Submitted"]
+
+
+@pytest.mark.parametrize("status", ["Pending", "Adopted"])
+def test_submit_for_a_taken_pet_writes_nothing(store, status):
+    store.upsert_pets([pet(1, status=status)])
+    assert store.submit_application(application(1)) == status
+    assert pet_status(store, 1) == status
+    assert applications(store, 1) == []
+
+
+def test_submit_for_a_missing_pet(store):
+    assert store.submit_application(application(99)) is None
+    assert applications(store, 99) == []
+
+
+def test_claim_race(tmp_path):
+    """Workstations with their own connections submit for one pet at once; exactly one wins"""
+    path = str(tmp_path / "pets.db")
+    stores = [SQLiteStore(path) for _ in range(6)]
+    stores[0].upsert_pets([pet(1)])
+    start = threading.Barrier(len(stores))
+    results = [None] * len(stores)
+
+    def submit(i):
+        start.wait()
+        results[i] = stores[i].submit_application(application(1, adopter=f"Adopter {i}"))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(stores))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert sorted(results) == ["Available"] + ["Pending"] * (len(stores) - 1)
+        winner = results.index("Available")
+        assert [row[1] for row in applications(stores[0], 1)] == [f"Adopter {winner}"]
+        assert pet_status(stores[0], 1) == "Pending"
+    finally:
+        for store in stores:
+            store.close()
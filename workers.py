@@ -0,0 +1,140 @@
+import itertools
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from metrics import METRICS
+
+
+class QuerySignals(QObject):
+    chunk = pyqtSignal(int, object)      # task id, partial rows
+    finished = pyqtSignal(int, object)   # task id, result
+    failed = pyqtSignal(int, object)     # task id, exception
+
+
+class QueryTask(QRunnable):
+    """One unit of database work run on a worker thread.
+
+    work is called with the task itself so it can stream rows back through
+    emit_chunk() and stop early once is_cancelled() turns true.
+    """
+    def __init__(self, task_id, work):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self.work = work
+        self.signals = QuerySignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def emit_chunk(self, rows):
+        if not self.is_cancelled():
+            self.signals.chunk.emit(self.task_id, rows)
+
+    def run(self):
+        try:
+            result = self.work(self)
+        except Exception as e:
+            self.signals.failed.emit(self.task_id, e)
+        else:
+            self.signals.finished.emit(self.task_id, result)
+
+
+class QueryExecutor(QObject):
+    """Runs database work on a QThreadPool and delivers results on the GUI thread.
+
+    Work is submitted under a key such as (window, "search"). Submitting again
+    under the same key cancels the previous task, and anything a cancelled task
+    still produces is dropped, so a stale search can never overwrite a newer one.
+    With a label (e.g. "search_pet") the work is timed as label.db and the
+    callbacks that update widgets as label.ui in metrics.METRICS.
+    """
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._tasks = {}     # task id -> (task, key, on_result, on_error, on_chunk, label)
+        self._current = {}   # key -> task id of the newest task for that key
+
+    def submit(self, key, work, on_result=None, on_error=None, on_chunk=None, label=None):
+        self.cancel(key)
+        if label:
+            def timed_work(task, work=work):
+                with METRICS.operation(label):
+                    return work(task)
+            task = QueryTask(next(self._ids), timed_work)
+        else:
+            task = QueryTask(next(self._ids), work)
+        task.signals.chunk.connect(self._deliver_chunk)
+        task.signals.finished.connect(self._deliver_result)
+        task.signals.failed.connect(self._deliver_error)
+        self._tasks[task.task_id] = (task, key, on_result, on_error, on_chunk, label)
+        self._current[key] = task.task_id
+        self.thread_pool.start(task)
+        return task
+
+    def is_running(self, key):
+        return key in self._current
+
+    def cancel(self, key):
+        task_id = self._current.pop(key, None)
+        entry = self._tasks.get(task_id)
+        if entry:
+            entry[0].cancel()
+
+    def cancel_owner(self, owner):
+        """Cancel every task whose key is (owner, ...), e.g. when a dialog closes"""
+        for key in [k for k in self._current if isinstance(k, tuple) and k and k[0] is owner]:
+            self.cancel(key)
+
+    def shutdown(self, timeout_ms=3000):
+        for key in list(self._current):
+            self.cancel(key)
+        self.thread_pool.waitForDone(timeout_ms)
+
+    # --- Delivery (GUI thread) ---
+    def _live_entry(self, task_id, finished=False):
+        entry = self._tasks.pop(task_id, None) if finished else self._tasks.get(task_id)
+        if entry is None:
+            return None
+        task, key = entry[0], entry[1]
+        if finished and self._current.get(key) == task_id:
+            del self._current[key]
+        if task.is_cancelled():
+            return None
+        return entry
+
+    @staticmethod
+    def _call(entry, callback, value):
+        if entry[5]:
+            with METRICS.timed(entry[5], "ui"):
+                callback(value)
+        else:
+            callback(value)
+
+    @pyqtSlot(int, object)
+    def _deliver_chunk(self, task_id, rows):
+        entry = self._live_entry(task_id)
+        if entry and entry[4]:
+            self._call(entry, entry[4], rows)
+
+    @pyqtSlot(int, object)
+    def _deliver_result(self, task_id, result):
+        entry = self._live_entry(task_id, finished=True)
+        if entry and entry[2]:
+            self._call(entry, entry[2], result)
+
+    @pyqtSlot(int, object)
+    def _deliver_error(self, task_id, error):
+        entry = self._live_entry(task_id, finished=True)
+        if entry:
+            if entry[3]:
+                entry[3](error)
+            else:
+                print(f"Background query error: {error}")